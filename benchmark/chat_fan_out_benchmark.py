@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SERVER_ADDRESS = ("127.0.0.1", 18434)
+# The ollama module builds its client at import time, so the host is fixed before any import
+os.environ["OPENAI_BASE_URL"] = f"http://{SERVER_ADDRESS[0]}:{SERVER_ADDRESS[1]}/v1"
+os.environ["OLLAMA_HOST"] = f"http://{SERVER_ADDRESS[0]}:{SERVER_ADDRESS[1]}"
+
+from PyQt6.QtWidgets import QApplication
+
+from chat.model.ChatModel import ChatModel
+from util.AIWorkerPool import AIWorkerPool
+from util.ClientManager import ClientManager
+from util.Constants import AIProviderName
+
+API_KEY = "benchmark-key"
+DELTA_COUNT = 20
+PROVIDERS = [  # (provider, model, seconds to stream the whole answer)
+    (AIProviderName.OPENAI.value, "openai-slow", 1.2),
+    (AIProviderName.OPENAI.value, "openai-fast", 0.4),
+    (AIProviderName.OLLAMA.value, "ollama-medium", 0.8),
+]
+ANSWER_SECONDS = {model: seconds for _, model, seconds in PROVIDERS}
+
+
+class StreamingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        model = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))["model"]
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index in range(DELTA_COUNT + 1):
+            time.sleep(ANSWER_SECONDS[model] / (DELTA_COUNT + 1))
+            done = index == DELTA_COUNT
+            if self.path.endswith("/chat/completions"):
+                line = "data: " + json.dumps({"id": "c", "object": "chat.completion.chunk", "created": 0, "model": model,
+                                              "choices": [{"index": 0, "delta": {} if done else {"content": "token "},
+                                                           "finish_reason": "stop" if done else None}]}) + "\n\n"
+            else:
+                line = json.dumps({"model": model, "created_at": "2024-01-01T00:00:00Z", "done": done,
+                                   "done_reason": "stop", "message": {"role": "assistant",
+                                                                      "content": "" if done else "token "}}) + "\n"
+            self.write_chunk(line.encode())
+        if self.path.endswith("/chat/completions"):
+            self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+    def write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_args(provider, model):
+    ai_arg = {"model": model, "messages": [{"role": "user", "content": "ping"}], "stream": True}
+    if provider == AIProviderName.OLLAMA.value:
+        ai_arg["options"] = {}
+    return {"api_key": API_KEY, "ai_arg": ai_arg}
+
+
+def wait_for_finish(app, chat_model):
+    finished = []
+    chat_model.thread_finished_signal.connect(lambda: finished.append(True))
+    while not finished:
+        app.processEvents()
+        time.sleep(0.001)
+    chat_model.thread_finished_signal.disconnect()
+
+
+def run_one_by_one(app):
+    chat_model = ChatModel()
+    start = time.perf_counter()
+    for provider, model, _ in PROVIDERS:
+        chat_model.send_user_input(create_args(provider, model), provider)
+        wait_for_finish(app, chat_model)
+    return time.perf_counter() - start
+
+
+def run_fan_out(app):
+    chat_model = ChatModel()
+    answers = []
+    chat_model.compare_response_finished_signal.connect(lambda column, model, *args: answers.append(model))
+    start = time.perf_counter()
+    chat_model.send_compare_input([create_args(provider, model) for provider, model, _ in PROVIDERS],
+                                  [provider for provider, _, _ in PROVIDERS])
+    wait_for_finish(app, chat_model)
+    assert len(answers) == len(PROVIDERS)
+    return time.perf_counter() - start
+
+
+def main():
+    server = ThreadingHTTPServer(SERVER_ADDRESS, StreamingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    app = QApplication(sys.argv)
+    one_by_one = run_one_by_one(app)
+    fan_out = run_fan_out(app)
+    AIWorkerPool.shutdown()
+    ClientManager.close_all()
+    server.shutdown()
+
+    print(f"answers          : {', '.join(f'{model} {seconds:.1f} s' for _, model, seconds in PROVIDERS)}")
+    print(f"one by one       : {one_by_one:.2f} s")
+    print(f"fan-out          : {fan_out:.2f} s (slowest answer {max(ANSWER_SECONDS.values()):.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
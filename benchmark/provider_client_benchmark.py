@@ -0,0 +1,101 @@
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openai
+
+from util.ClientManager import ClientManager
+
+MESSAGE_COUNT = 50
+API_KEY = "benchmark-key"
+COMPLETION = {
+    "id": "chatcmpl-benchmark", "object": "chat.completion", "created": 0, "model": "benchmark",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "pong"}, "finish_reason": "stop"}],
+}
+
+
+class CompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connection_count += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_certificate(directory):
+    cert_filename = os.path.join(directory, "cert.pem")
+    key_filename = os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-keyout", key_filename, "-out", cert_filename, "-subj", "/CN=localhost",
+                    "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
+                   check=True, capture_output=True)
+    return cert_filename, key_filename
+
+
+def start_server(cert_filename, key_filename):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CompletionHandler)
+    server.connection_count = 0
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_filename, key_filename)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def send_messages(server, get_client):
+    base_url = f"https://localhost:{server.server_address[1]}/v1"
+    server.connection_count = 0
+    latencies = []
+    for _ in range(MESSAGE_COUNT):
+        start = time.perf_counter()
+        client = get_client(base_url)
+        client.chat.completions.create(model="benchmark", messages=[{"role": "user", "content": "ping"}])
+        latencies.append(time.perf_counter() - start)
+    return latencies, server.connection_count
+
+
+def run_benchmark(directory):
+    os.environ["SSL_CERT_FILE"], key_filename = create_certificate(directory)
+    server = start_server(os.environ["SSL_CERT_FILE"], key_filename)
+    results = {
+        "client per message": send_messages(server, lambda base_url: openai.OpenAI(api_key=API_KEY, base_url=base_url)),
+        "shared client": send_messages(server, lambda base_url: ClientManager.get_openai_client(API_KEY, base_url)),
+    }
+    server.shutdown()
+    ClientManager.close_all()
+
+    print(f"messages          : {MESSAGE_COUNT} over loopback TLS")
+    for name, (latencies, connection_count) in results.items():
+        follow_up = sorted(latencies[1:])
+        print(f"{name:<18}: first {latencies[0] * 1000:6.1f} ms, follow-up median {follow_up[len(follow_up) // 2] * 1000:6.1f} ms, "
+              f"total {sum(latencies) * 1000:8.1f} ms, {connection_count} connections")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        run_benchmark(directory)
+
+
+if __name__ == "__main__":
+    main()
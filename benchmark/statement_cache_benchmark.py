@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants
+from util.StatementCache import StatementCache
+
+INSERT_COUNT = 20000
+INSERT_QUERY = (f"INSERT INTO {Constants.CHAT_MESSAGE_TABLE} "
+                f" (chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason) "
+                f" VALUES (:chat_main_id, :chat_type, :chat_model, :chat, :elapsed_time, :finish_reason)")
+
+
+def create_tables(db):
+    query = QSqlQuery(db)
+    query.exec(f"CREATE TABLE {Constants.CHAT_MAIN_TABLE} (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT)")
+    query.exec(f"CREATE TABLE {Constants.CHAT_MESSAGE_TABLE} (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+               f" chat_main_id INTEGER NOT NULL REFERENCES {Constants.CHAT_MAIN_TABLE}(id) ON DELETE CASCADE, "
+               f" chat_type TEXT, chat_model TEXT, chat TEXT, elapsed_time TEXT, finish_reason TEXT, "
+               f" created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    query.exec(f"INSERT INTO {Constants.CHAT_MAIN_TABLE} (title) VALUES ('benchmark')")
+
+
+def insert_rows(db, get_query):
+    db.transaction()
+    start = time.perf_counter()
+    for index in range(INSERT_COUNT):
+        query = get_query()
+        query.bindValue(":chat_main_id", 1)
+        query.bindValue(":chat_type", "AI")
+        query.bindValue(":chat_model", "model")
+        query.bindValue(":chat", f"streamed answer {index}")
+        query.bindValue(":elapsed_time", "1.0")
+        query.bindValue(":finish_reason", "stop")
+        query.exec()
+    elapsed = time.perf_counter() - start
+    db.commit()
+    return INSERT_COUNT / elapsed
+
+
+def prepare_uncached(db):
+    query = QSqlQuery(db)
+    query.prepare(INSERT_QUERY)
+    return query
+
+
+def run_benchmark(db_filename):
+    db = QSqlDatabase.addDatabase(Constants.SQLITE_DATABASE, "benchmark")
+    db.setDatabaseName(db_filename)
+    db.open()
+    create_tables(db)
+
+    statement_cache = StatementCache(db)
+    uncached = insert_rows(db, lambda: prepare_uncached(db))
+    cached = insert_rows(db, lambda: statement_cache.prepare(INSERT_QUERY))
+    print(f"prepare per call : {uncached:10.0f} inserts/s")
+    print(f"statement cache  : {cached:10.0f} inserts/s ({cached / uncached:.2f}x)")
+
+    statement_cache.clear()
+    db.close()
+
+
+def main():
+    app = QCoreApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as directory:
+        run_benchmark(os.path.join(directory, "benchmark.db"))
+        QSqlDatabase.removeDatabase("benchmark")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anthropic
+import openai
+from PyQt6.QtWidgets import QApplication
+
+from benchmark.provider_client_benchmark import CompletionHandler, create_certificate, start_server
+from chat.model.ClaudeThread import ClaudeThread
+from chat.model.OpenAIThread import OpenAIThread
+from image.model.OpenAIImageThread import OpenAIImageThread
+from stt.model.OpenAISTTThread import OpenAISTTThread
+from tts.model.OpenAITTSThread import OpenAITTSThread
+from util.AIWorkerPool import AIWorkerPool
+from util.ClientManager import ClientManager
+from util.Constants import Constants
+
+API_KEY = "benchmark-key"
+STALL_SECONDS = 3  # How long the server holds every request open
+CANCEL_AFTER = 0.3  # Seconds between submit and the stop button
+UPLOAD_BYTES = 64 * 1024 * 1024
+
+
+class StallingHandler(CompletionHandler):
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        if path.endswith("/audio/transcriptions"):
+            # Never read the upload, so the client blocks once the socket buffers are full
+            self.server.release.wait(STALL_SECONDS)
+            self.close_connection = True
+            return self.send_json({"text": "late"})
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if path.endswith("/chat/completions"):
+            self.send_events([{"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "benchmark",
+                               "choices": [{"index": 0, "delta": {"content": "first"}, "finish_reason": None}]}])
+        elif path.endswith("/messages"):
+            self.send_events([{"type": "message_start", "message": {
+                "id": "m", "type": "message", "role": "assistant", "model": "benchmark", "content": [],
+                "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": 1, "output_tokens": 1}}}])
+        elif path.endswith("/audio/speech"):
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(1024 * 1024))
+            self.end_headers()
+            self.wfile.write(b"\0" * 1024)
+            self.wfile.flush()
+            self.server.release.wait(STALL_SECONDS)
+            self.close_connection = True
+        else:
+            self.server.release.wait(STALL_SECONDS)
+            self.send_json({"created": 0, "data": [{"b64_json": "", "revised_prompt": "late"}]})
+
+    def send_events(self, events):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for event in events:
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+        self.wfile.flush()
+        self.server.release.wait(STALL_SECONDS)
+        self.close_connection = True
+
+    def send_json(self, body):
+        body = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_workers():
+    return {
+        "chat stream": OpenAIThread({"api_key": API_KEY, "ai_arg": {
+            "model": "benchmark", "messages": [{"role": "user", "content": "ping"}], "stream": True}}),
+        "claude stream": ClaudeThread({"api_key": API_KEY, "ai_arg": {
+            "model": "benchmark", "max_tokens": 16, "messages": [{"role": "user", "content": "ping"}],
+            "stream": True}}),
+        "image generate": OpenAIImageThread({"api_key": API_KEY, "stream": False,
+                                             "creation_type": Constants.DALLE_CREATE, "ai_arg": {
+                                                 "model": "benchmark", "prompt": "ping", "n": 1,
+                                                 "response_format": "b64_json"}}),
+        "tts download": OpenAITTSThread({"api_key": API_KEY, "stream": False, "ai_arg": {
+            "model": "benchmark", "voice": "alloy", "input": "ping", "response_format": "mp3"}}),
+        "stt upload": OpenAISTTThread({"api_key": API_KEY, "stream": False, "translation": False, "ai_arg": {
+            "model": "benchmark", "response_format": "json",
+            "file": ("speech.mp3", io.BytesIO(b"\0" * UPLOAD_BYTES))}}),
+    }
+
+
+def use_uncancellable_clients(worker):
+    # The flag-only behaviour: the same SDK call on a client without the cancellable network backend
+    if hasattr(worker, "openai"):
+        worker.openai = openai.OpenAI(api_key=API_KEY)
+    else:
+        worker.claude = anthropic.Anthropic(api_key=API_KEY)
+
+
+def measure_stop_latency(app, worker):
+    events = []
+    worker.finished_signal.connect(lambda request_id: events.append("finished"))
+    worker.response_finished_signal.connect(lambda *args: events.append(args[1]))
+    request_id = AIWorkerPool.submit(worker)
+    deadline = time.perf_counter() + CANCEL_AFTER
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    start = time.perf_counter()
+    AIWorkerPool.cancel(request_id)
+    while "finished" not in events:
+        app.processEvents()
+        time.sleep(0.001)
+    return time.perf_counter() - start, Constants.FORCE_STOP in events
+
+
+def run_benchmark(app, directory):
+    os.environ["SSL_CERT_FILE"], key_filename = create_certificate(directory)
+    server = start_server(os.environ["SSL_CERT_FILE"], key_filename)
+    server.RequestHandlerClass = StallingHandler
+    server.handle_error = lambda request, client_address: None  # Cancelled clients drop their connections
+    base_url = f"https://localhost:{server.server_address[1]}"
+    os.environ["OPENAI_BASE_URL"] = base_url + "/v1"
+    os.environ["ANTHROPIC_BASE_URL"] = base_url
+
+    results = {}
+    for cancellable in [False, True]:
+        server.release = threading.Event()
+        for name, worker in create_workers().items():
+            if not cancellable:
+                use_uncancellable_clients(worker)
+            results.setdefault(name, []).append(measure_stop_latency(app, worker))
+        server.release.set()
+    AIWorkerPool.shutdown()
+    ClientManager.close_all()
+    server.shutdown()
+
+    print(f"server stall     : {STALL_SECONDS} s, stop pressed {CANCEL_AFTER * 1000:.0f} ms after submit")
+    for name, ((flag_latency, _), (latency, force_stop)) in results.items():
+        print(f"{name:<17}: flag only {flag_latency * 1000:7.1f} ms, cancellable {latency * 1000:6.1f} ms"
+              f"{'' if force_stop else ' (no Force Stop finish)'}")
+
+
+def main():
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as directory:
+        run_benchmark(app, directory)
+
+
+if __name__ == "__main__":
+    main()
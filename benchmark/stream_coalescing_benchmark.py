@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+from chat.view.ChatWidget import ChatWidget
+from util.AIWorkerPool import AIWorker, AIWorkerPool
+from util.ChatType import ChatType
+
+DELTA_COUNT = 2000
+DELTA_RATE = 400  # Deltas per second, roughly a fast model
+DELTA_TEXT = "token "
+
+
+class StreamWorker(AIWorker):
+    response_signal = pyqtSignal(str, bool)
+
+    def __init__(self, coalesce):
+        super().__init__()
+        self.coalesce = coalesce
+
+    def run(self):
+        start = time.perf_counter()
+        for index in range(DELTA_COUNT):
+            delay = start + index / DELTA_RATE - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if self.coalesce:
+                self.emit_stream_text(DELTA_TEXT)
+            else:
+                self.response_signal.emit(DELTA_TEXT, True)
+        self.flush_stream_text()
+
+
+def stream_into_widget(app, coalesce):
+    chat_widget = ChatWidget(ChatType.AI)
+    stats = {"events": 0, "gui_seconds": 0.0}
+
+    def add_text(text, stream):
+        start = time.perf_counter()
+        chat_widget.add_text(text)
+        stats["events"] += 1
+        stats["gui_seconds"] += time.perf_counter() - start
+
+    finished = []
+    worker = StreamWorker(coalesce)
+    worker.response_signal.connect(add_text)
+    worker.finished_signal.connect(finished.append)
+    start = time.perf_counter()
+    AIWorkerPool.submit(worker)
+    while not finished:
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    assert chat_widget.get_original_text() == DELTA_TEXT * DELTA_COUNT
+    return stats["events"], stats["gui_seconds"], elapsed
+
+
+def main():
+    app = QApplication(sys.argv)
+    results = {"per delta": stream_into_widget(app, False), "coalesced": stream_into_widget(app, True)}
+    AIWorkerPool.shutdown()
+
+    print(f"stream           : {DELTA_COUNT} deltas at {DELTA_RATE}/s")
+    for name, (events, gui_seconds, elapsed) in results.items():
+        print(f"{name:<17}: {events:5d} GUI events, add_text {gui_seconds * 1000:8.1f} ms, "
+              f"stream finished in {elapsed:.2f} s")
+    print(f"events saved     : {results['per delta'][0] - results['coalesced'][0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication, QByteArray
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants
+from util.Utility import Utility
+
+MESSAGE_COUNT = 500
+MESSAGE_WORDS = (3000, 7500)  # Roughly 20-50 KB answers
+VOCABULARY = ("the model returns a response with code examples and explanations for each function parameter "
+              "value error result list dictionary string import class def return self data table query index "
+              "performance database thread signal window layout button text image audio stream token").split()
+
+
+def build_corpus():
+    generator = random.Random(0)
+    corpus = []
+    for _ in range(MESSAGE_COUNT):
+        words = [generator.choice(VOCABULARY) for _ in range(generator.randint(*MESSAGE_WORDS))]
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def write_corpus(db_filename, corpus, compress):
+    db = QSqlDatabase.addDatabase(Constants.SQLITE_DATABASE, "benchmark")
+    db.setDatabaseName(db_filename)
+    db.open()
+    query = QSqlQuery(db)
+    query.exec(f"CREATE TABLE {Constants.CHAT_MESSAGE_TABLE} (id INTEGER PRIMARY KEY AUTOINCREMENT, chat TEXT)")
+    query.prepare(f"INSERT INTO {Constants.CHAT_MESSAGE_TABLE} (chat) VALUES (:chat)")
+    db.transaction()
+    for text in corpus:
+        compressed_text = Utility.compress_text(text) if compress else None
+        query.bindValue(":chat", QByteArray(compressed_text) if compressed_text is not None else text)
+        query.exec()
+    db.commit()
+    query.finish()
+    db.close()
+
+
+def read_corpus(db_filename):
+    db = QSqlDatabase.addDatabase(Constants.SQLITE_DATABASE, "benchmark")
+    db.setDatabaseName(db_filename)
+    db.open()
+    query = QSqlQuery(db)
+    start = time.perf_counter()
+    query.exec(f"SELECT chat FROM {Constants.CHAT_MESSAGE_TABLE}")
+    total_length = 0
+    while query.next():
+        total_length += len(Utility.decompress_text(query.value(0)))
+    elapsed = time.perf_counter() - start
+    query.finish()
+    db.close()
+    return elapsed, total_length
+
+
+def run_benchmark(directory):
+    corpus = build_corpus()
+    results = {}
+    for name, compress in [("plain", False), ("compressed", True)]:
+        db_filename = os.path.join(directory, f"{name}.db")
+        write_corpus(db_filename, corpus, compress)
+        QSqlDatabase.removeDatabase("benchmark")
+        elapsed, total_length = read_corpus(db_filename)
+        QSqlDatabase.removeDatabase("benchmark")
+        results[name] = (os.path.getsize(db_filename), elapsed, total_length)
+
+    plain_size, plain_elapsed, _ = results["plain"]
+    compressed_size, compressed_elapsed, total_length = results["compressed"]
+    print(f"corpus           : {MESSAGE_COUNT} messages, {Utility.format_byte_size(total_length)}")
+    print(f"plain            : {Utility.format_byte_size(plain_size):>10}, read {plain_elapsed * 1000:8.1f} ms")
+    print(f"compressed       : {Utility.format_byte_size(compressed_size):>10}, read {compressed_elapsed * 1000:8.1f} ms")
+    print(f"size reduction   : {1 - compressed_size / plain_size:.1%}")
+    print(f"read overhead    : {(compressed_elapsed - plain_elapsed) / MESSAGE_COUNT * 1000:.3f} ms per message")
+
+
+def main():
+    app = QCoreApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as directory:
+        run_benchmark(directory)
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtCore import pyqtSlot, QTimer
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QDialog, QMessageBox
 
 from chat.model.ChatModel import ChatModel
@@ -18,6 +18,11 @@ class ChatPresenter(QWidget):
         super().__init__()
         self._chat_main_id = None
         self._chat_main_index = None
+        self.chat_detail_ids = []
+        self.chat_widget_ids = []
+        self.has_older_chat_detail = False
+        self.turn = None
+        self.comparing = False
         self.initialize_manager()
         self.initialize_ui()
 
@@ -42,6 +47,7 @@ class ChatPresenter(QWidget):
         self.chatView.stop_signal.connect(self.chatModel.force_stop)
         self.chatView.chat_llm_signal.connect(self.set_current_llm_signal)
         self.chatView.reload_chat_detail_signal.connect(self.show_chat_detail)
+        self.chatView.load_older_chat_detail_signal.connect(self.load_older_chat_detail)
 
         self.chatView.prompt_list.sendPromptSignal.connect(self.chatView.set_prompt)
 
@@ -57,8 +63,12 @@ class ChatPresenter(QWidget):
         # Model signal
         self.chatModel.thread_started_signal.connect(self.chatView.start_chat)
         self.chatModel.thread_finished_signal.connect(self.chatView.finish_chat)
+        self.chatModel.thread_finished_signal.connect(self.finish_compare)
+        self.chatModel.thread_finished_signal.connect(self.commit_turn)
         self.chatModel.response_signal.connect(self.chatView.update_ui)
         self.chatModel.response_finished_signal.connect(self.handle_response_finished_signal)
+        self.chatModel.compare_response_signal.connect(self.chatView.update_compare_ui)
+        self.chatModel.compare_response_finished_signal.connect(self.handle_compare_response_finished_signal)
 
         # View
         main_layout = QVBoxLayout()
@@ -72,6 +82,9 @@ class ChatPresenter(QWidget):
 
     def set_chat_main_id(self, chat_main_id):
         self.chat_main_id = chat_main_id
+        self.chat_detail_ids = []
+        self.chat_widget_ids = []
+        self.has_older_chat_detail = False
         self.view.clear_all()
 
     @pyqtSlot(str, str, float, bool)
@@ -81,7 +94,31 @@ class ChatPresenter(QWidget):
             self.chatView.update_ui_finish(model, finish_reason, elapsed_time, stream)
             self._database.insert_chat_detail(self.chat_main_id, ChatType.AI.value, model,
                                               self.view.get_last_ai_widget().get_original_text(), elapsed_time,
-                                              finish_reason)
+                                              finish_reason, turn=self.turn)
+            self.chatViewModel.record_chat_activity(self.chat_main_id, model)
+        self.commit_turn()
+
+    @pyqtSlot(int, str, str, float, bool)
+    def handle_compare_response_finished_signal(self, column, model, finish_reason, elapsed_time, stream):
+        compare_widget = self.view.get_last_compare_widget()
+        if compare_widget:
+            self.chatView.update_compare_ui_finish(column, model, finish_reason, elapsed_time, stream)
+            self._database.insert_chat_detail(self.chat_main_id, ChatType.AI.value, model,
+                                              compare_widget.get_column(column).get_original_text(), elapsed_time,
+                                              finish_reason, compare_id=self.turn.turn_id, turn=self.turn)
+            self.chatViewModel.record_chat_activity(self.chat_main_id, model)
+
+    @pyqtSlot()
+    def finish_compare(self):
+        if self.comparing:
+            self.comparing = False
+            self.chatView.finish_compare()
+
+    @pyqtSlot()
+    def commit_turn(self):
+        if self.turn is not None:
+            self.turn.commit()
+            self.turn = None
 
     @property
     def model(self):
@@ -138,15 +175,70 @@ class ChatPresenter(QWidget):
     def get_chat_detail(self, id):
         self.view.clear_all()
         self.view.reset_search_bar()
-        chat_detail_list = self._database.get_all_chat_details_list(id)
+        self.chat_detail_ids = []
+        self.chat_widget_ids = []
+        self.add_chat_detail_page(self.get_chat_detail_page(id))
+        QTimer.singleShot(0, lambda: self.view.restore_scroll_offset_from_bottom(0))
+
+    def get_chat_detail_page(self, chat_main_id, before_id=None):
+        chat_detail_list = self._database.get_chat_details_page(chat_main_id, before_id)
+        self.has_older_chat_detail = len(chat_detail_list) == Constants.CHAT_DETAIL_PAGE_SIZE
+        # A page boundary inside a compare run would split it, so the page reaches back to the question
+        if self.has_older_chat_detail and chat_detail_list[0]['chat_type'] != ChatType.HUMAN.value:
+            chat_detail_list[0:0] = self._database.get_chat_details_from_question(
+                chat_main_id, chat_detail_list[0]['id'], ChatType.HUMAN.value)
+        return chat_detail_list
+
+    def add_chat_detail_page(self, chat_detail_list):
+        chat_widget_ids = []
+        for chat_details in self.group_chat_details(chat_detail_list):
+            index = len(chat_widget_ids)
+            if chat_details[0]['chat_type'] == ChatType.HUMAN.value:
+                self.view.insert_chat_widget(index, ChatType.HUMAN, chat_details[0]['chat'])
+            elif len(chat_details) == 1:
+                chat_widget = self.view.insert_chat_widget(index, ChatType.AI, chat_details[0]['chat'])
+                chat_widget.set_model_name(self.get_model_label(chat_details[0]))
+            else:
+                self.view.insert_compare_widget(index, [(self.get_model_label(chat_detail), chat_detail['chat'])
+                                                        for chat_detail in chat_details])
+            chat_widget_ids.append([chat_detail['id'] for chat_detail in chat_details])
+        self.chat_detail_ids[0:0] = [chat_detail['id'] for chat_detail in chat_detail_list]
+        self.chat_widget_ids[0:0] = chat_widget_ids
+
+    @staticmethod
+    def group_chat_details(chat_detail_list):
+        # Answers of one compare run share its compare_id and one side-by-side widget
+        groups = []
         for chat_detail in chat_detail_list:
-            if chat_detail['chat_type'] == ChatType.HUMAN.value:
-                self.view.add_user_question(ChatType.HUMAN, chat_detail['chat'])
+            if (groups and chat_detail['compare_id'] is not None
+                    and groups[-1][0]['compare_id'] == chat_detail['compare_id']):
+                groups[-1].append(chat_detail)
             else:
-                self.view.add_user_question(ChatType.AI, chat_detail['chat'])
-                self.view.get_last_ai_widget().set_model_name(
-                    Constants.MODEL_PREFIX + chat_detail['chat_model']
-                    + Constants.RESPONSE_TIME + format(float(chat_detail['elapsed_time']), ".2f"))
+                groups.append([chat_detail])
+        return groups
+
+    @staticmethod
+    def get_model_label(chat_detail):
+        return (Constants.MODEL_PREFIX + chat_detail['chat_model']
+                + Constants.RESPONSE_TIME + format(float(chat_detail['elapsed_time']), ".2f"))
+
+    @pyqtSlot()
+    def load_older_chat_detail(self):
+        if not self.chat_main_id or not self.has_older_chat_detail or not self.chat_detail_ids:
+            return
+        offset = self.view.get_scroll_offset_from_bottom()
+        self.add_chat_detail_page(self.get_chat_detail_page(self.chat_main_id, self.chat_detail_ids[0]))
+        QTimer.singleShot(0, lambda: self.view.restore_scroll_offset_from_bottom(offset))
+
+    def show_chat_message(self, chat_main_id, chat_message_id):
+        self.chat_main_id = chat_main_id
+        self.get_chat_detail(chat_main_id)
+        while self.has_older_chat_detail and self.chat_detail_ids and self.chat_detail_ids[0] > chat_message_id:
+            self.add_chat_detail_page(self.get_chat_detail_page(chat_main_id, self.chat_detail_ids[0]))
+        for position, chat_message_ids in enumerate(self.chat_widget_ids):
+            if chat_message_id in chat_message_ids:
+                QTimer.singleShot(0, lambda: self.view.scroll_to_message_widget(position))
+                break
 
     def delete_chat(self, index):
         self.chatViewModel.remove_chat(index)
@@ -155,11 +247,13 @@ class ChatPresenter(QWidget):
         self.chatViewModel.add_new_chat(title)
 
     def add_human_chat(self, text):
-        if self.chat_main_id:
-            self._database.insert_chat_detail(self.chat_main_id, ChatType.HUMAN.value, None, text, None, None)
-        else:
+        if not self.chat_main_id:
             self.create_new_chat()
-            self._database.insert_chat_detail(self.chat_main_id, ChatType.HUMAN.value, None, text, None, None)
+        self.commit_turn()
+        self.turn = self._database.begin_turn()
+        self._database.insert_chat_detail(self.chat_main_id, ChatType.HUMAN.value, None, text, None, None,
+                                          turn=self.turn)
+        self.chatViewModel.record_chat_activity(self.chat_main_id)
 
     def update_chat(self, index, new_title):
         self.chatViewModel.update_chat(index, new_title)
@@ -172,4 +266,14 @@ class ChatPresenter(QWidget):
         if text and text.strip():
             self.add_human_chat(text)
             self.chatView.update_ui_submit(ChatType.HUMAN, text)
-            self.chatModel.send_user_input(self.chatView.create_args(text, self.llm), self.llm)
+            if self.has_older_chat_detail and self.chat_detail_ids:
+                self.chatView.set_older_history(
+                    self._database.get_chat_texts_before(self.chat_main_id, self.chat_detail_ids[0]))
+            compare_llms = self.chatView.get_compare_llms()
+            self.comparing = len(compare_llms) > 1
+            if self.comparing:
+                args_list = [self.chatView.create_args(text, chat_llm) for chat_llm in compare_llms]
+                self.chatView.add_compare_widget(compare_llms)
+                self.chatModel.send_compare_input(args_list, compare_llms)
+            else:
+                self.chatModel.send_user_input(self.chatView.create_args(text, self.llm), self.llm)
@@ -1,9 +1,10 @@
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 
 from chat.model.ClaudeThread import ClaudeThread
 from chat.model.GeminiThread import GeminiThread
 from chat.model.OllamaThread import OllamaThread
 from chat.model.OpenAIThread import OpenAIThread
+from util.AIWorkerPool import AIModel
 from util.Constants import AIProviderName, MODEL_MESSAGE
 
 
@@ -22,33 +23,51 @@ class AIThreadFactory:
             raise ValueError(f"{MODEL_MESSAGE.MODEL_UNSUPPORTED} {chat_llm}")
 
 
-class ChatModel(QObject):
-    thread_started_signal = pyqtSignal()
-    thread_finished_signal = pyqtSignal()
+class ChatModel(AIModel):
     response_signal = pyqtSignal(str, bool)
     response_finished_signal = pyqtSignal(str, str, float, bool)
+    compare_response_signal = pyqtSignal(int, str, bool)
+    compare_response_finished_signal = pyqtSignal(int, str, str, float, bool)
+    thread_factory = AIThreadFactory
 
     def __init__(self):
         super().__init__()
-        self.ai_thread = None
-
-    def send_user_input(self, args, chat_llm):
-        if self.ai_thread is not None and self.ai_thread.isRunning():
-            print(f"{MODEL_MESSAGE.THREAD_RUNNING}")
-            self.ai_thread.wait()
-
-        self.ai_thread = AIThreadFactory.create_thread(args, chat_llm)
-        self.ai_thread.started.connect(self.thread_started_signal.emit)
-        self.ai_thread.finished.connect(self.handle_thread_finished)
-        self.ai_thread.response_signal.connect(self.response_signal.emit)
-        self.ai_thread.response_finished_signal.connect(self.response_finished_signal.emit)
-        self.ai_thread.start()
-
-    def handle_thread_finished(self):
-        print(f"{MODEL_MESSAGE.THREAD_FINISHED}")
-        self.thread_finished_signal.emit()
-        self.ai_thread = None
-
-    def force_stop(self):
-        if self.ai_thread is not None:
-            self.ai_thread.set_force_stop(True)
+        self.compare_columns = {}
+
+    def send_compare_input(self, args_list, chat_llms):
+        # Every provider gets its own pool worker, so the answers arrive in the time of the slowest one
+        self.cancel_running_requests()
+        for column, (args, chat_llm) in enumerate(zip(args_list, chat_llms)):
+            ai_worker = self.create_worker(args, chat_llm)
+            ai_worker.response_signal.connect(self.handle_compare_response)
+            ai_worker.response_finished_signal.connect(self.handle_compare_response_finished)
+            self.compare_columns[self.submit_worker(ai_worker)] = column
+
+    def cancel_running_requests(self):
+        super().cancel_running_requests()
+        self.compare_columns = {}
+
+    def get_running_request_ids(self):
+        return super().get_running_request_ids() or list(self.compare_columns)
+
+    def get_compare_column(self):
+        ai_worker = self.sender()
+        return None if ai_worker is None else self.compare_columns.get(ai_worker.request_id)
+
+    def handle_compare_response(self, *args):
+        column = self.get_compare_column()
+        if column is not None:
+            self.compare_response_signal.emit(column, *args)
+
+    def handle_compare_response_finished(self, *args):
+        column = self.get_compare_column()
+        if column is not None:
+            self.compare_response_finished_signal.emit(column, *args)
+
+    def handle_thread_finished(self, request_id):
+        super().handle_thread_finished(request_id)
+        if request_id in self.compare_columns:
+            del self.compare_columns[request_id]
+            if not self.compare_columns:
+                print(f"{MODEL_MESSAGE.THREAD_FINISHED}")
+                self.thread_finished_signal.emit()
@@ -1,21 +1,21 @@
 import time
 
-import ollama
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 
+from util.AIWorkerPool import AIWorker, RequestCancelledError
+from util.ClientManager import ClientManager
 from util.Constants import Constants
 
 
-class OllamaThread(QThread):
+class OllamaThread(AIWorker):
     response_signal = pyqtSignal(str, bool)
     response_finished_signal = pyqtSignal(str, str, float, bool)
 
     def __init__(self, args):
         super().__init__()
         self.ai_arg = args['ai_arg']
-        self.ollama = ollama
+        self.ollama = ClientManager.get_ollama_client()
         self.stream = self.ai_arg['stream']
-        self.force_stop = False
         self.start_time = None
 
     def run(self):
@@ -26,16 +26,17 @@ class OllamaThread(QThread):
                 self.handle_stream_response(response)
             else:
                 self.handle_response(response)
-        except Exception as e:
-            self.response_signal.emit(str(e), self.stream)
+        except (RequestCancelledError, Exception) as e:
+            if self.force_stop:
+                self.finish_run(self.ai_arg['model'], Constants.FORCE_STOP, self.stream)
+            else:
+                self.flush_stream_text()
+                self.response_signal.emit(str(e), self.stream)
 
     def get_response(self, ai_arg):
         response = self.ollama.chat(**ai_arg)
         return response
 
-    def set_force_stop(self, force_stop):
-        self.force_stop = force_stop
-
     def handle_response(self, response):
         if self.force_stop:
             self.finish_run(response['model'], Constants.FORCE_STOP, self.stream)
@@ -55,13 +56,14 @@ class OllamaThread(QThread):
                 content = chunk['message']['content']
                 done = chunk['done']
                 if not done:
-                    self.response_signal.emit(content, self.stream)
+                    self.emit_stream_text(content)
                 else:
                     finish_reason = chunk['done_reason']
                     if finish_reason is not None:
                         self.finish_run(chunk['model'], finish_reason, self.stream)
 
     def finish_run(self, model, finish_reason, stream):
+        self.flush_stream_text()
         end_time = time.time()
         elapsed_time = end_time - self.start_time
         self.response_finished_signal.emit(model, finish_reason, elapsed_time, stream)
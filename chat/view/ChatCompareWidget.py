@@ -0,0 +1,54 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget, QHBoxLayout
+
+from chat.view.ChatWidget import ChatWidget
+from util.ChatType import ChatType
+from util.Constants import Constants
+
+
+class ChatCompareWidget(QWidget):
+    """One answer per provider, side by side, for a single question."""
+
+    def __init__(self, model_names):
+        super().__init__()
+        self.columns = []
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        for model_name in model_names:
+            column = ChatWidget(ChatType.AI)
+            column.set_model_name(Constants.MODEL_PREFIX + model_name)
+            layout.addWidget(column, 1, Qt.AlignmentFlag.AlignTop)
+            self.columns.append(column)
+
+    @classmethod
+    def with_answers(cls, answers):
+        compare_widget_instance = cls([model for model, _ in answers])
+        for column, (model, text) in zip(compare_widget_instance.columns, answers):
+            column.set_model_name(model)
+            column.set_text(text)
+        return compare_widget_instance
+
+    def get_column(self, index):
+        return self.columns[index]
+
+    def get_chat_type(self):
+        return ChatType.AI
+
+    def get_text(self):
+        return '\n\n'.join(column.get_text() for column in self.columns if column.get_text())
+
+    def get_original_text(self):
+        return '\n\n'.join(column.get_original_text() for column in self.columns if column.get_original_text())
+
+    def highlight_search_text(self, target_text, search_text):
+        # Each column highlights its own text in apply_highlight
+        return search_text
+
+    def apply_highlight(self, search_text):
+        for column in self.columns:
+            column.apply_highlight(column.highlight_search_text(column.get_original_text(), search_text))
+
+    def show_original_text(self):
+        for column in self.columns:
+            column.show_original_text()
@@ -3,6 +3,7 @@ from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QScrollArea, QSizePolicy, QSplitter, QComboBox, QLabel, QTabWidget, \
     QGroupBox, QFormLayout, QCheckBox, QPushButton, QHBoxLayout, QApplication, QTextEdit
 
+from chat.view.ChatCompareWidget import ChatCompareWidget
 from chat.view.ChatHistory import ChatHistory
 from chat.view.ChatPromptListWidget import ChatPromptListWidget
 from chat.view.ChatWidget import ChatWidget
@@ -22,6 +23,7 @@ class ChatView(QWidget):
     stop_signal = pyqtSignal()
     chat_llm_signal = pyqtSignal(str)
     reload_chat_detail_signal = pyqtSignal(int)
+    load_older_chat_detail_signal = pyqtSignal()
 
     def __init__(self, model):
         super().__init__()
@@ -30,6 +32,7 @@ class ChatView(QWidget):
         self._current_chat_llm = Utility.get_settings_value(section="AI_Provider", prop="llm",
                                                             default="OpenAI", save=True)
         self.found_text_positions = []
+        self.older_history = []
 
         self.initialize_ui()
 
@@ -94,6 +97,7 @@ class ChatView(QWidget):
         self.ai_answer_scroll_area = QScrollArea()
         self.ai_answer_scroll_area.setWidgetResizable(True)
         self.ai_answer_scroll_area.setWidget(self.result_widget)
+        self.ai_answer_scroll_area.verticalScrollBar().valueChanged.connect(self.on_scroll_value_changed)
 
         # Stop Button
         self.stop_button = QPushButton(QIcon(Utility.get_icon_path('ico', 'minus-circle.png')), 'Stop')
@@ -196,6 +200,27 @@ class ChatView(QWidget):
     def scroll_to_match_widget(self, position):
         self.ai_answer_scroll_area.ensureWidgetVisible(self.result_layout.itemAt(position).widget())
 
+    def scroll_to_message_widget(self, position):
+        if 0 <= position < self.result_layout.count():
+            self.result_layout.activate()
+            self.result_widget.adjustSize()
+            self.scroll_to_match_widget(position)
+
+    def on_scroll_value_changed(self, value):
+        scroll_bar = self.ai_answer_scroll_area.verticalScrollBar()
+        if value == scroll_bar.minimum() and scroll_bar.maximum() > scroll_bar.minimum():
+            self.load_older_chat_detail_signal.emit()
+
+    def get_scroll_offset_from_bottom(self):
+        scroll_bar = self.ai_answer_scroll_area.verticalScrollBar()
+        return scroll_bar.maximum() - scroll_bar.value()
+
+    def restore_scroll_offset_from_bottom(self, offset):
+        self.result_layout.activate()
+        self.result_widget.adjustSize()
+        scroll_bar = self.ai_answer_scroll_area.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum() - offset)
+
     def scroll_to_previous_match_widget(self):
         if len(self.found_text_positions) > 0 and self.current_position_index > 0:
             self.current_position_index -= 1
@@ -224,10 +249,30 @@ class ChatView(QWidget):
         self.tabs.addTab(self.create_ollama_tabcontent(AIProviderName.OLLAMA.value), AIProviderName.OLLAMA.value)
         self.tabs.currentChanged.connect(self.on_tab_change)
         layout.addWidget(self.tabs)
+        layout.addWidget(self.create_compare_layout())
 
         layoutWidget.setLayout(layout)
         return layoutWidget
 
+    def create_compare_layout(self):
+        groupCompare = QGroupBox(UI.COMPARE)
+        compareLayout = QHBoxLayout()
+        for name in [self.tabs.tabText(index) for index in range(self.tabs.count())]:
+            compareCheckbox = QCheckBox(name)
+            compareCheckbox.setObjectName(f"{name}_compareCheckbox")
+            compareCheckbox.setChecked(
+                (Utility.get_settings_value(section=f"{name}_Model_Parameter", prop="compare", default="False",
+                                            save=True)) == "True")
+            compareCheckbox.toggled.connect(lambda value, name=name: self.compare_changed(value, name))
+            compareLayout.addWidget(compareCheckbox)
+        groupCompare.setToolTip(UI.COMPARE_TIP)
+        groupCompare.setLayout(compareLayout)
+        return groupCompare
+
+    def get_compare_llms(self):
+        return [self.tabs.tabText(index) for index in range(self.tabs.count())
+                if self.findChild(QCheckBox, f"{self.tabs.tabText(index)}_compareCheckbox").isChecked()]
+
     def on_tab_change(self, index):
         self._current_chat_llm = self.tabs.tabText(index)
         self._settings.setValue('AI_Provider/llm', self._current_chat_llm)
@@ -876,6 +921,12 @@ class ChatView(QWidget):
         else:
             self._settings.setValue(f"{name}_Model_Parameter/stream", 'False')
 
+    def compare_changed(self, checked, name):
+        if checked:
+            self._settings.setValue(f"{name}_Model_Parameter/compare", 'True')
+        else:
+            self._settings.setValue(f"{name}_Model_Parameter/compare", 'False')
+
     def create_system_layout(self, name):
         groupSystem = QGroupBox(f"{name} System")
         systemLayout = QFormLayout()
@@ -941,6 +992,23 @@ class ChatView(QWidget):
         user_question = ChatWidget(chatType, text)
         self.result_layout.addWidget(user_question)
 
+    def insert_chat_widget(self, index, chatType, text):
+        chat_widget = ChatWidget(chatType, text)
+        self.result_layout.insertWidget(index, chat_widget)
+        return chat_widget
+
+    def insert_compare_widget(self, index, answers):
+        compare_widget = ChatCompareWidget.with_answers(answers)
+        self.result_layout.insertWidget(index, compare_widget)
+        return compare_widget
+
+    def add_compare_widget(self, chat_llms):
+        compare_widget = ChatCompareWidget(chat_llms)
+        self.result_layout.addWidget(compare_widget)
+
+    def set_older_history(self, older_history):
+        self.older_history = older_history
+
     def adjust_scroll_bar(self, min_val, max_val):
         self.ai_answer_scroll_area.verticalScrollBar().setSliderPosition(max_val)
 
@@ -973,6 +1041,33 @@ class ChatView(QWidget):
             chatWidget.set_model_name(
                 Constants.MODEL_PREFIX + model + Constants.RESPONSE_TIME + format(elapsed_time, ".2f"))
 
+    def update_compare_ui(self, column, result, stream):
+        compare_widget = self.get_last_compare_widget()
+        if compare_widget:
+            if stream:
+                compare_widget.get_column(column).add_text(result)
+            else:
+                compare_widget.get_column(column).set_text(result)
+
+    def update_compare_ui_finish(self, column, model, finish_reason, elapsed_time, stream):
+        compare_widget = self.get_last_compare_widget()
+        if compare_widget:
+            chatWidget = compare_widget.get_column(column)
+            if stream:
+                chatWidget.apply_style()
+            chatWidget.set_model_name(
+                Constants.MODEL_PREFIX + model + Constants.RESPONSE_TIME + format(elapsed_time, ".2f"))
+
+    def finish_compare(self):
+        self.ai_answer_scroll_area.verticalScrollBar().rangeChanged.disconnect()
+        self.stop_widget.setVisible(False)
+
+    def get_last_compare_widget(self) -> ChatCompareWidget | None:
+        layout_item = self.result_widget.layout().itemAt(self.result_widget.layout().count() - 1)
+        if layout_item and isinstance(layout_item.widget(), ChatCompareWidget):
+            return layout_item.widget()
+        return None
+
     def get_last_ai_widget(self) -> ChatWidget | None:
         layout_item = self.result_widget.layout().itemAt(self.result_widget.layout().count() - 1)
         if layout_item:
@@ -1011,6 +1106,11 @@ class ChatView(QWidget):
                                             default="[Answer]", save=True)
 
         all_previous_qa = []
+        for chat_type, text in self.older_history:
+            if chat_type == ChatType.HUMAN.value and text:
+                all_previous_qa.append(f'{question}: {text}')
+            elif chat_type == ChatType.AI.value and text:
+                all_previous_qa.append(f'{answer}: {text}')
         for i in range(self.result_layout.count()):
             current_widget = self.result_layout.itemAt(i).widget()
             if current_widget.get_chat_type() == ChatType.HUMAN and len(current_widget.get_text()) > 0:
@@ -1312,6 +1412,7 @@ class ChatView(QWidget):
         return safety_settings
 
     def clear_all(self):
+        self.older_history = []
         target_layout = self.result_layout
         if target_layout is not None:
             while target_layout.count():
@@ -1,5 +1,7 @@
 from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
 
+from util.Utility import Utility
+
 
 class ChatListModel(QAbstractListModel):
     new_chat_main_id_signal = pyqtSignal(int)
@@ -17,6 +19,8 @@ class ChatListModel(QAbstractListModel):
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if role == Qt.ItemDataRole.DisplayRole:
             return self.filtered_chat_items[index.row()]['title']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return Utility.format_conversation_summary(self.filtered_chat_items[index.row()])
 
     def add_new_chat(self, title):
         chat_main_id = self.database.add_chat_main(title)
@@ -52,6 +56,31 @@ class ChatListModel(QAbstractListModel):
                 return i
         return None
 
+    def record_chat_activity(self, chat_main_id, model=None):
+        item = next((item for item in self.chat_items if item['id'] == chat_main_id), None)
+        if item is None:
+            return
+        item['message_count'] = (item.get('message_count') or 0) + 1
+        item['last_activity_at'] = Utility.get_current_timestamp()
+        if model:
+            item['last_model'] = model
+        self.chat_items.remove(item)
+        self.chat_items.insert(0, item)
+        row = self.get_index_by_chat_main_id(chat_main_id)
+        if row is None:
+            return
+        if row > 0:
+            self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), 0)
+            self.filtered_chat_items.insert(0, self.filtered_chat_items.pop(row))
+            self.endMoveRows()
+        self.dataChanged.emit(self.index(0), self.index(0), [Qt.ItemDataRole.ToolTipRole])
+
+    def reload_chat_list(self):
+        self.beginResetModel()
+        self.chat_items = self.database.get_all_chat_main_list()
+        self.filtered_chat_items = self.chat_items.copy()
+        self.endResetModel()
+
     def filter_by_title(self, title):
         self.beginResetModel()
         if title and title.strip():
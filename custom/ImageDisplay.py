@@ -1,5 +1,3 @@
-import base64
-
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem
@@ -12,7 +10,7 @@ class ImageDisplay(QGraphicsView):
         self.scene = QGraphicsScene()
         self.item = QGraphicsPixmapItem()
         self._pixmap = QPixmap()
-        self.image_data = base64.b64decode(image_data)
+        self.image_data = image_data
         self.pixmap.loadFromData(self.image_data)
 
         self.show_image()
@@ -18,6 +18,9 @@ class ImagePresenter(QWidget):
         super().__init__()
         self._image_main_id = None
         self._image_main_index = None
+        self.turn = None
+        self.image_data = None
+        self.revised_prompt = None
         self.initialize_manager()
         self.initialize_ui()
 
@@ -50,8 +53,10 @@ class ImagePresenter(QWidget):
         # Model signal
         self.imageModel.thread_started_signal.connect(self.imageView.start_chat)
         self.imageModel.thread_finished_signal.connect(self.imageView.finish_chat)
+        self.imageModel.thread_finished_signal.connect(self.commit_turn)
         self.imageModel.response_signal.connect(self.handle_response_signal)
         self.imageModel.response_finished_signal.connect(self.handle_response_finished_signal)
+        self.imageModel.error_signal.connect(self.handle_error_signal)
 
         # View
         main_layout = QVBoxLayout()
@@ -69,19 +74,35 @@ class ImagePresenter(QWidget):
         self.image_main_id = image_main_id
         self.view.clear_all()
 
-    @pyqtSlot(str, str)
+    @pyqtSlot(bytes, str)
     def handle_response_signal(self, image_data, revised_prompt):
         self.image_data = image_data
         self.revised_prompt = revised_prompt
         self.imageView.update_ui(self.image_data, revised_prompt)
 
+    @pyqtSlot(str)
+    def handle_error_signal(self, error):
+        # Shown as the answer text; the failed request is not stored
+        self.imageView.update_ui(b"", error)
+
     @pyqtSlot(str, str, float, bool)
     def handle_response_finished_signal(self, model, finish_reason, elapsed_time, stream):
         self.imageView.update_ui_finish(model, finish_reason, elapsed_time, stream)
-        image_detail_id = self._database.insert_image_detail(self.image_main_id, ChatType.AI.value, model,
-                                                             self.image_text, self.view.creation_type,
-                                                             self.revised_prompt, elapsed_time, finish_reason)
-        self._database.insert_image_file(image_detail_id, self.image_data)
+        # A request stopped before any image arrived only keeps the question
+        if self.image_data is not None:
+            self._database.insert_image_detail_with_files(self.image_main_id, ChatType.AI.value, model,
+                                                          self.image_text, self.view.creation_type,
+                                                          self.revised_prompt, elapsed_time, finish_reason,
+                                                          [(self.image_data, Constants.IMAGE_PNG_MIME_TYPE)],
+                                                          turn=self.turn)
+            self.imageViewModel.record_image_activity(self.image_main_id, model)
+        self.commit_turn()
+
+    @pyqtSlot()
+    def commit_turn(self):
+        if self.turn is not None:
+            self.turn.commit()
+            self.turn = None
 
     @property
     def model(self):
@@ -133,21 +154,21 @@ class ImagePresenter(QWidget):
             self.image_main_id = id
             self.view.clear_all()
             self.view.reset_search_bar()
-            image_detail_list = self._database.get_all_image_details_list(id)
+            image_detail_list = self._database.get_all_image_details_with_files(id)
             for image_detail in image_detail_list:
                 if image_detail['image_type'] == ChatType.HUMAN.value:
-                    image_detail_id = f"{Constants.IMAGE_DETAIL_TABLE_ID_NAME}{id}_{image_detail['id']}"
-                    image_detail_file_list = self._database.get_all_image_details_file_list(image_detail_id)
                     file_list = []
-                    for image_detail_file in image_detail_file_list:
+                    for image_detail_file in image_detail['files']:
+                        extension = Utility.get_extension_from_mime_type(
+                            image_detail_file['image_detail_file_mime_type'], Constants.VISION_IMAGE_EXTENSION)
                         file_list.append(Utility.create_temp_file(image_detail_file['image_detail_file_data'],
-                                                                  Constants.VISION_IMAGE_EXTENSION, True))
+                                                                  extension, False))
 
                     self.view.add_user_question(ChatType.HUMAN, image_detail['image_text'], file_list)
-                else:
-                    image_detail_id = f"{Constants.IMAGE_DETAIL_TABLE_ID_NAME}{id}_{image_detail['id']}"
-                    image_detail_file = self._database.get_image_detail_file(image_detail_id)
-                    self.view.update_ui(image_detail_file['image_detail_file_data'], image_detail['image_revised_prompt'])
+                elif image_detail['files']:
+                    image_detail_file = image_detail['files'][0]
+                    self.view.update_ui(image_detail_file['image_detail_file_data'],
+                                        image_detail['image_revised_prompt'])
                     self.view.get_last_ai_widget().set_model_name(
                         Constants.MODEL_PREFIX + image_detail['image_model']
                         + Constants.RESPONSE_TIME + format(float(image_detail['elapsed_time']), ".2f"))
@@ -159,19 +180,20 @@ class ImagePresenter(QWidget):
         self.imageViewModel.add_new_image(title)
 
     def add_human_image(self, text, file_list):
-        if self.image_main_id:
-            image_detail_id = self._database.insert_image_detail(self.image_main_id, ChatType.HUMAN.value,
-                                                                 None, text, self.view.creation_type,
-                                                                 None, None, None)
-        else:
+        if not self.image_main_id:
             self.create_new_image()
-            image_detail_id = self._database.insert_image_detail(self.image_main_id, ChatType.HUMAN.value,
-                                                                 None, text, self.view.creation_type,
-                                                                 None, None, None)
-
-        if self.view.creation_type in [Constants.DALLE_EDIT, Constants.DALLE_VARIATION] and image_detail_id:
-            for file in file_list:
-                self._database.insert_image_file(image_detail_id, Utility.base64_encode_file(file))
+        self.commit_turn()
+        self.turn = self._database.begin_turn()
+        self.image_data = None
+        self.revised_prompt = None
+
+        image_files = []
+        if self.view.creation_type in [Constants.DALLE_EDIT, Constants.DALLE_VARIATION] and file_list:
+            image_files = [(Utility.read_file(file), Utility.get_mime_type(file)) for file in file_list]
+        self._database.insert_image_detail_with_files(self.image_main_id, ChatType.HUMAN.value,
+                                                      None, text, self.view.creation_type,
+                                                      None, None, None, image_files, turn=self.turn)
+        self.imageViewModel.record_image_activity(self.image_main_id)
 
     @pyqtSlot(str, list)
     def submit(self, text, file_list):
@@ -1,5 +1,7 @@
 from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
 
+from util.Utility import Utility
+
 
 class ImageListModel(QAbstractListModel):
     new_image_main_id_signal = pyqtSignal(int)
@@ -17,6 +19,8 @@ class ImageListModel(QAbstractListModel):
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if role == Qt.ItemDataRole.DisplayRole:
             return self.filtered_image_items[index.row()]['title']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return Utility.format_conversation_summary(self.filtered_image_items[index.row()])
 
     def add_new_image(self, title):
         image_main_id = self.database.add_image_main(title)
@@ -52,6 +56,31 @@ class ImageListModel(QAbstractListModel):
                 return i
         return None
 
+    def record_image_activity(self, image_main_id, model=None):
+        item = next((item for item in self.image_items if item['id'] == image_main_id), None)
+        if item is None:
+            return
+        item['message_count'] = (item.get('message_count') or 0) + 1
+        item['last_activity_at'] = Utility.get_current_timestamp()
+        if model:
+            item['last_model'] = model
+        self.image_items.remove(item)
+        self.image_items.insert(0, item)
+        row = self.get_index_by_image_main_id(image_main_id)
+        if row is None:
+            return
+        if row > 0:
+            self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), 0)
+            self.filtered_image_items.insert(0, self.filtered_image_items.pop(row))
+            self.endMoveRows()
+        self.dataChanged.emit(self.index(0), self.index(0), [Qt.ItemDataRole.ToolTipRole])
+
+    def reload_image_list(self):
+        self.beginResetModel()
+        self.image_items = self.database.get_all_image_main_list()
+        self.filtered_image_items = self.image_items.copy()
+        self.endResetModel()
+
     def filter_by_title(self, title):
         self.beginResetModel()
         if title and title.strip():
@@ -1,6 +1,7 @@
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 
 from image.model.OpenAIImageThread import OpenAIImageThread
+from util.AIWorkerPool import AIModel
 from util.Constants import AIProviderName, MODEL_MESSAGE
 
 
@@ -13,33 +14,17 @@ class AIThreadFactory:
             raise ValueError(f"{MODEL_MESSAGE.MODEL_UNSUPPORTED} {llm}")
 
 
-class ImageModel(QObject):
-    thread_started_signal = pyqtSignal()
-    thread_finished_signal = pyqtSignal()
-    response_signal = pyqtSignal(str, str)
+class ImageModel(AIModel):
+    response_signal = pyqtSignal(bytes, str)
     response_finished_signal = pyqtSignal(str, str, float, bool)
+    error_signal = pyqtSignal(str)
+    thread_factory = AIThreadFactory
 
-    def __init__(self):
-        super().__init__()
-        self.ai_thread = None
+    def create_worker(self, args, llm):
+        ai_worker = super().create_worker(args, llm)
+        ai_worker.error_signal.connect(self.handle_error)
+        return ai_worker
 
-    def send_user_input(self, args, llm):
-        if self.ai_thread is not None and self.ai_thread.isRunning():
-            print(f"{MODEL_MESSAGE.THREAD_RUNNING}")
-            self.ai_thread.wait()
-
-        self.ai_thread = AIThreadFactory.create_thread(args, llm)
-        self.ai_thread.started.connect(self.thread_started_signal.emit)
-        self.ai_thread.finished.connect(self.handle_thread_finished)
-        self.ai_thread.response_signal.connect(self.response_signal.emit)
-        self.ai_thread.response_finished_signal.connect(self.response_finished_signal.emit)
-        self.ai_thread.start()
-
-    def handle_thread_finished(self):
-        print(f"{MODEL_MESSAGE.THREAD_FINISHED}")
-        self.thread_finished_signal.emit()
-        self.ai_thread = None
-
-    def force_stop(self):
-        if self.ai_thread is not None:
-            self.ai_thread.set_force_stop(True)
+    def handle_error(self, error):
+        if self.is_current_request():
+            self.error_signal.emit(error)
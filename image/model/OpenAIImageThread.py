@@ -1,25 +1,27 @@
+import base64
 import time
 
 import openai
-from PyQt6.QtCore import QThread, pyqtSignal
-from openai import OpenAI
+from PyQt6.QtCore import pyqtSignal
 
+from util.AIWorkerPool import AIWorker, RequestCancelledError
+from util.ClientManager import ClientManager
 from util.Constants import Constants, MODEL_MESSAGE
 
 
-class OpenAIImageThread(QThread):
-    response_signal = pyqtSignal(str, str)
+class OpenAIImageThread(AIWorker):
+    response_signal = pyqtSignal(bytes, str)
     response_finished_signal = pyqtSignal(str, str, float, bool)
+    error_signal = pyqtSignal(str)
 
     def __init__(self, args):
         super().__init__()
         self.openai_arg = args['ai_arg']
         self.stream = args['stream']
-        self.openai = OpenAI(api_key=args['api_key'])
+        self.openai = ClientManager.get_openai_client(args['api_key'])
         self.model = self.openai_arg['model']
         self.number_of_images = self.openai_arg['n']
         self.creation_type = args['creation_type']
-        self.force_stop = False
         self.start_time = None
 
     def run(self):
@@ -27,8 +29,12 @@ class OpenAIImageThread(QThread):
         try:
             response = self.get_response(self.openai_arg)
             self.handle_response(response)
-        except openai.OpenAIError as e:
-            self.response_signal.emit(str(e.error), None)
+        except (RequestCancelledError, openai.OpenAIError) as e:
+            if self.force_stop:
+                self.finish_run(self.model, Constants.FORCE_STOP, self.stream)
+            else:
+                self.error_signal.emit(str(e))
+                self.finish_run(self.model, Constants.ERROR_STOP, self.stream)
 
     def get_response(self, openai_arg):
         if self.creation_type == Constants.DALLE_CREATE:
@@ -40,9 +46,6 @@ class OpenAIImageThread(QThread):
         else:
             raise ValueError(f"{MODEL_MESSAGE.INVALID_CREATION_TYPE} {self.creation_type}")
 
-    def set_force_stop(self, force_stop):
-        self.force_stop = force_stop
-
     def handle_response(self, response):
         if self.force_stop:
             self.finish_run(self.model, Constants.FORCE_STOP, self.stream)
@@ -50,7 +53,7 @@ class OpenAIImageThread(QThread):
             count = len(response.data)
             for i in range(count):
                 item = response.data[i]
-                self.response_signal.emit(item.b64_json, item.revised_prompt)
+                self.response_signal.emit(base64.b64decode(item.b64_json), item.revised_prompt)
                 self.finish_run(self.model, Constants.NORMAL_STOP, self.stream)
 
     def finish_run(self, model, finish_reason, stream):
@@ -9,7 +9,7 @@ from util.Utility import Utility
 
 
 class ImageWidget(QWidget):
-    def __init__(self, chat_type: ChatType, image_data: str = None, revised_prompt: str = None):
+    def __init__(self, chat_type: ChatType, image_data: bytes = None, revised_prompt: str = None):
         super().__init__()
         self.chat_type = chat_type
         self.scale_ratio = Constants.SCALE_RATIO
@@ -1,21 +1,25 @@
 import sys
+import time
 from os import path
 
-from PyQt6.QtCore import QSize, QFile
-from PyQt6.QtGui import QIcon, QAction, QGuiApplication, QPixmap, QFont
+from PyQt6.QtCore import QSize, QFile, QTimer, QEvent
+from PyQt6.QtGui import QIcon, QAction, QGuiApplication, QPixmap, QFont, QKeySequence
 from PyQt6.QtWidgets import QMainWindow, QApplication, QWidget, QMenu, QToolBar, QHBoxLayout, \
     QPushButton, QWidgetAction, QSpacerItem, QSizePolicy, QStackedWidget, QStyleFactory, QSplashScreen, \
-    QMessageBox, QLabel
+    QMessageBox, QLabel, QFileDialog
 
 from chat.ChatPresenter import ChatPresenter
 from image.ImagePresenter import ImagePresenter
 from stt.STTPresenter import STTPresenter
 from tts.TTSPresenter import TTSPresenter
 from util.AnimatedProgressBar import AnimatedProgressBar
+from util.AIWorkerPool import AIWorkerPool
 from util.AppInfoDialog import AppInfoDialog
+from util.ClientManager import ClientManager
 from util.Constants import Constants, MainWidgetIndex, UI, AIProviderName
 from util.DataManager import DataManager
 from util.GlobalSetting import GlobalSetting
+from util.SearchDialog import SearchDialog
 from util.SettingsManager import SettingsManager
 from util.Utility import Utility
 from util.VerticalLine import VerticalLine
@@ -49,6 +53,7 @@ class MainWindow(QMainWindow):
         self.progress_bar = None
         self.current_llm = None
         self.current_system = None
+        self.database_compaction_time = None
 
     def initialize_ui(self):
 
@@ -75,6 +80,8 @@ class MainWindow(QMainWindow):
         self._stt.model.response_finished_signal.connect(self.show_result_info)
 
         self.set_main_widgets()
+        self.set_idle_compaction()
+        self.set_database_backup()
 
         self.show()
 
@@ -125,10 +132,27 @@ class MainWindow(QMainWindow):
         self.tts_action.setStatusTip(UI.TTS_TIP)
         self.tts_action.triggered.connect(lambda: self.set_current_widget(MainWidgetIndex.TTS_WIDGET))
 
+        self.search_action = QAction(UI.SEARCH, self)
+        self.search_action.setStatusTip(UI.SEARCH_TIP)
+        self.search_action.setShortcut(QKeySequence(UI.SEARCH_SHORTCUT))
+        self.search_action.triggered.connect(self.open_search)
+
         self.setting_action = QAction("Setting", self)
         self.setting_action.setStatusTip(UI.SETTING_TIP)
         self.setting_action.triggered.connect(self.open_global_setting)
 
+        self.export_history_action = QAction(UI.EXPORT_HISTORY, self)
+        self.export_history_action.setStatusTip(UI.EXPORT_HISTORY_TIP)
+        self.export_history_action.triggered.connect(self.export_history)
+
+        self.import_history_action = QAction(UI.IMPORT_HISTORY, self)
+        self.import_history_action.setStatusTip(UI.IMPORT_HISTORY_TIP)
+        self.import_history_action.triggered.connect(self.import_history)
+
+        self.backup_action = QAction(UI.DATABASE_BACKUP_NOW, self)
+        self.backup_action.setStatusTip(UI.DATABASE_BACKUP_NOW_TIP)
+        self.backup_action.triggered.connect(lambda: self.start_database_backup(True))
+
         self.close_action = QAction("Close", self)
         self.close_action.setStatusTip(UI.CLOSE_TIP)
         self.close_action.triggered.connect(self.close)
@@ -152,6 +176,10 @@ class MainWindow(QMainWindow):
         file_menu = QMenu(UI.FILE, self)
         file_menu.addAction(self.setting_action)
         file_menu.addSeparator()
+        file_menu.addAction(self.export_history_action)
+        file_menu.addAction(self.import_history_action)
+        file_menu.addAction(self.backup_action)
+        file_menu.addSeparator()
         file_menu.addAction(self.close_action)
         menubar.addMenu(file_menu)
 
@@ -161,6 +189,8 @@ class MainWindow(QMainWindow):
         view_menu.addAction(self.vision_action)
         view_menu.addAction(self.tts_action)
         view_menu.addAction(self.stt_action)
+        view_menu.addSeparator()
+        view_menu.addAction(self.search_action)
         menubar.addMenu(view_menu)
 
         help_menu = QMenu(UI.HELP, self)
@@ -240,12 +270,158 @@ class MainWindow(QMainWindow):
 
     def set_statusbar(self):
         self.status_bar = self.statusBar()
+        self.database_status_label = QLabel()
+        self.status_bar.addWidget(self.database_status_label)
+        self.show_database_status()
+
+    def show_database_status(self):
+        text = UI.DATABASE_SIZE + Utility.format_byte_size(self._database.get_database_size())
+        if self.database_compaction_time is not None:
+            text += " | " + UI.DATABASE_COMPACTED + format(self.database_compaction_time, ".2f") + "s"
+        self.database_status_label.setText(text)
+
+    def set_idle_compaction(self):
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(Constants.DATABASE_COMPACTION_IDLE_MS)
+        self.idle_timer.timeout.connect(self.start_database_compaction)
+        self.idle_timer.start()
+        QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, source, event):
+        if event.type() in [QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress, QEvent.Type.Wheel]:
+            self.idle_timer.start()
+        return super().eventFilter(source, event)
+
+    def start_database_compaction(self):
+        audio_days = int(Utility.get_settings_value(section=Constants.DATABASE_RETENTION_SECTION,
+                                                    prop=Constants.DATABASE_RETENTION_AUDIO_DAYS,
+                                                    default="0", save=True))
+        image_days = int(Utility.get_settings_value(section=Constants.DATABASE_RETENTION_SECTION,
+                                                    prop=Constants.DATABASE_RETENTION_IMAGE_DAYS,
+                                                    default="0", save=True))
+        archive_days = int(Utility.get_settings_value(section=Constants.DATABASE_RETENTION_SECTION,
+                                                      prop=Constants.DATABASE_RETENTION_ARCHIVE_DAYS,
+                                                      default=Constants.DATABASE_ARCHIVE_DEFAULT_DAYS, save=True))
+        compaction_thread = self._database.start_compaction(audio_days, image_days, archive_days)
+        if compaction_thread:
+            compaction_thread.conversion_started_signal.connect(self.show_database_conversion)
+            compaction_thread.compaction_finished_signal.connect(self.finish_database_compaction)
+
+    def set_database_backup(self):
+        self.backup_timer = QTimer(self)
+        self.backup_timer.setInterval(Constants.DATABASE_BACKUP_CHECK_MS)
+        self.backup_timer.timeout.connect(lambda: self.start_database_backup(False))
+        self.backup_timer.start()
+        QTimer.singleShot(0, lambda: self.start_database_backup(False))
+
+    def start_database_backup(self, manual):
+        interval_hours = int(Utility.get_settings_value(section=Constants.DATABASE_BACKUP_SECTION,
+                                                        prop=Constants.DATABASE_BACKUP_INTERVAL_HOURS,
+                                                        default=Constants.DATABASE_BACKUP_DEFAULT_INTERVAL_HOURS,
+                                                        save=True))
+        keep_count = int(Utility.get_settings_value(section=Constants.DATABASE_BACKUP_SECTION,
+                                                    prop=Constants.DATABASE_BACKUP_KEEP_COUNT,
+                                                    default=Constants.DATABASE_BACKUP_DEFAULT_KEEP_COUNT, save=True))
+        if not manual:
+            latest_backup_time = self._database.get_latest_backup_time()
+            if interval_hours <= 0 or (latest_backup_time is not None
+                                       and time.time() - latest_backup_time < interval_hours * 3600):
+                return
+        backup_thread = self._database.start_backup(keep_count)
+        if backup_thread is None:
+            if manual:
+                QMessageBox.warning(self, UI.WARNING_TITLE, UI.DATABASE_BACKUP_RUNNING)
+            return
+        backup_thread.progress_signal.connect(self.show_database_backup_progress)
+        backup_thread.backup_finished_signal.connect(
+            lambda snapshot_filename, elapsed_time, error: self.finish_database_backup(manual, elapsed_time, error))
+
+    def show_database_backup_progress(self, written_bytes, expected_bytes):
+        self.database_status_label.setText(UI.DATABASE_BACKING_UP + Utility.format_byte_size(written_bytes)
+                                           + " / " + Utility.format_byte_size(expected_bytes))
+
+    def finish_database_backup(self, manual, elapsed_time, error):
+        self.show_database_status()
+        if error:
+            QMessageBox.warning(self, UI.WARNING_TITLE, UI.DATABASE_BACKUP_FAILED + error)
+        elif manual:
+            QMessageBox.information(self, UI.DATABASE_BACKUP,
+                                    UI.DATABASE_BACKUP_FINISHED + format(elapsed_time, ".2f") + "s")
+
+    def show_database_conversion(self, database_size):
+        self.database_status_label.setText(UI.DATABASE_CONVERTING + Utility.format_byte_size(database_size))
+
+    def finish_database_compaction(self, freed_bytes, elapsed_time):
+        self.database_compaction_time = elapsed_time
+        self.show_database_status()
+
+    def export_history(self):
+        export_filename, _ = QFileDialog.getSaveFileName(self, UI.EXPORT_HISTORY, "", UI.HISTORY_FILE_FILTER)
+        if not export_filename:
+            return
+        history_thread = self._database.start_history_export(export_filename)
+        if history_thread is None:
+            QMessageBox.warning(self, UI.WARNING_TITLE, UI.HISTORY_TRANSFER_RUNNING)
+            return
+        history_thread.progress_signal.connect(
+            lambda row_count: self.database_status_label.setText(UI.HISTORY_EXPORTING + str(row_count) + UI.HISTORY_ROWS))
+        history_thread.export_finished_signal.connect(self.finish_history_export)
+
+    def finish_history_export(self, row_count, elapsed_time, error):
+        self.show_database_status()
+        if error:
+            QMessageBox.warning(self, UI.WARNING_TITLE, UI.HISTORY_TRANSFER_FAILED + error)
+        else:
+            QMessageBox.information(self, UI.EXPORT_HISTORY,
+                                    UI.HISTORY_EXPORT_FINISHED + str(row_count) + f" ({elapsed_time:.2f}s)")
+
+    def import_history(self):
+        import_filename, _ = QFileDialog.getOpenFileName(self, UI.IMPORT_HISTORY, "", UI.HISTORY_FILE_FILTER)
+        if not import_filename:
+            return
+        history_thread = self._database.start_history_import(import_filename)
+        if history_thread is None:
+            QMessageBox.warning(self, UI.WARNING_TITLE, UI.HISTORY_TRANSFER_RUNNING)
+            return
+        history_thread.progress_signal.connect(
+            lambda row_count: self.database_status_label.setText(UI.HISTORY_IMPORTING + str(row_count) + UI.HISTORY_ROWS))
+        history_thread.import_finished_signal.connect(self.finish_history_import)
+
+    def finish_history_import(self, row_count, elapsed_time, error):
+        self._chat.chatViewModel.reload_chat_list()
+        self._image.imageViewModel.reload_image_list()
+        self._vision.visionViewModel.reload_vision_list()
+        self._tts.ttsViewModel.reload_tts_list()
+        self._stt.sttViewModel.reload_stt_list()
+        self.show_database_status()
+        if error:
+            QMessageBox.warning(self, UI.WARNING_TITLE, UI.HISTORY_TRANSFER_FAILED + error)
+        else:
+            QMessageBox.information(self, UI.IMPORT_HISTORY,
+                                    UI.HISTORY_IMPORT_FINISHED + str(row_count) + f" ({elapsed_time:.2f}s)")
 
     def open_global_setting(self):
         self.toggle_buttons(self.setting_button)
         self.global_settings = GlobalSetting()
         self.global_settings.exec()
 
+    def open_search(self):
+        search_dialog = SearchDialog(self._database)
+        search_dialog.message_selected_signal.connect(self.show_search_result)
+        search_dialog.exec()
+
+    def show_search_result(self, source, main_id, message_id):
+        search_targets = {
+            Constants.SEARCH_SOURCE_CHAT: (self.chat_button, self._chat.show_chat_message),
+            Constants.SEARCH_SOURCE_VISION: (self.vision_button, self._vision.show_vision_message),
+            Constants.SEARCH_SOURCE_TTS: (self.tts_button, self._tts.show_tts_message),
+            Constants.SEARCH_SOURCE_STT: (self.stt_button, self._stt.show_stt_message),
+        }
+        button, show_message = search_targets[source]
+        self.toggle_buttons(button)
+        show_message(main_id, message_id)
+
     def show_result_info(self, model=None, finish_reason=None, elapsed_time=None, stream=False):
         boldFont = QFont()
         boldFont.setBold(True)
@@ -282,7 +458,8 @@ class MainWindow(QMainWindow):
         status_bar.setFont(boldFont)
 
         for widget in status_bar.findChildren(QWidget):
-            status_bar.removeWidget(widget)
+            if widget is not self.database_status_label:
+                status_bar.removeWidget(widget)
 
         if self.progress_bar:
             self.progress_bar.stop_animation()
@@ -314,6 +491,7 @@ class MainWindow(QMainWindow):
             status_bar.addPermanentWidget(VerticalLine())
             status_bar.addPermanentWidget(finish_reason_label)
             status_bar.addPermanentWidget(VerticalLine())
+            self.show_database_status()
 
         else:
             self.progress_bar = AnimatedProgressBar()
@@ -328,6 +506,9 @@ class MainWindow(QMainWindow):
         self.toggle_buttons(self.exit_button)
         should_close = Utility.confirm_dialog(UI.EXIT_APPLICATION_TITLE, UI.EXIT_APPLICATION_MESSAGE)
         if should_close:
+            AIWorkerPool.shutdown()
+            self._database.close()
+            ClientManager.close_all()
             event.accept()
         else:
             event.ignore()
@@ -1,4 +1,6 @@
-from PyQt6.QtCore import pyqtSlot
+from functools import partial
+
+from PyQt6.QtCore import pyqtSlot, QTimer
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QDialog, QMessageBox
 
 from stt.model.STTListModel import STTListModel
@@ -18,6 +20,9 @@ class STTPresenter(QWidget):
         super().__init__()
         self._stt_main_id = None
         self._stt_main_index = None
+        self.turn = None
+        self.stt_text = None
+        self.response_format = None
         self.initialize_manager()
         self.initialize_ui()
 
@@ -49,6 +54,7 @@ class STTPresenter(QWidget):
         # Model signal
         self.sttModel.thread_started_signal.connect(self.sttView.start_chat)
         self.sttModel.thread_finished_signal.connect(self.sttView.finish_chat)
+        self.sttModel.thread_finished_signal.connect(self.commit_turn)
         self.sttModel.response_signal.connect(self.handle_response_signal)
         self.sttModel.response_finished_signal.connect(self.handle_response_finished_signal)
 
@@ -77,8 +83,19 @@ class STTPresenter(QWidget):
     @pyqtSlot(str, str, float, bool)
     def handle_response_finished_signal(self, model, finish_reason, elapsed_time, stream):
         self.sttView.update_ui_finish(model, finish_reason, elapsed_time, stream)
-        self._database.insert_stt_detail(self.stt_main_id, ChatType.AI.value, model, self.stt_text,
-                                         self.response_format, None, elapsed_time, finish_reason)
+        # A request stopped before any transcript arrived only keeps the question
+        if self.stt_text is not None:
+            self._database.insert_stt_detail(self.stt_main_id, ChatType.AI.value, model, self.stt_text,
+                                             self.response_format, None, elapsed_time, finish_reason,
+                                             turn=self.turn)
+            self.sttViewModel.record_stt_activity(self.stt_main_id, model)
+        self.commit_turn()
+
+    @pyqtSlot()
+    def commit_turn(self):
+        if self.turn is not None:
+            self.turn.commit()
+            self.turn = None
 
     @property
     def model(self):
@@ -130,12 +147,14 @@ class STTPresenter(QWidget):
             self.stt_main_id = id
             self.view.clear_all()
             self.view.reset_search_bar()
-            stt_detail_list = self._database.get_all_stt_details_list(id)
+            stt_detail_list = self._database.get_all_stt_details_metadata_list(id)
             for stt_detail in stt_detail_list:
                 if stt_detail['stt_type'] == ChatType.HUMAN.value:
-                    self.view.add_user_question(ChatType.HUMAN, None,
-                                                Utility.create_temp_file(stt_detail['stt_data'],
-                                                                         self.sttView.stt_response_format, True))
+                    extension = Utility.get_extension_from_mime_type(stt_detail['stt_data_mime_type'],
+                                                                     self.sttView.stt_response_format)
+                    audio_loader = partial(self.load_stt_audio, stt_detail['id'], extension) \
+                        if stt_detail['has_stt_data'] else None
+                    self.view.add_user_question_with_loader(ChatType.HUMAN, None, audio_loader)
                 else:
                     self.view.add_ai_answer(ChatType.AI, stt_detail['stt_text'],
                                             Constants.MODEL_PREFIX + stt_detail['stt_model'])
@@ -143,6 +162,20 @@ class STTPresenter(QWidget):
                         Constants.MODEL_PREFIX + stt_detail['stt_model']
                         + Constants.RESPONSE_TIME + format(float(stt_detail['elapsed_time']), ".2f"))
 
+    def show_stt_message(self, stt_main_id, stt_message_id):
+        self.stt_main_id = None
+        self.show_stt_detail(stt_main_id)
+        position = self._database.get_message_position(self._database.stt_message_table_name, "stt_main_id",
+                                                       stt_main_id, stt_message_id)
+        if position is not None:
+            QTimer.singleShot(0, lambda: self.view.scroll_to_message_widget(position))
+
+    def load_stt_audio(self, stt_detail_id, extension):
+        stt_data = self._database.get_stt_data(stt_detail_id)
+        if stt_data is None:
+            return None
+        return Utility.create_temp_file(stt_data, extension, False)
+
     def delete_stt(self, index):
         self.sttViewModel.remove_stt(index)
 
@@ -150,15 +183,16 @@ class STTPresenter(QWidget):
         self.sttViewModel.add_new_stt(title)
 
     def add_human_stt(self, text, filepath):
-        if self.stt_main_id:
-            self._database.insert_stt_detail(self.stt_main_id, ChatType.HUMAN.value, self.sttView.stt_model, text,
-                                             self.sttView.stt_response_format, Utility.base64_encode_file(filepath),
-                                             None, None)
-        else:
+        if not self.stt_main_id:
             self.create_new_stt()
-            self._database.insert_stt_detail(self.stt_main_id, ChatType.HUMAN.value, self.sttView.stt_model, text,
-                                             self.sttView.stt_response_format, Utility.base64_encode_file(filepath),
-                                             None, None)
+        self.commit_turn()
+        self.turn = self._database.begin_turn()
+        self.stt_text = None
+        self.response_format = None
+        self._database.insert_stt_detail(self.stt_main_id, ChatType.HUMAN.value, self.sttView.stt_model, text,
+                                         self.sttView.stt_response_format, Utility.read_file(filepath),
+                                         None, None, Utility.get_mime_type(filepath), turn=self.turn)
+        self.sttViewModel.record_stt_activity(self.stt_main_id, self.sttView.stt_model)
 
     @pyqtSlot(str, str)
     def submit(self, text, filepath):
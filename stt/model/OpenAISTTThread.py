@@ -1,24 +1,24 @@
 import time
 
-from PyQt6.QtCore import QThread, pyqtSignal
-from openai import OpenAI
+from PyQt6.QtCore import pyqtSignal
 
+from util.AIWorkerPool import AIWorker, RequestCancelledError
+from util.ClientManager import ClientManager
 from util.Constants import Constants, UI
 
 
-class OpenAISTTThread(QThread):
+class OpenAISTTThread(AIWorker):
     response_signal = pyqtSignal(str, str)
     response_finished_signal = pyqtSignal(str, str, float, bool)
 
     def __init__(self, args):
         super().__init__()
         self.openai_arg = args['ai_arg']
-        self.openai = OpenAI(api_key=args['api_key'])
+        self.openai = ClientManager.get_openai_client(args['api_key'])
         self.response_format = self.openai_arg['response_format']
         self.model = self.openai_arg['model']
         self.translation = args['translation']
         self.stream = args['stream']
-        self.force_stop = False
         self.start_time = None
 
     def run(self):
@@ -26,8 +26,11 @@ class OpenAISTTThread(QThread):
         try:
             response = self.get_response(self.openai_arg)
             self.handle_response(response)
-        except Exception as e:
-            self.response_signal.emit(str(e), self.response_format)
+        except (RequestCancelledError, Exception) as e:
+            if self.force_stop:
+                self.finish_run(self.model, Constants.FORCE_STOP, self.stream)
+            else:
+                self.response_signal.emit(str(e), self.response_format)
 
     def get_response(self, openai_arg):
         if self.translation:
@@ -36,9 +39,6 @@ class OpenAISTTThread(QThread):
             response = self.openai.audio.transcriptions.create(**openai_arg)
         return response
 
-    def set_force_stop(self, force_stop):
-        self.force_stop = force_stop
-
     def handle_response(self, response):
         if self.force_stop:
             self.finish_run(self.model, Constants.FORCE_STOP, self.stream)
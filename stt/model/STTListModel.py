@@ -1,5 +1,7 @@
 from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, pyqtSignal
 
+from util.Utility import Utility
+
 
 class STTListModel(QAbstractListModel):
     new_stt_main_id_signal = pyqtSignal(int)
@@ -17,6 +19,8 @@ class STTListModel(QAbstractListModel):
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if role == Qt.ItemDataRole.DisplayRole:
             return self.filtered_stt_items[index.row()]['title']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return Utility.format_conversation_summary(self.filtered_stt_items[index.row()])
 
     def add_new_stt(self, title):
         stt_main_id = self.database.add_stt_main(title)
@@ -52,6 +56,31 @@ class STTListModel(QAbstractListModel):
                 return i
         return None
 
+    def record_stt_activity(self, stt_main_id, model=None):
+        item = next((item for item in self.stt_items if item['id'] == stt_main_id), None)
+        if item is None:
+            return
+        item['message_count'] = (item.get('message_count') or 0) + 1
+        item['last_activity_at'] = Utility.get_current_timestamp()
+        if model:
+            item['last_model'] = model
+        self.stt_items.remove(item)
+        self.stt_items.insert(0, item)
+        row = self.get_index_by_stt_main_id(stt_main_id)
+        if row is None:
+            return
+        if row > 0:
+            self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), 0)
+            self.filtered_stt_items.insert(0, self.filtered_stt_items.pop(row))
+            self.endMoveRows()
+        self.dataChanged.emit(self.index(0), self.index(0), [Qt.ItemDataRole.ToolTipRole])
+
+    def reload_stt_list(self):
+        self.beginResetModel()
+        self.stt_items = self.database.get_all_stt_main_list()
+        self.filtered_stt_items = self.stt_items.copy()
+        self.endResetModel()
+
     def filter_by_title(self, title):
         self.beginResetModel()
         if title and title.strip():
@@ -186,6 +186,12 @@ class STTView(QWidget):
     def scroll_to_match_widget(self, position):
         self.ai_answer_scroll_area.ensureWidgetVisible(self.result_layout.itemAt(position).widget())
 
+    def scroll_to_message_widget(self, position):
+        if 0 <= position < self.result_layout.count():
+            self.result_layout.activate()
+            self.result_widget.adjustSize()
+            self.scroll_to_match_widget(position)
+
     def scroll_to_previous_match_widget(self):
         if len(self.found_text_positions) > 0 and self.current_position_index > 0:
             self.current_position_index -= 1
@@ -518,6 +524,10 @@ class STTView(QWidget):
         user_question = STTWidget(chatType, text, filepath)
         self.result_layout.addWidget(user_question)
 
+    def add_user_question_with_loader(self, chatType, text, audio_loader):
+        user_question = STTWidget(chatType, text, audio_loader=audio_loader)
+        self.result_layout.addWidget(user_question)
+
     def add_ai_answer(self, chatType, text, model):
         ai_answer = ChatWidget.with_model(chatType, text, model)
         self.result_layout.addWidget(ai_answer)
@@ -11,7 +11,7 @@ from util.Utility import Utility
 
 
 class STTWidget(QWidget):
-    def __init__(self, chat_type: ChatType, text: str, filepath: str):
+    def __init__(self, chat_type: ChatType, text: str, filepath: str = None, audio_loader=None):
         super().__init__()
         self.chat_type = chat_type
         self.text_result = text
@@ -19,10 +19,11 @@ class STTWidget(QWidget):
         self.user_text = QLabel(self.text_result)
         self.format_text_label()
 
-        self.filepath = filepath
-
         self.audio_player = AudioPlayerWidget()
-        self.audio_player.set_audio_file(filepath)
+        if filepath:
+            self.audio_player.set_audio_file(filepath)
+        if audio_loader:
+            self.audio_player.set_audio_loader(audio_loader)
 
         self.initialize_ui()
 
@@ -1,5 +1,7 @@
+from functools import partial
+
 from PyQt6.QtCore import QByteArray
-from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtCore import pyqtSlot, QTimer
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QDialog, QMessageBox
 
 from tts.model.TTSListModel import TTSListModel
@@ -10,6 +12,7 @@ from util.ConfirmationDialog import ConfirmationDialog
 from util.Constants import Constants, AIProviderName, UI
 from util.DataManager import DataManager
 from util.SettingsManager import SettingsManager
+from util.Utility import Utility
 
 
 class TTSPresenter(QWidget):
@@ -18,6 +21,9 @@ class TTSPresenter(QWidget):
         super().__init__()
         self._tts_main_id = None
         self._tts_main_index = None
+        self.turn = None
+        self.tts_data = None
+        self.response_format = None
         self.initialize_manager()
         self.initialize_ui()
 
@@ -50,6 +56,7 @@ class TTSPresenter(QWidget):
         # Model signal
         self.ttsModel.thread_started_signal.connect(self.ttsView.start_chat)
         self.ttsModel.thread_finished_signal.connect(self.ttsView.finish_chat)
+        self.ttsModel.thread_finished_signal.connect(self.commit_turn)
         self.ttsModel.response_signal.connect(self.handle_response_signal)
         self.ttsModel.response_finished_signal.connect(self.handle_response_finished_signal)
 
@@ -78,8 +85,19 @@ class TTSPresenter(QWidget):
     @pyqtSlot(str, str, float, bool)
     def handle_response_finished_signal(self, model, finish_reason, elapsed_time, stream):
         self.ttsView.update_ui_finish(model, finish_reason, elapsed_time, stream)
-        self._database.insert_tts_detail(self.tts_main_id, ChatType.AI.value, model, None,
-                                         self.response_format, self.tts_data, elapsed_time, finish_reason)
+        # A request stopped before any audio arrived only keeps the question
+        if self.tts_data is not None:
+            self._database.insert_tts_detail(self.tts_main_id, ChatType.AI.value, model, None,
+                                             self.response_format, self.tts_data, elapsed_time, finish_reason,
+                                             turn=self.turn)
+            self.ttsViewModel.record_tts_activity(self.tts_main_id, model)
+        self.commit_turn()
+
+    @pyqtSlot()
+    def commit_turn(self):
+        if self.turn is not None:
+            self.turn.commit()
+            self.turn = None
 
     @property
     def model(self):
@@ -131,16 +149,33 @@ class TTSPresenter(QWidget):
             self.tts_main_id = id
             self.view.clear_all()
             self.view.reset_search_bar()
-            tts_detail_list = self._database.get_all_tts_details_list(id)
+            tts_detail_list = self._database.get_all_tts_details_metadata_list(id)
             for tts_detail in tts_detail_list:
                 if tts_detail['tts_type'] == ChatType.HUMAN.value:
                     self.view.add_user_question(ChatType.HUMAN, tts_detail['tts_text'])
                 else:
-                    self.view.add_ai_answer(ChatType.AI, tts_detail['tts_data'], tts_detail['tts_response_format'])
+                    # Audio removed by retention gets no loader, so the player stays disabled
+                    audio_loader = partial(self.load_tts_audio, tts_detail['id'], tts_detail['tts_response_format']) \
+                        if tts_detail['has_tts_data'] else None
+                    self.view.add_ai_answer_with_loader(ChatType.AI, audio_loader)
                     self.view.get_last_ai_widget().set_model_name(
                         Constants.MODEL_PREFIX + tts_detail['tts_model']
                         + Constants.RESPONSE_TIME + format(float(tts_detail['elapsed_time']), ".2f"))
 
+    def show_tts_message(self, tts_main_id, tts_message_id):
+        self.tts_main_id = None
+        self.show_tts_detail(tts_main_id)
+        position = self._database.get_message_position(self._database.tts_message_table_name, "tts_main_id",
+                                                       tts_main_id, tts_message_id)
+        if position is not None:
+            QTimer.singleShot(0, lambda: self.view.scroll_to_message_widget(position))
+
+    def load_tts_audio(self, tts_detail_id, tts_response_format):
+        tts_data = self._database.get_tts_data(tts_detail_id)
+        if tts_data is None:
+            return None
+        return Utility.create_temp_file(tts_data, tts_response_format, False)
+
     def delete_tts(self, index):
         self.ttsViewModel.remove_tts(index)
 
@@ -148,13 +183,15 @@ class TTSPresenter(QWidget):
         self.ttsViewModel.add_new_tts(title)
 
     def add_human_tts(self, text):
-        if self.tts_main_id:
-            self._database.insert_tts_detail(self.tts_main_id, ChatType.HUMAN.value, None, text,
-                                             None, None, None, None)
-        else:
+        if not self.tts_main_id:
             self.create_new_tts()
-            self._database.insert_tts_detail(self.tts_main_id, ChatType.HUMAN.value, None, text,
-                                             None, None, None, None)
+        self.commit_turn()
+        self.turn = self._database.begin_turn()
+        self.tts_data = None
+        self.response_format = None
+        self._database.insert_tts_detail(self.tts_main_id, ChatType.HUMAN.value, None, text,
+                                         None, None, None, None, turn=self.turn)
+        self.ttsViewModel.record_tts_activity(self.tts_main_id)
 
     @pyqtSlot(str)
     def submit(self, text):
@@ -1,6 +1,7 @@
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 
 from tts.model.OpenAITTSThread import OpenAITTSThread
+from util.AIWorkerPool import AIModel
 from util.Constants import AIProviderName, MODEL_MESSAGE
 
 
@@ -13,33 +14,7 @@ class AIThreadFactory:
             raise ValueError(f"{MODEL_MESSAGE.MODEL_UNSUPPORTED} {llm}")
 
 
-class TTSModel(QObject):
-    thread_started_signal = pyqtSignal()
-    thread_finished_signal = pyqtSignal()
+class TTSModel(AIModel):
     response_signal = pyqtSignal(bytes, str)
     response_finished_signal = pyqtSignal(str, str, float, bool)
-
-    def __init__(self):
-        super().__init__()
-        self.ai_thread = None
-
-    def send_user_input(self, args, llm):
-        if self.ai_thread is not None and self.ai_thread.isRunning():
-            print(f"{MODEL_MESSAGE.THREAD_RUNNING}")
-            self.ai_thread.wait()
-
-        self.ai_thread = AIThreadFactory.create_thread(args, llm)
-        self.ai_thread.started.connect(self.thread_started_signal.emit)
-        self.ai_thread.finished.connect(self.handle_thread_finished)
-        self.ai_thread.response_signal.connect(self.response_signal.emit)
-        self.ai_thread.response_finished_signal.connect(self.response_finished_signal.emit)
-        self.ai_thread.start()
-
-    def handle_thread_finished(self):
-        print(f"{MODEL_MESSAGE.THREAD_FINISHED}")
-        self.thread_finished_signal.emit()
-        self.ai_thread = None
-
-    def force_stop(self):
-        if self.ai_thread is not None:
-            self.ai_thread.set_force_stop(True)
+    thread_factory = AIThreadFactory
@@ -19,6 +19,9 @@ class AudioPlayerWidget(QWidget):
         self.mediaPlayer.setAudioOutput(self.audioOutput)
         self.mediaPlayer.mediaStatusChanged.connect(self.on_media_status_changed)
         self.isMediaLoaded = False
+        self.filepath = None
+        self.audio_loader = None
+        self.play_when_loaded = False
         self.initialize_ui()
 
     def initialize_ui(self):
@@ -54,8 +57,17 @@ class AudioPlayerWidget(QWidget):
 
         self.setLayout(layout)
 
+    def set_audio_loader(self, audio_loader):
+        self.audio_loader = audio_loader
+        self.playButton.setEnabled(True)
+
+    def load_audio_file(self):
+        if self.filepath is None and self.audio_loader is not None:
+            self.set_audio_file(self.audio_loader())
+        return self.filepath
+
     def set_audio_file(self, filepath):
-        if not os.path.isfile(filepath):
+        if not filepath or not os.path.isfile(filepath):
             print(f"{UI.FILE_NOT_EXIST} {filepath}")
             return
         self.filepath = filepath
@@ -63,6 +75,10 @@ class AudioPlayerWidget(QWidget):
         self.audioOutput.setVolume(1)
 
     def play_audio(self):
+        if self.filepath is None and self.audio_loader is not None:
+            self.play_when_loaded = True
+            self.load_audio_file()
+            return
         if self.isMediaLoaded:
             if self.mediaPlayer.mediaStatus() == QMediaPlayer.MediaStatus.EndOfMedia:
                 self.mediaPlayer.setPosition(0)
@@ -111,6 +127,9 @@ class AudioPlayerWidget(QWidget):
             self.isMediaLoaded = True
             self.playButton.setEnabled(True)
             self.stopButton.setEnabled(True)
+            if self.play_when_loaded:
+                self.play_when_loaded = False
+                self.play_audio()
         elif status == QMediaPlayer.MediaStatus.EndOfMedia:
             self.reset_player_ui()
         elif status == QMediaPlayer.MediaStatus.NoMedia:
@@ -189,6 +189,12 @@ class TTSView(QWidget):
     def scroll_to_match_widget(self, position):
         self.ai_answer_scroll_area.ensureWidgetVisible(self.result_layout.itemAt(position).widget())
 
+    def scroll_to_message_widget(self, position):
+        if 0 <= position < self.result_layout.count():
+            self.result_layout.activate()
+            self.result_widget.adjustSize()
+            self.scroll_to_match_widget(position)
+
     def scroll_to_previous_match_widget(self):
         if len(self.found_text_positions) > 0 and self.current_position_index > 0:
             self.current_position_index -= 1
@@ -491,6 +497,10 @@ class TTSView(QWidget):
         ai_answer = TTSWidget(chatType, temp_file_name)
         self.result_layout.addWidget(ai_answer)
 
+    def add_ai_answer_with_loader(self, chatType, audio_loader):
+        ai_answer = TTSWidget(chatType, audio_loader=audio_loader)
+        self.result_layout.addWidget(ai_answer)
+
     def update_ui_submit(self, chatType, text):
         self.add_user_question(chatType, text)
         self.stop_widget.setVisible(True)
@@ -11,13 +11,15 @@ from util.Utility import Utility
 
 
 class TTSWidget(QWidget):
-    def __init__(self, chat_type: ChatType, filepath: str):
+    def __init__(self, chat_type: ChatType, filepath: str = None, audio_loader=None):
         super().__init__()
         self.chat_type = chat_type
-        self.filepath = filepath
 
         self.audio_player = AudioPlayerWidget()
-        self.audio_player.set_audio_file(filepath)
+        if filepath:
+            self.audio_player.set_audio_file(filepath)
+        if audio_loader:
+            self.audio_player.set_audio_loader(audio_loader)
 
         self.initialize_ui()
 
@@ -98,12 +100,16 @@ class TTSWidget(QWidget):
     def set_model_name(self, name):
         self.model_label.setText(name)
 
+    @property
+    def filepath(self):
+        return self.audio_player.load_audio_file()
+
     def copy_audio(self):
         dest_dir = QFileDialog.getExistingDirectory(self, UI.AUDIO_SELECT_FOLDER)
-        if dest_dir:
+        if dest_dir and self.filepath:
             copy2(self.filepath, dest_dir)
 
     def save_audio(self):
         dest_file, _ = QFileDialog.getSaveFileName(self, UI.AUDIO_SAVE)
-        if dest_file:
+        if dest_file and self.filepath:
             copy2(self.filepath, dest_file)
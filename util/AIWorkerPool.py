@@ -0,0 +1,289 @@
+import itertools
+import logging
+from abc import ABCMeta, abstractmethod
+import queue
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from util.Constants import Constants, MODEL_MESSAGE
+
+
+class RequestCancelledError(BaseException):
+    """Not an Exception, like asyncio.CancelledError, so the SDK retry loops let it through."""
+    pass
+
+
+class CancellationToken:
+    __current = threading.local()
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.network_stream = None
+
+    @classmethod
+    def get_current(cls):
+        return getattr(cls.__current, "token", None)
+
+    @classmethod
+    def set_current(cls, token):
+        cls.__current.token = token
+
+    def cancel(self):
+        with self.lock:
+            self.event.set()
+            if self.network_stream is not None:
+                self.network_stream.abort()
+
+    def is_cancelled(self):
+        return self.event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.is_cancelled():
+            raise RequestCancelledError(MODEL_MESSAGE.REQUEST_CANCELLED)
+
+    def begin_io(self, network_stream):
+        # Registered under the lock so cancel() either sees this stream or the read never starts
+        with self.lock:
+            self.raise_if_cancelled()
+            self.network_stream = network_stream
+
+    def end_io(self):
+        with self.lock:
+            self.network_stream = None
+        self.raise_if_cancelled()
+
+
+class AIWorkerMeta(type(QObject), ABCMeta):
+    pass
+
+
+class AIWorker(QObject, metaclass=AIWorkerMeta):
+    """One provider request; AIWorkerPool calls run() on a pool thread."""
+    started_signal = pyqtSignal(int)
+    finished_signal = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.request_id = None
+        self.cancellation_token = CancellationToken()
+        self.stream_lock = threading.RLock()
+        self.stream_buffer = []
+        self.stream_buffer_size = 0
+        self.stream_flush_time = 0.0
+        self.stream_delta_count = 0
+        self.stream_signal_count = 0
+
+    @property
+    def force_stop(self):
+        return self.cancellation_token.is_cancelled()
+
+    def cancel(self):
+        self.cancellation_token.cancel()
+
+    @abstractmethod
+    def run(self):
+        pass
+
+    def emit_stream_text(self, text):
+        # Deltas are batched per frame; the first one goes out at once to keep first-token latency
+        with self.stream_lock:
+            self.stream_buffer.append(text)
+            self.stream_buffer_size += len(text)
+            self.stream_delta_count += 1
+            flush_deadline = self.stream_flush_time + 1 / Constants.STREAM_FLUSH_RATE
+            if time.perf_counter() >= flush_deadline or self.stream_buffer_size >= Constants.STREAM_FLUSH_SIZE:
+                self.flush_stream_text()
+            else:
+                StreamFlushTimer.schedule(self, flush_deadline)
+
+    def flush_stream_text(self):
+        # Also called from StreamFlushTimer; emitting under the lock keeps the chunks in order
+        with self.stream_lock:
+            if not self.stream_buffer:
+                return
+            text = "".join(self.stream_buffer)
+            self.stream_buffer = []
+            self.stream_buffer_size = 0
+            self.stream_flush_time = time.perf_counter()
+            self.stream_signal_count += 1
+            self.response_signal.emit(text, True)
+
+
+class StreamFlushTimer:
+    """Static class flushing buffered stream text at its frame deadline while the worker is blocked reading."""
+    __condition = threading.Condition()
+    __deadlines = {}
+    __thread = None
+
+    @classmethod
+    def schedule(cls, worker, deadline):
+        with cls.__condition:
+            if worker in cls.__deadlines:
+                return
+            cls.__deadlines[worker] = deadline
+            if cls.__thread is None:
+                cls.__thread = threading.Thread(target=cls.run, name="stream_flush_timer", daemon=True)
+                cls.__thread.start()
+            cls.__condition.notify()
+
+    @classmethod
+    def run(cls):
+        while True:
+            with cls.__condition:
+                while not cls.__deadlines:
+                    cls.__condition.wait()
+                worker, deadline = min(cls.__deadlines.items(), key=lambda item: item[1])
+                timeout = deadline - time.perf_counter()
+                if timeout > 0:
+                    cls.__condition.wait(timeout)
+                    continue
+                del cls.__deadlines[worker]
+            worker.flush_stream_text()
+
+
+class AIWorkerThread(QThread):
+    def __init__(self, request_queue, active_workers, lock):
+        super().__init__()
+        self.request_queue = request_queue
+        self.active_workers = active_workers
+        self.lock = lock
+
+    def run(self):
+        while True:
+            worker = self.request_queue.get()
+            if worker is None:
+                break
+            if not worker.force_stop:
+                worker.started_signal.emit(worker.request_id)
+                CancellationToken.set_current(worker.cancellation_token)
+                try:
+                    worker.run()
+                except RequestCancelledError:
+                    pass
+                except Exception as e:
+                    logging.error(f"{MODEL_MESSAGE.UNEXPECTED_ERROR} {e}")
+                finally:
+                    CancellationToken.set_current(None)
+                if worker.stream_delta_count:
+                    logging.info(f"{MODEL_MESSAGE.STREAM_COALESCED} {worker.stream_delta_count} deltas in "
+                                 f"{worker.stream_signal_count} signals, "
+                                 f"{worker.stream_delta_count - worker.stream_signal_count} GUI events saved")
+            with self.lock:
+                self.active_workers.pop(worker.request_id, None)
+            worker.finished_signal.emit(worker.request_id)
+
+
+class AIWorkerPool:
+    """Static class running provider requests on a bounded set of persistent threads."""
+    __request_queue = queue.Queue()
+    __threads = []
+    __active_workers = {}
+    __request_ids = itertools.count(1)
+    __lock = threading.Lock()
+
+    @classmethod
+    def submit(cls, worker):
+        with cls.__lock:
+            worker.request_id = next(cls.__request_ids)
+            cls.__active_workers[worker.request_id] = worker
+            if not cls.__threads:
+                for _ in range(Constants.AI_WORKER_POOL_SIZE):
+                    thread = AIWorkerThread(cls.__request_queue, cls.__active_workers, cls.__lock)
+                    thread.start()
+                    cls.__threads.append(thread)
+        cls.__request_queue.put(worker)
+        return worker.request_id
+
+    @classmethod
+    def cancel(cls, request_id):
+        with cls.__lock:
+            worker = cls.__active_workers.get(request_id)
+        if worker is not None:
+            worker.cancel()
+
+    @classmethod
+    def get_active_count(cls):
+        with cls.__lock:
+            return len(cls.__active_workers)
+
+    @classmethod
+    def shutdown(cls):
+        with cls.__lock:
+            workers = list(cls.__active_workers.values())
+            threads = list(cls.__threads)
+            cls.__threads.clear()
+        for worker in workers:
+            worker.cancel()
+        for _ in threads:
+            cls.__request_queue.put(None)
+        for thread in threads:
+            thread.wait(Constants.AI_WORKER_SHUTDOWN_TIMEOUT_MS)
+
+
+class AIModel(QObject):
+    """Base for the models; passes on the signals of the current pool request and drops superseded ones."""
+    thread_started_signal = pyqtSignal()
+    thread_finished_signal = pyqtSignal()
+    thread_factory = None
+
+    def __init__(self):
+        super().__init__()
+        self.request_id = None
+        self.ai_workers = {}
+
+    def send_user_input(self, args, llm):
+        self.cancel_running_requests()
+        ai_worker = self.create_worker(args, llm)
+        ai_worker.response_signal.connect(self.handle_response)
+        ai_worker.response_finished_signal.connect(self.handle_response_finished)
+        self.request_id = self.submit_worker(ai_worker)
+
+    def create_worker(self, args, llm):
+        ai_worker = self.thread_factory.create_thread(args, llm)
+        ai_worker.started_signal.connect(self.handle_thread_started)
+        ai_worker.finished_signal.connect(self.handle_thread_finished)
+        return ai_worker
+
+    def submit_worker(self, ai_worker):
+        request_id = AIWorkerPool.submit(ai_worker)
+        self.ai_workers[request_id] = ai_worker
+        return request_id
+
+    def cancel_running_requests(self):
+        for request_id in self.get_running_request_ids():
+            print(f"{MODEL_MESSAGE.THREAD_RUNNING}")
+            AIWorkerPool.cancel(request_id)
+        self.request_id = None
+
+    def get_running_request_ids(self):
+        return [] if self.request_id is None else [self.request_id]
+
+    def is_current_request(self):
+        ai_worker = self.sender()
+        return ai_worker is not None and ai_worker.request_id == self.request_id
+
+    def handle_thread_started(self, request_id):
+        if request_id in self.get_running_request_ids():
+            self.thread_started_signal.emit()
+
+    def handle_response(self, *args):
+        if self.is_current_request():
+            self.response_signal.emit(*args)
+
+    def handle_response_finished(self, *args):
+        if self.is_current_request():
+            self.response_finished_signal.emit(*args)
+
+    def handle_thread_finished(self, request_id):
+        self.ai_workers.pop(request_id, None)
+        if request_id == self.request_id:
+            print(f"{MODEL_MESSAGE.THREAD_FINISHED}")
+            self.request_id = None
+            self.thread_finished_signal.emit()
+
+    def force_stop(self):
+        for request_id in self.get_running_request_ids():
+            AIWorkerPool.cancel(request_id)
@@ -0,0 +1,132 @@
+import base64
+import binascii
+import logging
+
+from PyQt6.QtCore import QByteArray, QThread, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.DatabaseConnectionManager import DatabaseConnectionManager
+from util.Utility import Utility
+
+
+class BlobMigrationThread(QThread):
+    progress_signal = pyqtSignal(str, int)
+
+    def __init__(self, db_filename, targets, blob_store_table_name, blob_store_targets):
+        super().__init__()
+        self.db_filename = db_filename
+        self.targets = targets
+        self.blob_store_table_name = blob_store_table_name
+        self.blob_store_targets = blob_store_targets
+        self.connection_name = Constants.BLOB_MIGRATION_CONNECTION
+
+    def run(self):
+        self.migrate_all()
+        QSqlDatabase.removeDatabase(self.connection_name)
+
+    def migrate_all(self):
+        db = DatabaseConnectionManager.open_connection(self.db_filename, self.connection_name)
+        if not db.isOpen():
+            return
+        query = QSqlQuery(db)
+
+        for table_name, data_column, mime_type_column in self.targets:
+            total = 0
+            try:
+                while not self.isInterruptionRequested():
+                    count = self.migrate_batch(db, table_name, data_column, mime_type_column)
+                    if count == 0:
+                        break
+                    total += count
+                    self.progress_signal.emit(table_name, total)
+                if total:
+                    logging.info(f"{DATABASE_MESSAGE.DATABASE_BLOB_MIGRATION_SUCCESS} {table_name}: {total}")
+            except Exception as e:
+                db.rollback()
+                logging.error(f"{DATABASE_MESSAGE.DATABASE_BLOB_MIGRATION_FAIL} {table_name}: {e}")
+
+        for table_name, data_column, mime_type_column in self.blob_store_targets:
+            total = 0
+            try:
+                while not self.isInterruptionRequested():
+                    count = self.migrate_blob_store_batch(db, table_name, data_column, mime_type_column)
+                    if count == 0:
+                        break
+                    total += count
+                    self.progress_signal.emit(table_name, total)
+                if total:
+                    logging.info(f"{DATABASE_MESSAGE.DATABASE_BLOB_STORE_MIGRATION_SUCCESS} {table_name}: {total}")
+            except Exception as e:
+                db.rollback()
+                logging.error(f"{DATABASE_MESSAGE.DATABASE_BLOB_STORE_MIGRATION_FAIL} {table_name}: {e}")
+        db.close()
+
+    def migrate_batch(self, db, table_name, data_column, mime_type_column):
+        select_query = QSqlQuery(db)
+        select_query.prepare(f"SELECT id, {data_column} FROM {table_name} "
+                             f" WHERE typeof({data_column}) = 'text' LIMIT :limit")
+        select_query.bindValue(":limit", Constants.BLOB_MIGRATION_BATCH_SIZE)
+        if not select_query.exec():
+            raise Exception(select_query.lastError().text())
+
+        rows = []
+        while select_query.next():
+            rows.append((select_query.value(0), select_query.value(1)))
+        select_query.finish()
+        if not rows:
+            return 0
+
+        db.transaction()
+        update_query = QSqlQuery(db)
+        update_query.prepare(f"UPDATE {table_name} SET {data_column} = :data, {mime_type_column} = :mime_type "
+                             f" WHERE id = :id")
+        for row_id, encoded_data in rows:
+            try:
+                data = base64.b64decode(encoded_data, validate=True)
+            except (binascii.Error, ValueError):
+                data = encoded_data.encode(errors='ignore')
+            update_query.bindValue(":data", QByteArray(data))
+            update_query.bindValue(":mime_type", Utility.guess_mime_type_from_data(data))
+            update_query.bindValue(":id", row_id)
+            if not update_query.exec():
+                raise Exception(update_query.lastError().text())
+        if not db.commit():
+            raise Exception(db.lastError().text())
+        return len(rows)
+
+    def migrate_blob_store_batch(self, db, table_name, data_column, mime_type_column):
+        select_query = QSqlQuery(db)
+        select_query.prepare(f"SELECT id, {data_column}, {mime_type_column} FROM {table_name} "
+                             f" WHERE blob_hash IS NULL AND typeof({data_column}) = 'blob' LIMIT :limit")
+        select_query.bindValue(":limit", Constants.BLOB_STORE_BATCH_SIZE)
+        if not select_query.exec():
+            raise Exception(select_query.lastError().text())
+
+        rows = []
+        while select_query.next():
+            rows.append((select_query.value(0), bytes(select_query.value(1)), select_query.value(2)))
+        select_query.finish()
+        if not rows:
+            return 0
+
+        db.transaction()
+        blob_query = QSqlQuery(db)
+        blob_query.prepare(f"INSERT OR IGNORE INTO {self.blob_store_table_name} (hash, data, mime_type) "
+                           f" VALUES (:hash, :data, :mime_type)")
+        update_query = QSqlQuery(db)
+        update_query.prepare(f"UPDATE {table_name} SET blob_hash = :hash, {data_column} = NULL WHERE id = :id")
+        for row_id, data, mime_type in rows:
+            blob_hash = Utility.get_content_hash(data)
+            blob_query.bindValue(":hash", blob_hash)
+            blob_query.bindValue(":data", QByteArray(data))
+            blob_query.bindValue(":mime_type", mime_type)
+            if not blob_query.exec():
+                raise Exception(blob_query.lastError().text())
+            update_query.bindValue(":hash", blob_hash)
+            update_query.bindValue(":id", row_id)
+            if not update_query.exec():
+                raise Exception(update_query.lastError().text())
+        if not db.commit():
+            raise Exception(db.lastError().text())
+        return len(rows)
@@ -0,0 +1,75 @@
+import socket
+
+from util.AIWorkerPool import CancellationToken
+
+
+class CancellableNetworkStream:
+    """Wraps an httpcore network stream so a cancelled worker's blocking read or write returns at once."""
+
+    def __init__(self, network_stream):
+        self.network_stream = network_stream
+
+    def read(self, max_bytes, timeout=None):
+        return self.perform_io(self.network_stream.read, max_bytes, timeout)
+
+    def write(self, buffer, timeout=None):
+        self.perform_io(self.network_stream.write, buffer, timeout)
+
+    def start_tls(self, ssl_context, server_hostname=None, timeout=None):
+        return CancellableNetworkStream(self.perform_io(self.network_stream.start_tls, ssl_context,
+                                                        server_hostname, timeout))
+
+    def perform_io(self, io, *args):
+        token = CancellationToken.get_current()
+        if token is None:
+            return io(*args)
+        token.begin_io(self)
+        try:
+            return io(*args)
+        finally:
+            token.end_io()
+
+    def abort(self):
+        # shutdown() wakes a recv/send blocked in another thread; the plain socket call also works under TLS
+        sock = self.network_stream.get_extra_info("socket")
+        if sock is not None:
+            try:
+                socket.socket.shutdown(sock, socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        self.network_stream.close()
+
+    def get_extra_info(self, info):
+        return self.network_stream.get_extra_info(info)
+
+
+class CancellableNetworkBackend:
+    def __init__(self, network_backend):
+        self.network_backend = network_backend
+
+    @classmethod
+    def install(cls, http_client):
+        # httpx has no network backend option, so wrap the one its connection pools already hold
+        for transport in [http_client._transport, *http_client._mounts.values()]:
+            pool = getattr(transport, "_pool", None)
+            if pool is not None and not isinstance(pool._network_backend, cls):
+                pool._network_backend = cls(pool._network_backend)
+        return http_client
+
+    def connect_tcp(self, *args, **kwargs):
+        return self.connect(self.network_backend.connect_tcp, *args, **kwargs)
+
+    def connect_unix_socket(self, *args, **kwargs):
+        return self.connect(self.network_backend.connect_unix_socket, *args, **kwargs)
+
+    @staticmethod
+    def connect(connect, *args, **kwargs):
+        token = CancellationToken.get_current()
+        if token is not None:
+            token.raise_if_cancelled()
+        return CancellableNetworkStream(connect(*args, **kwargs))
+
+    def sleep(self, seconds):
+        self.network_backend.sleep(seconds)
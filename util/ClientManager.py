@@ -0,0 +1,63 @@
+import threading
+
+import anthropic
+import httpx
+import ollama
+import openai
+
+from util.CancellableNetworkBackend import CancellableNetworkBackend
+from util.Constants import Constants, AIProviderName, MODEL_MESSAGE
+
+
+class ClientManager:
+    """Static class sharing provider SDK clients, and their keep-alive pools, across worker threads."""
+    __clients = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, provider, api_key, base_url=None):
+        key = (provider, api_key, base_url)
+        with cls.__lock:
+            client = cls.__clients.get(key)
+            if client is None:
+                client = cls.create_client(provider, api_key, base_url)
+                cls.__clients[key] = client
+        return client
+
+    @classmethod
+    def get_openai_client(cls, api_key, base_url=None):
+        return cls.get_client(AIProviderName.OPENAI.value, api_key, base_url)
+
+    @classmethod
+    def get_claude_client(cls, api_key, base_url=None):
+        return cls.get_client(AIProviderName.CLAUDE.value, api_key, base_url)
+
+    @classmethod
+    def get_ollama_client(cls):
+        # The ollama module routes every call through one module-level client
+        with cls.__lock:
+            CancellableNetworkBackend.install(ollama._client._client)
+        return ollama._client
+
+    @staticmethod
+    def create_client(provider, api_key, base_url):
+        limits = httpx.Limits(max_connections=Constants.PROVIDER_CLIENT_MAX_CONNECTIONS,
+                              max_keepalive_connections=Constants.PROVIDER_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+                              keepalive_expiry=Constants.PROVIDER_CLIENT_KEEPALIVE_EXPIRY)
+        if provider == AIProviderName.OPENAI.value:
+            return openai.OpenAI(api_key=api_key, base_url=base_url,
+                                 http_client=CancellableNetworkBackend.install(
+                                     openai.DefaultHttpxClient(limits=limits)))
+        if provider == AIProviderName.CLAUDE.value:
+            return anthropic.Anthropic(api_key=api_key, base_url=base_url,
+                                       http_client=CancellableNetworkBackend.install(
+                                           anthropic.DefaultHttpxClient(limits=limits)))
+        raise ValueError(f"{MODEL_MESSAGE.PROVIDER_CLIENT_UNSUPPORTED} {provider}")
+
+    @classmethod
+    def close_all(cls):
+        with cls.__lock:
+            clients = list(cls.__clients.values())
+            cls.__clients.clear()
+        for client in clients:
+            client.close()
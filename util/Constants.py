@@ -17,6 +17,7 @@ class Constants:
     FINISH_REASON = "Finish Reason: "
 
     FORCE_STOP = "Force Stop"
+    ERROR_STOP = "error"
     NORMAL_STOP = "stop"
     RESPONSE_TIME = " | Response Time : "
 
@@ -41,28 +42,160 @@ class Constants:
 
     CHAT_MAIN_TABLE = "chat_main"
     CHAT_DETAIL_TABLE = "chat_detail"
+    CHAT_MESSAGE_TABLE = "chat_message"
+    CHAT_MESSAGE_INDEX = "idx_chat_message_main_id"
+    CHAT_MAIN_ACTIVITY_INDEX = "idx_chat_main_last_activity"
+    CHAT_MESSAGE_FTS_TABLE = "chat_message_fts"
+    CHAT_DETAIL_PAGE_SIZE = 20
 
     IMAGE_MAIN_TABLE = "image_main"
     IMAGE_DETAIL_TABLE = "image_detail"
+    IMAGE_MESSAGE_TABLE = "image_message"
+    IMAGE_MESSAGE_INDEX = "idx_image_message_main_id"
+    IMAGE_MAIN_ACTIVITY_INDEX = "idx_image_main_last_activity"
     IMAGE_FILE_TABLE = "image_files"
-
-    IMAGE_DETAIL_TABLE_ID_NAME = "image_detail_"
+    IMAGE_FILE_INDEX = "idx_image_files_message_id"
 
     VISION_MAIN_TABLE = "vision_main"
     VISION_DETAIL_TABLE = "vision_detail"
+    VISION_MESSAGE_TABLE = "vision_message"
+    VISION_MESSAGE_INDEX = "idx_vision_message_main_id"
+    VISION_MAIN_ACTIVITY_INDEX = "idx_vision_main_last_activity"
+    VISION_MESSAGE_FTS_TABLE = "vision_message_fts"
     VISION_FILE_TABLE = "vision_files"
+    VISION_FILE_INDEX = "idx_vision_files_message_id"
 
-    VISION_DETAIL_TABLE_ID_NAME = "vision_detail_"
     VISION_IMAGE_EXTENSION = "png"
 
     TTS_MAIN_TABLE = "tts_main"
     TTS_DETAIL_TABLE = "tts_detail"
+    TTS_MESSAGE_TABLE = "tts_message"
+    TTS_MESSAGE_INDEX = "idx_tts_message_main_id"
+    TTS_MAIN_ACTIVITY_INDEX = "idx_tts_main_last_activity"
+    TTS_MESSAGE_FTS_TABLE = "tts_message_fts"
 
     STT_MAIN_TABLE = "stt_main"
     STT_DETAIL_TABLE = "stt_detail"
+    STT_MESSAGE_TABLE = "stt_message"
+    STT_MESSAGE_INDEX = "idx_stt_message_main_id"
+    STT_MAIN_ACTIVITY_INDEX = "idx_stt_main_last_activity"
+    STT_MESSAGE_FTS_TABLE = "stt_message_fts"
 
     CHAT_PROMPT_TABLE = "prompt"
 
+    BLOB_STORE_TABLE = "blob_store"
+
+    COMMITTED_TURN_TABLE = "committed_turn"  # Turns whose rows are committed, so a leftover journal is not replayed
+
+    DATABASE_MIGRATION_BATCH_SIZE = 100  # Legacy per-conversation tables moved per transaction
+
+    BLOB_MIGRATION_CONNECTION = "blob_migration"
+    BLOB_MIGRATION_BATCH_SIZE = 20  # Base64 attachments decoded per transaction
+    BLOB_STORE_BATCH_SIZE = 20  # Inline attachments moved into the blob store per transaction
+
+    # Full-text search
+    SEARCH_SOURCE_CHAT = "chat"
+    SEARCH_SOURCE_VISION = "vision"
+    SEARCH_SOURCE_TTS = "tts"
+    SEARCH_SOURCE_STT = "stt"
+    SEARCH_RESULT_LIMIT = 100
+    SEARCH_SNIPPET_TOKENS = 16
+    SEARCH_SNIPPET_ELLIPSIS = "..."
+    SEARCH_HIGHLIGHT_START = "\x02"
+    SEARCH_HIGHLIGHT_END = "\x03"
+
+    # Conversation summary columns kept up to date by message triggers
+    CONVERSATION_SUMMARY_COLUMNS = ["last_activity_at", "message_count", "last_model"]
+    DATABASE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"  # SQLite CURRENT_TIMESTAMP, in UTC
+    CONVERSATION_ACTIVITY_FORMAT = "%Y-%m-%d %H:%M"
+
+    # Message text compression
+    TEXT_COMPRESSION_MARKER = b"\x1fzlib:"  # Prefix of compressed text; plain rows are stored as TEXT
+    TEXT_COMPRESSION_THRESHOLD = 4096  # Encoded bytes before a message text is stored compressed
+    TEXT_COMPRESSION_LEVEL = 6
+
+    DATABASE_DEFAULT_CONNECTION = "qt_sql_default_connection"
+    DATABASE_THREAD_CONNECTION_PREFIX = "database_thread_"  # Followed by a process-wide connection counter
+    DATABASE_WRITER_CONNECTION = "database_writer"
+    DATABASE_WRITER_BATCH_SIZE = 50  # Queued writes committed per transaction
+    STATEMENT_CACHE_SIZE = 64  # Prepared statements kept per connection
+    PENDING_TURN_SUFFIX = "-turns"  # Journal directory for turns not yet committed
+    PENDING_TURN_EXTENSION = ".jsonl"
+
+    # Compaction and retention
+    DATABASE_COMPACTION_CONNECTION = "database_compaction"
+    DATABASE_COMPACTION_IDLE_MS = 5 * 60 * 1000  # User inactivity before background compaction starts
+    DATABASE_COMPACTION_PAGES = 1024  # Free pages released per incremental vacuum step
+    DATABASE_RETENTION_SECTION = "Database_Retention"
+    DATABASE_RETENTION_AUDIO_DAYS = "audio-days"
+    DATABASE_RETENTION_IMAGE_DAYS = "image-days"
+    DATABASE_RETENTION_ARCHIVE_DAYS = "archive-days"
+    DATABASE_ARCHIVE_DEFAULT_DAYS = "180"
+    DATABASE_RETENTION_MAX_DAYS = 3650
+    DATABASE_AUTO_VACUUM_INCREMENTAL = 2
+    DATABASE_BUSY_ERROR_CODE = "5"
+    DATABASE_CONSTRAINT_ERROR_CODE = 19  # Low byte of every extended constraint code (FOREIGN KEY is 787)
+
+    # Online backup
+    DATABASE_BACKUP_CONNECTION = "database_backup"
+    DATABASE_BACKUP_SECTION = "Database_Backup"
+    DATABASE_BACKUP_INTERVAL_HOURS = "interval-hours"
+    DATABASE_BACKUP_KEEP_COUNT = "keep-count"
+    DATABASE_BACKUP_DEFAULT_INTERVAL_HOURS = "24"
+    DATABASE_BACKUP_DEFAULT_KEEP_COUNT = "5"
+    DATABASE_BACKUP_MAX_INTERVAL_HOURS = 24 * 30
+    DATABASE_BACKUP_MAX_KEEP_COUNT = 100
+    DATABASE_BACKUP_DIRNAME = "backups"  # Created next to the database file
+    DATABASE_BACKUP_TIME_FORMAT = "%Y%m%d-%H%M%S"
+    DATABASE_BACKUP_TEMP_SUFFIX = ".tmp"
+    DATABASE_BACKUP_PROGRESS_INTERVAL = 0.25  # Seconds between progress reports
+    DATABASE_BACKUP_CHECK_MS = 10 * 60 * 1000  # How often the backup schedule is checked
+
+    # Cold archive
+    ARCHIVE_SCHEMA = "archive"
+    ARCHIVE_DATABASE_SUFFIX = "-archive.db"
+    ARCHIVE_CONVERSATION_TABLE = "archived_conversation"
+    ARCHIVE_MESSAGE_TABLE = "archived_message"
+    ARCHIVE_MESSAGE_FTS_TABLE = "archived_message_fts"
+    ARCHIVE_BLOB_TABLE = "archived_blob"
+    ARCHIVE_CONVERSATION_BLOB_TABLE = "archived_conversation_blob"
+    ARCHIVE_SOURCE_IMAGE = "image"
+    ARCHIVE_COMPRESSION_LEVEL = 9
+
+    # History export / import
+    HISTORY_TRANSFER_CONNECTION = "history_transfer"
+    HISTORY_FORMAT = "mychatgpt-history"
+    HISTORY_FORMAT_VERSION = 1
+    HISTORY_FILES_SUFFIX = "-files"  # Attachment directory written next to the JSONL file
+    HISTORY_BATCH_SIZE = 1000  # Rows imported per transaction
+    HISTORY_WRITE_BUFFER_SIZE = 1024 * 1024
+
+    # Provider worker pool
+    AI_WORKER_POOL_SIZE = 4  # Provider requests running at once; the rest wait in the queue
+    AI_WORKER_SHUTDOWN_TIMEOUT_MS = 2000
+    STREAM_FLUSH_RATE = 30  # Streamed text reaches the GUI at most this many times per second
+    STREAM_FLUSH_SIZE = 2048  # Characters that force an early flush
+
+    # Shared provider clients
+    PROVIDER_CLIENT_MAX_CONNECTIONS = 100
+    PROVIDER_CLIENT_MAX_KEEPALIVE_CONNECTIONS = 20
+    PROVIDER_CLIENT_KEEPALIVE_EXPIRY = 120.0  # Seconds an idle connection stays open between messages
+
+    # Mime Type
+    DEFAULT_MIME_TYPE = "application/octet-stream"
+    IMAGE_PNG_MIME_TYPE = "image/png"
+    MIME_TYPE_SIGNATURES = [
+        (0, b'\x89PNG', "image/png"),
+        (0, b'\xff\xd8\xff', "image/jpeg"),
+        (0, b'GIF8', "image/gif"),
+        (8, b'WEBP', "image/webp"),
+        (8, b'WAVE', "audio/wav"),
+        (0, b'ID3', "audio/mpeg"),
+        (0, b'\xff\xfb', "audio/mpeg"),
+        (4, b'ftyp', "audio/mp4"),
+        (0, b'\x1a\x45\xdf\xa3', "audio/webm"),
+    ]
+
     NEW_CHAT = "New Chat"
     NEW_IMAGE = "New Image"
     NEW_VISION = "New Vision"
@@ -166,6 +299,8 @@ class UI:
     CHAT = "Chat"
     CHAT_TIP = "Chat"
     CHAT_LIST = "Chat List"
+    COMPARE = "Compare"
+    COMPARE_TIP = "Send each prompt to every checked provider at once and show the answers side by side"
 
     IMAGE = "Image"
     IMAGE_TIP = "Image"
@@ -189,6 +324,49 @@ class UI:
     SETTING = "Setting"
     SETTING_TIP = "Setting"
 
+    SEARCH = "Search"
+    SEARCH_TIP = "Search all conversations"
+    SEARCH_SHORTCUT = "Ctrl+Shift+F"
+    SEARCH_ALL_TITLE = "Search History"
+
+    DATABASE_SIZE = "DB: "
+    DATABASE_COMPACTED = "Compacted in "
+    DATABASE_CONVERTING = "Converting database for compaction (one time, may take a while): "
+    DATABASE_RETENTION = "Database Retention"
+    DATABASE_RETENTION_AUDIO = "Keep TTS/STT audio (days)"
+    DATABASE_RETENTION_IMAGE = "Keep image attachments (days)"
+    DATABASE_RETENTION_ARCHIVE = "Archive conversations idle for (days)"
+    DATABASE_RETENTION_FOREVER = "Forever"
+    DATABASE_RETENTION_NEVER = "Never"
+
+    DATABASE_BACKUP = "Database Backup"
+    DATABASE_BACKUP_INTERVAL = "Back up every (hours)"
+    DATABASE_BACKUP_KEEP = "Snapshots to keep"
+    DATABASE_BACKUP_OFF = "Off"
+    DATABASE_BACKUP_NOW = "Back Up Database Now"
+    DATABASE_BACKUP_NOW_TIP = "Write a snapshot of the database while the app keeps running"
+    DATABASE_BACKING_UP = "Backing up: "
+    DATABASE_BACKUP_RUNNING = "A database backup is already running."
+    DATABASE_BACKUP_FINISHED = "Backed up in "
+    DATABASE_BACKUP_FAILED = "Database backup failed: "
+
+    EXPORT_HISTORY = "Export History..."
+    EXPORT_HISTORY_TIP = "Export all conversations to a JSONL file"
+    IMPORT_HISTORY = "Import History..."
+    IMPORT_HISTORY_TIP = "Import conversations from a JSONL file"
+    HISTORY_FILE_FILTER = "JSON Lines (*.jsonl)"
+    HISTORY_EXPORTING = "Exporting history: "
+    HISTORY_IMPORTING = "Importing history: "
+    HISTORY_ROWS = " rows"
+    HISTORY_TRANSFER_RUNNING = "A history export or import is already running."
+    HISTORY_EXPORT_FINISHED = "Exported rows: "
+    HISTORY_IMPORT_FINISHED = "Imported rows: "
+    HISTORY_TRANSFER_FAILED = "History transfer failed: "
+
+    CONVERSATION_MESSAGES = "Messages: "
+    CONVERSATION_MODEL = "Model: "
+    CONVERSATION_LAST_ACTIVITY = "Last activity: "
+
     CLOSE = "Close"
     CLOSE_TIP = "Exit App"
 
@@ -331,6 +509,9 @@ class MODEL_CONSTANTS:
 class MODEL_MESSAGE:
     MODEL_UNSUPPORTED = "Unsupported LLM:"
     MODEL_UNSUPPORTED_TYPE = "Unsupported model type"
+    PROVIDER_CLIENT_UNSUPPORTED = "No shared client for provider:"
+    STREAM_COALESCED = "Streamed response coalesced:"
+    REQUEST_CANCELLED = "Request cancelled"
     THREAD_RUNNING = "Previous thread is still running!"
     THREAD_FINISHED = "Thread has been finished"
     INVALID_CREATION_TYPE = "Invalid creation type: "
@@ -358,9 +539,10 @@ class DATABASE_MESSAGE:
     DATABASE_CHAT_MAIN_ENTRY_SUCCESS = "Successfully deleted chat main entry with id: "
     DATABASE_CHAT_MAIN_ENTRY_FAIL = "Failed to delete chat main entry with id "
 
-    DATABASE_CHAT_DETAIL_CREATE_TABLE_ERROR = "Failed to create chat detail table for chat_main_id "
+    DATABASE_CHAT_MESSAGE_CREATE_TABLE_ERROR = "Failed to create chat_message table: "
     DATABASE_CHAT_DETAIL_INSERT_ERROR = "Failed to insert chat detail: "
     DATABASE_CHAT_DETAIL_DELETE_ERROR = "Failed to delete chat detail table "
+    DATABASE_CHAT_DETAIL_DELETE_SUCCESS = "Successfully deleted chat details for chat_main_id "
     DATABASE_CHAT_DETAIL_FETCH_ERROR = "Failed to fetch chat details for chat_main_id"
 
     DATABASE_PROMPT_CREATE_TABLE_ERROR = "Failed to create prompt table: "
@@ -375,16 +557,15 @@ class DATABASE_MESSAGE:
     DATABASE_IMAGE_DELETE_SUCCESS = "Successfully deleted image main entry with id: "
     DATABASE_IMAGE_DELETE_FAIL = "Failed to delete image main entry with id "
 
-    DATABASE_IMAGE_DETAIL_CREATE_TABLE_ERROR = "Failed to create image_detail table: "
+    DATABASE_IMAGE_MESSAGE_CREATE_TABLE_ERROR = "Failed to create image_message table: "
     DATABASE_IMAGE_DETAIL_INSERT_ERROR = "Failed to insert image detail: "
     DATABASE_IMAGE_DETAIL_DELETE_ERROR = "Failed to delete image detail table "
+    DATABASE_IMAGE_DETAIL_DELETE_SUCCESS = "Successfully deleted image details for image_main_id "
     DATABASE_IMAGE_DETAIL_FETCH_ERROR = "Failed to fetch image details for image_main_id"
 
     DATABASE_IMAGE_DETAIL_FILE_CREATE_TABLE_ERROR = "Failed to create image detail file table: "
-    DATABASE_IMAGE_DETAIL_FILE_INSERT_ERROR = "Failed to insert image detail file: "
     DATABASE_IMAGE_DETAIL_FILE_DELETE_ERROR = "Failed to delete image detail file table "
     DATABASE_IMAGE_DETAIL_FILE_FETCH_ERROR = "Failed to fetch image detail file for image_main_id "
-    DATABASE_IMAGE_DETAIL_FILE_NO_RECORD_ERROR = "No record found for image_detail_id "
 
     DATABASE_VISION_CREATE_TABLE_ERROR = "Failed to create vision_main table: "
     DATABASE_VISION_ADD_ERROR = "Failed to add vision main: "
@@ -392,13 +573,13 @@ class DATABASE_MESSAGE:
     DATABASE_VISION_MAIN_ENTRY_SUCCESS = "Successfully deleted vision main entry with id: "
     DATABASE_VISION_MAIN_ENTRY_FAIL = "Failed to delete vision main entry with id "
 
-    DATABASE_VISION_DETAIL_CREATE_TABLE_ERROR = "Failed to create vision_detail table: "
+    DATABASE_VISION_MESSAGE_CREATE_TABLE_ERROR = "Failed to create vision_message table: "
     DATABASE_VISION_DETAIL_INSERT_ERROR = "Failed to insert vision detail: "
     DATABASE_VISION_DETAIL_DELETE_ERROR = "Failed to delete vision detail table "
+    DATABASE_VISION_DETAIL_DELETE_SUCCESS = "Successfully deleted vision details for vision_main_id "
     DATABASE_VISION_DETAIL_FETCH_ERROR = "Failed to fetch vision details for vision_main_id"
 
     DATABASE_VISION_DETAIL_FILE_CREATE_TABLE_ERROR = "Failed to create vision detail file table: "
-    DATABASE_VISION_DETAIL_FILE_INSERT_ERROR = "Failed to insert vision detail file: "
     DATABASE_VISION_DETAIL_FILE_DELETE_ERROR = "Failed to delete vision detail file table "
     DATABASE_VISION_DETAIL_FILE_FETCH_ERROR = "Failed to fetch vision detail file for vision_detail_id "
     DATABASE_VISION_DETAIL_FILE_NO_RECORD_ERROR = "No record found for vision_detail_id "
@@ -409,10 +590,12 @@ class DATABASE_MESSAGE:
     DATABASE_TTS_MAIN_ENTRY_SUCCESS = "Successfully deleted tts main entry with id: "
     DATABASE_TTS_MAIN_ENTRY_FAIL = "Failed to delete tts main entry with id "
 
-    DATABASE_TTS_DETAIL_CREATE_TABLE_ERROR = "Failed to create tts_detail table: "
+    DATABASE_TTS_MESSAGE_CREATE_TABLE_ERROR = "Failed to create tts_message table: "
     DATABASE_TTS_DETAIL_INSERT_ERROR = "Failed to insert tts detail: "
     DATABASE_TTS_DETAIL_DELETE_ERROR = "Failed to delete tts detail table "
+    DATABASE_TTS_DETAIL_DELETE_SUCCESS = "Successfully deleted tts details for tts_main_id "
     DATABASE_TTS_DETAIL_FETCH_ERROR = "Failed to fetch tts details for tts_main_id "
+    DATABASE_TTS_DATA_FETCH_ERROR = "Failed to fetch tts audio for tts detail id "
 
     DATABASE_STT_CREATE_TABLE_ERROR = "Failed to create stt_main table: "
     DATABASE_STT_ADD_ERROR = "Failed to add stt main: "
@@ -420,18 +603,81 @@ class DATABASE_MESSAGE:
     DATABASE_STT_MAIN_ENTRY_SUCCESS = "Successfully deleted stt main entry with id: "
     DATABASE_STT_MAIN_ENTRY_FAIL = "Failed to delete stt main entry with id "
 
-    DATABASE_STT_DETAIL_CREATE_TABLE_ERROR = "Failed to create stt_detail table: "
+    DATABASE_STT_MESSAGE_CREATE_TABLE_ERROR = "Failed to create stt_message table: "
     DATABASE_STT_DETAIL_INSERT_ERROR = "Failed to insert stt detail: "
     DATABASE_STT_DETAIL_DELETE_ERROR = "Failed to delete stt detail table "
+    DATABASE_STT_DETAIL_DELETE_SUCCESS = "Successfully deleted stt details for stt_main_id "
     DATABASE_STT_DETAIL_FETCH_ERROR = "Failed to fetch stt details for stt_main_id"
+    DATABASE_STT_DATA_FETCH_ERROR = "Failed to fetch stt audio for stt detail id "
 
     DATABASE_RETRIEVE_DATA_FAIL = "Failed to retrieve data from "
     DATABASE_DELETE_TABLE_SUCCESS = "Successfully deleted table: "
     DATABASE_EXECUTE_QUERY_ERROR = "Failed to execute query: "
+    DATABASE_ADD_COLUMN_ERROR = "Failed to add column"
+    DATABASE_SUMMARY_CREATE_ERROR = "Failed to create conversation summary columns for"
+    DATABASE_SUMMARY_BACKFILL_SUCCESS = "Filled conversation summary columns for"
+    DATABASE_BLOB_MIGRATION_SUCCESS = "Successfully decoded base64 attachments in"
+    DATABASE_BLOB_MIGRATION_FAIL = "Failed to decode base64 attachments in"
+    DATABASE_BLOB_STORE_CREATE_TABLE_ERROR = "Failed to create blob_store table: "
+    DATABASE_BLOB_STORE_INSERT_ERROR = "Failed to insert blob: "
+    DATABASE_BLOB_STORE_MIGRATION_SUCCESS = "Successfully moved attachments into the blob store from"
+    DATABASE_BLOB_STORE_MIGRATION_FAIL = "Failed to move attachments into the blob store from"
+    DATABASE_MIGRATE_SUCCESS = "Successfully migrated legacy detail tables into"
+    DATABASE_MIGRATE_FAIL = "Failed to migrate legacy detail tables into"
 
     DATABASE_FAILED_OPEN = "Failed to open database."
     DATABASE_ENABLE_FOREIGN_KEY = "Failed to enable foreign key: "
     DATABASE_PRAGMA_FOREIGN_KEYS_ON = "PRAGMA foreign_keys = ON;"
+    DATABASE_PRAGMA_JOURNAL_MODE_WAL = "PRAGMA journal_mode = WAL;"
+    DATABASE_PRAGMA_SYNCHRONOUS_NORMAL = "PRAGMA synchronous = NORMAL;"
+    DATABASE_PRAGMA_BUSY_TIMEOUT = "PRAGMA busy_timeout = 5000;"
+    DATABASE_PRAGMA_AUTO_VACUUM = "PRAGMA auto_vacuum;"
+    DATABASE_PRAGMA_AUTO_VACUUM_INCREMENTAL = "PRAGMA auto_vacuum = INCREMENTAL;"
+    DATABASE_PRAGMA_FREELIST_COUNT = "PRAGMA freelist_count;"
+    DATABASE_PRAGMA_PAGE_SIZE = "PRAGMA page_size;"
+    DATABASE_PRAGMA_PAGE_COUNT = "PRAGMA page_count;"
+    DATABASE_PRAGMA_WAL_CHECKPOINT_TRUNCATE = "PRAGMA wal_checkpoint(TRUNCATE);"
+    DATABASE_PRAGMA_CACHE_SIZE = "PRAGMA cache_size = -16000;"
+    DATABASE_CONNECTION_PRAGMAS = [
+        DATABASE_PRAGMA_FOREIGN_KEYS_ON,
+        DATABASE_PRAGMA_SYNCHRONOUS_NORMAL,
+        DATABASE_PRAGMA_BUSY_TIMEOUT,
+        DATABASE_PRAGMA_CACHE_SIZE,
+    ]
+    DATABASE_PRAGMA_ERROR = "Failed to apply pragma"
+    DATABASE_SEARCH_INDEX_CREATE_ERROR = "Failed to create search index"
+    DATABASE_SEARCH_ERROR = "Failed to search messages: "
+    DATABASE_WRITER_COMMIT_FAIL = "Failed to commit queued writes:"
+    DATABASE_TURN_JOURNAL_WRITE_ERROR = "Failed to write pending turn journal"
+    DATABASE_TURN_RECOVER_SUCCESS = "Recovered pending turn"
+    DATABASE_TURN_RECOVER_ERROR = "Failed to recover pending turn"
+    DATABASE_TURN_REJECTED = "Dropped pending turn the database rejected"
+    DATABASE_TURN_PRUNE_ERROR = "Failed to prune committed turns"
+    DATABASE_COMMITTED_TURN_CREATE_TABLE_ERROR = "Failed to create committed_turn table: "
+    DATABASE_WRITER_BUSY = "Database is busy, waiting to start queued writes"
+    DATABASE_WRITER_UNRESOLVED_ROW_ID = "Queued write depends on a row that is not written yet"
+    DATABASE_RETENTION_SUCCESS = "Applied retention rule to"
+    DATABASE_RETENTION_FAIL = "Failed to apply retention rule to"
+    DATABASE_COMPACTION_SUCCESS = "Compacted database, freed bytes:"
+    DATABASE_COMPACTION_FAIL = "Failed to compact database:"
+    DATABASE_AUTO_VACUUM_CONVERT_ERROR = "Failed to convert database to incremental auto-vacuum:"
+    DATABASE_ARCHIVE_ATTACH_ERROR = "Failed to attach archive database"
+    DATABASE_ARCHIVE_SUCCESS = "Archived conversations, uncompressed bytes:"
+    DATABASE_ARCHIVE_FAIL = "Failed to archive conversation"
+    DATABASE_ARCHIVE_RESTORE_SUCCESS = "Restored archived conversation"
+    DATABASE_ARCHIVE_RESTORE_FAIL = "Failed to restore archived conversation"
+    DATABASE_ARCHIVE_DELETE_ERROR = "Failed to delete archived conversation"
+    DATABASE_ARCHIVE_BLOB_MISSING = "Archived blob is missing:"
+    DATABASE_BACKUP_SUCCESS = "Backed up database to"
+    DATABASE_BACKUP_FAIL = "Failed to back up database to"
+    DATABASE_BACKUP_CANCELLED = "Database backup cancelled"
+    DATABASE_BACKUP_ROTATED = "Removed old database snapshot"
+    DATABASE_HISTORY_EXPORT_SUCCESS = "Exported history to"
+    DATABASE_HISTORY_EXPORT_FAIL = "Failed to export history to"
+    DATABASE_HISTORY_IMPORT_SUCCESS = "Imported history from"
+    DATABASE_HISTORY_IMPORT_FAIL = "Failed to import history from"
+    DATABASE_HISTORY_INVALID_FORMAT = "Unsupported history file:"
+    DATABASE_HISTORY_CANCELLED = "History transfer cancelled"
 
     NEW_TITLE = "New Title"
     NEW_PROMPT = "New Prompt"
@@ -0,0 +1,372 @@
+import json
+import logging
+import zlib
+
+from PyQt6.QtCore import QByteArray
+from PyQt6.QtSql import QSqlQuery
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.Utility import Utility
+
+
+class DatabaseArchive:
+    def __init__(self, archive_filename, sources, blob_store_table_name):
+        self.archive_filename = archive_filename
+        self.sources = sources
+        self.blob_store_table_name = blob_store_table_name
+        self.schema = Constants.ARCHIVE_SCHEMA
+        self.conversation_table_name = f"{self.schema}.{Constants.ARCHIVE_CONVERSATION_TABLE}"
+        self.message_table_name = f"{self.schema}.{Constants.ARCHIVE_MESSAGE_TABLE}"
+        self.message_fts_table_name = f"{self.schema}.{Constants.ARCHIVE_MESSAGE_FTS_TABLE}"
+        self.blob_table_name = f"{self.schema}.{Constants.ARCHIVE_BLOB_TABLE}"
+        self.conversation_blob_table_name = f"{self.schema}.{Constants.ARCHIVE_CONVERSATION_BLOB_TABLE}"
+
+    def attach(self, db):
+        query = QSqlQuery(db)
+        query.prepare(f"ATTACH DATABASE :archive_filename AS {self.schema}")
+        query.bindValue(":archive_filename", self.archive_filename)
+        query_strings = [
+            f"PRAGMA {self.schema}.journal_mode = WAL",
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.conversation_table_name}
+             (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                main_id INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                UNIQUE(source, main_id)
+             )
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.message_table_name}
+             (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                FOREIGN KEY(conversation_id) REFERENCES {Constants.ARCHIVE_CONVERSATION_TABLE}(id) ON DELETE CASCADE
+             )
+            """,
+            f"""
+            CREATE INDEX IF NOT EXISTS {self.message_table_name}_conversation_id
+              ON {Constants.ARCHIVE_MESSAGE_TABLE} (conversation_id)
+            """,
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {self.message_fts_table_name}
+              USING fts5(text, content='', contentless_delete=1)
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {self.message_table_name}_delete
+              AFTER DELETE ON {Constants.ARCHIVE_MESSAGE_TABLE}
+            BEGIN
+              DELETE FROM {Constants.ARCHIVE_MESSAGE_FTS_TABLE} WHERE rowid = OLD.id;
+            END
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.blob_table_name}
+             (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                mime_type TEXT
+             )
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.conversation_blob_table_name}
+             (
+                conversation_id INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY(conversation_id, hash),
+                FOREIGN KEY(conversation_id) REFERENCES {Constants.ARCHIVE_CONVERSATION_TABLE}(id) ON DELETE CASCADE
+             )
+            """,
+        ]
+        try:
+            if not query.exec():
+                raise Exception(query.lastError().text())
+            for query_string in query_strings:
+                if not query.exec(query_string):
+                    raise Exception(query.lastError().text())
+            query.finish()
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_ARCHIVE_ATTACH_ERROR} {self.archive_filename}: {e}")
+            return False
+        return True
+
+    def get_idle_conversations(self, db, days):
+        query = QSqlQuery(db)
+        conversations = []
+        for source, (main_table_name, message_table_name, main_id_column, _, _, _) in self.sources.items():
+            query.prepare(f"SELECT c.id FROM {main_table_name} c WHERE c.archived = 0 "
+                          f" AND COALESCE((SELECT MAX(m.created_at) FROM {message_table_name} m "
+                          f" WHERE m.{main_id_column} = c.id), c.created_at) < datetime('now', :age)")
+            query.bindValue(":age", f"-{days} days")
+            if not query.exec():
+                raise Exception(query.lastError().text())
+            while query.next():
+                conversations.append((source, query.value(0)))
+        return conversations
+
+    def archive_conversation(self, db, source, main_id):
+        main_table_name, message_table_name, main_id_column, file_table_name, file_message_column, text_column = \
+            self.sources[source]
+        query = QSqlQuery(db)
+        if not query.exec("BEGIN IMMEDIATE"):
+            raise Exception(query.lastError().text())
+        try:
+            blob_hashes = set()
+            messages = self.select_rows(db, f"SELECT * FROM {message_table_name} WHERE {main_id_column} = :main_id",
+                                        main_id, blob_hashes)
+            files = []
+            if file_table_name:
+                files = self.select_rows(db, f"SELECT f.* FROM {file_table_name} f "
+                                             f" JOIN {message_table_name} m ON m.id = f.{file_message_column} "
+                                             f" WHERE m.{main_id_column} = :main_id", main_id, blob_hashes)
+            blob_store_hashes = sorted({file["blob_hash"] for file in files if file.get("blob_hash")})
+
+            query.prepare(f"INSERT OR IGNORE INTO {self.blob_table_name} (hash, data, mime_type) "
+                          f" SELECT hash, data, mime_type FROM main.{self.blob_store_table_name} WHERE hash = :hash")
+            for blob_hash in blob_store_hashes:
+                query.bindValue(":hash", blob_hash)
+                if not query.exec():
+                    raise Exception(query.lastError().text())
+
+            payload = json.dumps({"messages": messages, "files": files, "blob_store_hashes": blob_store_hashes})
+            query.prepare(f"INSERT OR REPLACE INTO {self.conversation_table_name} (source, main_id, payload) "
+                          f" VALUES (:source, :main_id, :payload)")
+            query.bindValue(":source", source)
+            query.bindValue(":main_id", main_id)
+            query.bindValue(":payload", QByteArray(zlib.compress(payload.encode(), Constants.ARCHIVE_COMPRESSION_LEVEL)))
+            if not query.exec():
+                raise Exception(query.lastError().text())
+            conversation_id = query.lastInsertId()
+
+            query.prepare(f"INSERT OR IGNORE INTO {self.conversation_blob_table_name} (conversation_id, hash) "
+                          f" VALUES (:conversation_id, :hash)")
+            for blob_hash in blob_hashes | set(blob_store_hashes):
+                query.bindValue(":conversation_id", conversation_id)
+                query.bindValue(":hash", blob_hash)
+                if not query.exec():
+                    raise Exception(query.lastError().text())
+
+            if text_column:
+                self.index_messages(db, conversation_id, messages, text_column)
+
+            for query_string in [f"UPDATE main.{main_table_name} SET archived = 1 WHERE id = :main_id",
+                                 f"DELETE FROM main.{message_table_name} WHERE {main_id_column} = :main_id"]:
+                query.prepare(query_string)
+                query.bindValue(":main_id", main_id)
+                if not query.exec():
+                    raise Exception(query.lastError().text())
+            if not query.exec(f"DELETE FROM main.{self.blob_store_table_name} WHERE ref_count <= 0"):
+                raise Exception(query.lastError().text())
+            if not query.exec("COMMIT"):
+                raise Exception(query.lastError().text())
+        except Exception:
+            query.exec("ROLLBACK")
+            raise
+        return len(payload)
+
+    def select_rows(self, db, query_string, main_id, blob_hashes):
+        query = QSqlQuery(db)
+        query.prepare(query_string)
+        query.bindValue(":main_id", main_id)
+        if not query.exec():
+            raise Exception(query.lastError().text())
+        rows = []
+        while query.next():
+            record = query.record()
+            row = {}
+            for index in range(record.count()):
+                value = query.value(index)
+                if isinstance(value, QByteArray) and value.startsWith(Constants.TEXT_COMPRESSION_MARKER):
+                    value = Utility.decompress_text(value)
+                elif isinstance(value, QByteArray):
+                    value = self.archive_inline_blob(db, bytes(value))
+                    blob_hashes.add(value["blob"])
+                row[record.fieldName(index)] = value
+            rows.append(row)
+        return rows
+
+    def archive_inline_blob(self, db, data):
+        blob_hash = Utility.get_content_hash(data)
+        query = QSqlQuery(db)
+        query.prepare(f"INSERT OR IGNORE INTO {self.blob_table_name} (hash, data) VALUES (:hash, :data)")
+        query.bindValue(":hash", blob_hash)
+        query.bindValue(":data", QByteArray(data))
+        if not query.exec():
+            raise Exception(query.lastError().text())
+        return {"blob": blob_hash}
+
+    def index_messages(self, db, conversation_id, messages, text_column):
+        message_query = QSqlQuery(db)
+        message_query.prepare(f"INSERT INTO {self.message_table_name} (conversation_id, message_id) "
+                              f" VALUES (:conversation_id, :message_id)")
+        fts_query = QSqlQuery(db)
+        fts_query.prepare(f"INSERT INTO {self.message_fts_table_name} (rowid, text) VALUES (:rowid, :text)")
+        for message in messages:
+            if not isinstance(message.get(text_column), str) or not message[text_column]:
+                continue
+            message_query.bindValue(":conversation_id", conversation_id)
+            message_query.bindValue(":message_id", message["id"])
+            if not message_query.exec():
+                raise Exception(message_query.lastError().text())
+            fts_query.bindValue(":rowid", message_query.lastInsertId())
+            fts_query.bindValue(":text", message[text_column])
+            if not fts_query.exec():
+                raise Exception(fts_query.lastError().text())
+
+    def is_archived(self, db, source, main_id):
+        query = QSqlQuery(db)
+        query.prepare(f"SELECT archived FROM main.{self.sources[source][0]} WHERE id = :main_id")
+        query.bindValue(":main_id", main_id)
+        archived = query.exec() and query.next() and query.value(0) == 1
+        query.finish()
+        return archived
+
+    def restore_conversation(self, db, source, main_id):
+        main_table_name, message_table_name, _, file_table_name, _, _ = self.sources[source]
+        query = QSqlQuery(db)
+        if not query.exec("BEGIN IMMEDIATE"):
+            raise Exception(query.lastError().text())
+        try:
+            query.prepare(f"SELECT id, payload FROM {self.conversation_table_name} "
+                          f" WHERE source = :source AND main_id = :main_id")
+            query.bindValue(":source", source)
+            query.bindValue(":main_id", main_id)
+            if not query.exec():
+                raise Exception(query.lastError().text())
+            if query.next():
+                conversation_id = query.value(0)
+                payload = json.loads(zlib.decompress(bytes(query.value(1))))
+                query.finish()
+
+                query.prepare(f"INSERT OR IGNORE INTO main.{self.blob_store_table_name} (hash, data, mime_type) "
+                              f" SELECT hash, data, mime_type FROM {self.blob_table_name} WHERE hash = :hash")
+                for blob_hash in payload["blob_store_hashes"]:
+                    query.bindValue(":hash", blob_hash)
+                    if not query.exec():
+                        raise Exception(query.lastError().text())
+                self.insert_rows(db, f"main.{message_table_name}", payload["messages"])
+                if file_table_name:
+                    self.insert_rows(db, f"main.{file_table_name}", payload["files"])
+
+                query.prepare(f"DELETE FROM {self.conversation_table_name} WHERE id = :conversation_id")
+                query.bindValue(":conversation_id", conversation_id)
+                if not query.exec():
+                    raise Exception(query.lastError().text())
+                if not query.exec(f"DELETE FROM {self.blob_table_name} WHERE hash NOT IN "
+                                  f" (SELECT hash FROM {self.conversation_blob_table_name})"):
+                    raise Exception(query.lastError().text())
+
+            query.prepare(f"UPDATE main.{main_table_name} SET archived = 0 WHERE id = :main_id")
+            query.bindValue(":main_id", main_id)
+            if not query.exec():
+                raise Exception(query.lastError().text())
+            if not query.exec("COMMIT"):
+                raise Exception(query.lastError().text())
+        except Exception:
+            query.exec("ROLLBACK")
+            raise
+
+    def insert_rows(self, db, table_name, rows):
+        query = QSqlQuery(db)
+        for row in rows:
+            columns = list(row.keys())
+            query.prepare(f"INSERT OR IGNORE INTO {table_name} ({', '.join(columns)}) "
+                          f" VALUES ({', '.join(':' + column for column in columns)})")
+            for column, value in row.items():
+                if isinstance(value, dict) and "blob" in value:
+                    value = QByteArray(self.get_blob(db, value["blob"]))
+                query.bindValue(":" + column, value)
+            if not query.exec():
+                raise Exception(query.lastError().text())
+
+    def get_blob(self, db, blob_hash):
+        query = QSqlQuery(db)
+        query.prepare(f"SELECT data FROM {self.blob_table_name} WHERE hash = :hash")
+        query.bindValue(":hash", blob_hash)
+        if not query.exec() or not query.next():
+            raise Exception(f"{DATABASE_MESSAGE.DATABASE_ARCHIVE_BLOB_MISSING} {blob_hash}")
+        data = bytes(query.value(0))
+        query.finish()
+        return data
+
+    def get_blob_mime_type(self, db, blob_hash):
+        query = QSqlQuery(db)
+        query.prepare(f"SELECT mime_type FROM {self.blob_table_name} WHERE hash = :hash")
+        query.bindValue(":hash", blob_hash)
+        mime_type = query.value(0) if query.exec() and query.next() else None
+        query.finish()
+        return mime_type
+
+    def generate_payloads(self, db, source):
+        query = QSqlQuery(db)
+        query.setForwardOnly(True)
+        query.prepare(f"SELECT payload FROM {self.conversation_table_name} WHERE source = :source ORDER BY main_id")
+        query.bindValue(":source", source)
+        if not query.exec():
+            raise Exception(query.lastError().text())
+        while query.next():
+            yield json.loads(zlib.decompress(bytes(query.value(0))))
+
+    def delete_conversation(self, db, source, main_id):
+        query = QSqlQuery(db)
+        query.prepare(f"DELETE FROM {self.conversation_table_name} WHERE source = :source AND main_id = :main_id")
+        query.bindValue(":source", source)
+        query.bindValue(":main_id", main_id)
+        if not query.exec():
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_ARCHIVE_DELETE_ERROR} {source} {main_id}: "
+                          f"{query.lastError().text()}")
+            return False
+        if query.numRowsAffected() > 0:
+            query.exec(f"DELETE FROM {self.blob_table_name} WHERE hash NOT IN "
+                       f" (SELECT hash FROM {self.conversation_blob_table_name})")
+        return True
+
+    def search_messages(self, db, match_query, terms, limit):
+        select_strings = []
+        for source, (main_table_name, _, _, _, _, text_column) in self.sources.items():
+            if not text_column:
+                continue
+            select_strings.append(
+                f"SELECT c.source AS source, c.main_id AS main_id, m.message_id AS message_id, "
+                f" t.title AS title, bm25({Constants.ARCHIVE_MESSAGE_FTS_TABLE}) AS rank, c.id AS conversation_id "
+                f" FROM {self.message_fts_table_name} "
+                f" JOIN {self.message_table_name} m ON m.id = {Constants.ARCHIVE_MESSAGE_FTS_TABLE}.rowid "
+                f" JOIN {self.conversation_table_name} c ON c.id = m.conversation_id "
+                f" JOIN main.{main_table_name} t ON t.id = c.main_id "
+                f" WHERE {Constants.ARCHIVE_MESSAGE_FTS_TABLE} MATCH :match_query AND c.source = '{source}'")
+        query = QSqlQuery(db)
+        query.prepare(" UNION ALL ".join(select_strings) + " ORDER BY rank LIMIT :limit")
+        query.bindValue(":match_query", match_query)
+        query.bindValue(":limit", limit)
+        if not query.exec():
+            raise Exception(query.lastError().text())
+
+        results = []
+        while query.next():
+            results.append({
+                "source": query.value("source"),
+                "main_id": query.value("main_id"),
+                "message_id": query.value("message_id"),
+                "title": query.value("title"),
+                "rank": query.value("rank"),
+                "conversation_id": query.value("conversation_id"),
+            })
+
+        payloads = {}
+        for result in results:
+            conversation_id = result.pop("conversation_id")
+            if conversation_id not in payloads:
+                query.prepare(f"SELECT payload FROM {self.conversation_table_name} WHERE id = :conversation_id")
+                query.bindValue(":conversation_id", conversation_id)
+                if query.exec() and query.next():
+                    payloads[conversation_id] = json.loads(zlib.decompress(bytes(query.value(0))))
+                else:
+                    payloads[conversation_id] = {"messages": []}
+            text_column = self.sources[result["source"]][5]
+            message_text = next((message.get(text_column) for message in payloads[conversation_id]["messages"]
+                                 if message["id"] == result["message_id"]), "")
+            result["snippet"] = Utility.build_search_snippet(message_text, terms)
+        query.finish()
+        return results
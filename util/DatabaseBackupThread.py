@@ -0,0 +1,128 @@
+import logging
+import os
+import re
+import threading
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.DatabaseConnectionManager import DatabaseConnectionManager
+
+
+class DatabaseBackupThread(QThread):
+    progress_signal = pyqtSignal(int, int)
+    backup_finished_signal = pyqtSignal(str, float, str)
+
+    def __init__(self, db_filename, backup_dirname, keep_count, archive_filename=None):
+        super().__init__()
+        self.db_filename = db_filename
+        self.backup_dirname = backup_dirname
+        self.keep_count = keep_count
+        self.archive_filename = archive_filename
+        self.connection_name = Constants.DATABASE_BACKUP_CONNECTION
+        self.written_bytes = 0
+        self.expected_bytes = 0
+
+    def run(self):
+        start_time = time.perf_counter()
+        snapshot_filename, error = self.backup_all()
+        self.backup_finished_signal.emit(snapshot_filename, time.perf_counter() - start_time, error)
+        QSqlDatabase.removeDatabase(self.connection_name)
+
+    def backup_all(self):
+        db = DatabaseConnectionManager.open_connection(self.db_filename, self.connection_name)
+        if not db.isOpen():
+            return "", DATABASE_MESSAGE.DATABASE_FAILED_OPEN
+        query = QSqlQuery(db)
+
+        snapshot_prefix = os.path.join(self.backup_dirname, self.get_snapshot_stem(self.db_filename)
+                                       + time.strftime(Constants.DATABASE_BACKUP_TIME_FORMAT))
+        snapshot_filename = snapshot_prefix + os.path.splitext(self.db_filename)[1]
+        targets = [("main", snapshot_filename)]
+        error = ""
+        try:
+            os.makedirs(self.backup_dirname, exist_ok=True)
+            if self.archive_filename and os.path.exists(self.archive_filename):
+                query.prepare(f"ATTACH DATABASE :archive_filename AS {Constants.ARCHIVE_SCHEMA}")
+                query.bindValue(":archive_filename", self.archive_filename)
+                if not query.exec():
+                    raise Exception(query.lastError().text())
+                targets.append((Constants.ARCHIVE_SCHEMA, snapshot_prefix + Constants.ARCHIVE_DATABASE_SUFFIX))
+            self.expected_bytes = sum(self.get_used_bytes(query, schema) for schema, _ in targets)
+
+            for schema, target_filename in targets:
+                if self.isInterruptionRequested():
+                    raise Exception(DATABASE_MESSAGE.DATABASE_BACKUP_CANCELLED)
+                self.vacuum_into(query, schema, target_filename)
+            self.rotate_snapshots()
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_BACKUP_SUCCESS} {snapshot_filename}")
+        except Exception as e:
+            error = str(e)
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_BACKUP_FAIL} {snapshot_filename}: {error}")
+            for _, target_filename in targets:
+                if os.path.exists(target_filename):
+                    os.remove(target_filename)
+            snapshot_filename = ""
+        db.close()
+        return snapshot_filename, error
+
+    def vacuum_into(self, query, schema, target_filename):
+        # VACUUM INTO reads one consistent snapshot; WAL lets the app keep writing meanwhile
+        temp_filename = target_filename + Constants.DATABASE_BACKUP_TEMP_SUFFIX
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        finished = threading.Event()
+        reporter = threading.Thread(target=self.report_progress, args=(temp_filename, finished), daemon=True)
+        reporter.start()
+        try:
+            query.prepare(f"VACUUM {schema} INTO :target_filename")
+            query.bindValue(":target_filename", temp_filename)
+            if not query.exec():
+                raise Exception(query.lastError().text())
+        finally:
+            finished.set()
+            reporter.join()
+        self.written_bytes += os.path.getsize(temp_filename)
+        self.progress_signal.emit(self.written_bytes, max(self.expected_bytes, self.written_bytes))
+        os.replace(temp_filename, target_filename)
+
+    def report_progress(self, temp_filename, finished):
+        while not finished.wait(Constants.DATABASE_BACKUP_PROGRESS_INTERVAL):
+            if os.path.exists(temp_filename):
+                written_bytes = self.written_bytes + os.path.getsize(temp_filename)
+                self.progress_signal.emit(written_bytes, max(self.expected_bytes, written_bytes))
+
+    @staticmethod
+    def get_used_bytes(query, schema):
+        values = []
+        for pragma in ["page_count", "freelist_count", "page_size"]:
+            if not query.exec(f"PRAGMA {schema}.{pragma}") or not query.next():
+                raise Exception(query.lastError().text())
+            values.append(query.value(0))
+        query.finish()
+        page_count, freelist_count, page_size = values
+        return (page_count - freelist_count) * page_size
+
+    def rotate_snapshots(self):
+        snapshot_filenames = self.get_snapshot_filenames(self.backup_dirname, self.db_filename)
+        for snapshot_filename in snapshot_filenames[:max(len(snapshot_filenames) - self.keep_count, 0)]:
+            for filename in [snapshot_filename,
+                             os.path.splitext(snapshot_filename)[0] + Constants.ARCHIVE_DATABASE_SUFFIX]:
+                if os.path.exists(filename):
+                    os.remove(filename)
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_BACKUP_ROTATED} {snapshot_filename}")
+
+    @staticmethod
+    def get_snapshot_stem(db_filename):
+        return os.path.splitext(os.path.basename(db_filename))[0] + "-"
+
+    @classmethod
+    def get_snapshot_filenames(cls, backup_dirname, db_filename):
+        if not os.path.isdir(backup_dirname):
+            return []
+        pattern = re.compile(re.escape(cls.get_snapshot_stem(db_filename)) + r"\d{8}-\d{6}"
+                             + re.escape(os.path.splitext(db_filename)[1]) + "$")
+        return sorted(os.path.join(backup_dirname, filename) for filename in os.listdir(backup_dirname)
+                      if pattern.match(filename))
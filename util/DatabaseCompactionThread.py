@@ -0,0 +1,128 @@
+import logging
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.DatabaseConnectionManager import DatabaseConnectionManager
+
+
+class DatabaseCompactionThread(QThread):
+    compaction_finished_signal = pyqtSignal(int, float)
+    conversion_started_signal = pyqtSignal(int)
+
+    def __init__(self, db_filename, audio_targets, audio_days, file_targets, file_days, blob_store_table_name,
+                 database_archive=None, archive_days=0):
+        super().__init__()
+        self.db_filename = db_filename
+        self.audio_targets = audio_targets
+        self.audio_days = audio_days
+        self.file_targets = file_targets
+        self.file_days = file_days
+        self.blob_store_table_name = blob_store_table_name
+        self.database_archive = database_archive
+        self.archive_days = archive_days
+        self.connection_name = Constants.DATABASE_COMPACTION_CONNECTION
+
+    def run(self):
+        start_time = time.perf_counter()
+        freed_bytes = self.compact_all()
+        self.compaction_finished_signal.emit(freed_bytes, time.perf_counter() - start_time)
+        QSqlDatabase.removeDatabase(self.connection_name)
+
+    def compact_all(self):
+        db = DatabaseConnectionManager.open_connection(self.db_filename, self.connection_name)
+        if not db.isOpen():
+            return 0
+        query = QSqlQuery(db)
+
+        freed_bytes = 0
+        try:
+            self.archive_idle_conversations(db)
+            self.apply_retention(db)
+            page_size = self.get_pragma_value(query, DATABASE_MESSAGE.DATABASE_PRAGMA_PAGE_SIZE)
+            if self.get_pragma_value(query, DATABASE_MESSAGE.DATABASE_PRAGMA_AUTO_VACUUM) \
+                    == Constants.DATABASE_AUTO_VACUUM_INCREMENTAL:
+                freed_bytes = self.incremental_vacuum(query) * page_size
+            elif not self.isInterruptionRequested():
+                freed_bytes = self.convert_to_incremental_vacuum(query) * page_size
+            query.exec(DATABASE_MESSAGE.DATABASE_PRAGMA_WAL_CHECKPOINT_TRUNCATE)
+            query.finish()
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_COMPACTION_SUCCESS} {freed_bytes}")
+        except Exception as e:
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_COMPACTION_FAIL} {e}")
+        db.close()
+        return freed_bytes
+
+    def archive_idle_conversations(self, db):
+        if self.database_archive is None or self.archive_days <= 0 or not self.database_archive.attach(db):
+            return
+        archived_bytes = 0
+        for source, main_id in self.database_archive.get_idle_conversations(db, self.archive_days):
+            if self.isInterruptionRequested():
+                break
+            try:
+                archived_bytes += self.database_archive.archive_conversation(db, source, main_id)
+            except Exception as e:
+                logging.error(f"{DATABASE_MESSAGE.DATABASE_ARCHIVE_FAIL} {source} {main_id}: {e}")
+        if archived_bytes:
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_ARCHIVE_SUCCESS} {archived_bytes}")
+
+    def apply_retention(self, db):
+        query = QSqlQuery(db)
+        if self.audio_days > 0:
+            for table_name, data_column in self.audio_targets:
+                self.exec_retention(query, table_name,
+                                    f"UPDATE {table_name} SET {data_column} = NULL "
+                                    f" WHERE {data_column} IS NOT NULL AND created_at < datetime('now', :age)",
+                                    self.audio_days)
+        if self.file_days > 0:
+            for table_name in self.file_targets:
+                self.exec_retention(query, table_name,
+                                    f"DELETE FROM {table_name} WHERE created_at < datetime('now', :age)",
+                                    self.file_days)
+            self.exec_retention(query, self.blob_store_table_name,
+                                f"DELETE FROM {self.blob_store_table_name} WHERE ref_count <= 0", None)
+
+    def exec_retention(self, query, table_name, query_string, days):
+        if self.isInterruptionRequested():
+            return
+        query.prepare(query_string)
+        if days is not None:
+            query.bindValue(":age", f"-{days} days")
+        if query.exec():
+            if query.numRowsAffected() > 0:
+                logging.info(f"{DATABASE_MESSAGE.DATABASE_RETENTION_SUCCESS} {table_name}: {query.numRowsAffected()}")
+        else:
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_RETENTION_FAIL} {table_name}: {query.lastError().text()}")
+
+    def incremental_vacuum(self, query):
+        freed_pages = 0
+        while not self.isInterruptionRequested():
+            free_pages = self.get_pragma_value(query, DATABASE_MESSAGE.DATABASE_PRAGMA_FREELIST_COUNT)
+            if free_pages == 0:
+                break
+            if not query.exec(f"PRAGMA incremental_vacuum({Constants.DATABASE_COMPACTION_PAGES});"):
+                raise Exception(query.lastError().text())
+            while query.next():
+                pass
+            freed_pages += free_pages - self.get_pragma_value(query, DATABASE_MESSAGE.DATABASE_PRAGMA_FREELIST_COUNT)
+        return freed_pages
+
+    def convert_to_incremental_vacuum(self, query):
+        # An existing database only switches mode after one full VACUUM, which cannot be interrupted
+        page_count = self.get_pragma_value(query, DATABASE_MESSAGE.DATABASE_PRAGMA_PAGE_COUNT)
+        self.conversion_started_signal.emit(
+            page_count * self.get_pragma_value(query, DATABASE_MESSAGE.DATABASE_PRAGMA_PAGE_SIZE))
+        if not query.exec(DATABASE_MESSAGE.DATABASE_PRAGMA_AUTO_VACUUM_INCREMENTAL) or not query.exec("VACUUM"):
+            raise Exception(f"{DATABASE_MESSAGE.DATABASE_AUTO_VACUUM_CONVERT_ERROR} {query.lastError().text()}")
+        return page_count - self.get_pragma_value(query, DATABASE_MESSAGE.DATABASE_PRAGMA_PAGE_COUNT)
+
+    @staticmethod
+    def get_pragma_value(query, pragma):
+        if not query.exec(pragma) or not query.next():
+            raise Exception(query.lastError().text())
+        value = query.value(0)
+        query.finish()
+        return value
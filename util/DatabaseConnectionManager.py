@@ -0,0 +1,94 @@
+import itertools
+import logging
+import threading
+from functools import partial
+
+from PyQt6.QtCore import QCoreApplication, QThread, Qt
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.StatementCache import StatementCache
+
+
+class DatabaseConnectionManager:
+    """Hands out one connection per thread; Qt SQL connections must stay on the thread that opened them."""
+
+    def __init__(self, db_filename):
+        self.db_filename = db_filename
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.connection_names = set()
+        self.connection_counter = itertools.count(1)
+        self.connection_initializers = []
+
+    @staticmethod
+    def open_connection(db_filename, connection_name=None):
+        if connection_name is None:
+            db = QSqlDatabase.addDatabase(Constants.SQLITE_DATABASE)
+        else:
+            db = QSqlDatabase.addDatabase(Constants.SQLITE_DATABASE, connection_name)
+        db.setDatabaseName(db_filename)
+        if not db.open():
+            print(f"{DATABASE_MESSAGE.DATABASE_FAILED_OPEN}")
+            return db
+
+        query = QSqlQuery(db)
+        for pragma in DATABASE_MESSAGE.DATABASE_CONNECTION_PRAGMAS:
+            if not query.exec(pragma):
+                logging.error(f"{DATABASE_MESSAGE.DATABASE_PRAGMA_ERROR} {pragma}: {query.lastError().text()}")
+        query.finish()
+        return db
+
+    def add_connection_initializer(self, initializer):
+        with self.lock:
+            self.connection_initializers.append(initializer)
+
+    def get_connection(self):
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = self.open_thread_connection()
+        return db
+
+    def get_statement_cache(self):
+        self.get_connection()
+        return self.local.statement_cache
+
+    def open_thread_connection(self):
+        application = QCoreApplication.instance()
+        if application is None or QThread.currentThread() == application.thread():
+            connection_name = None
+        else:
+            with self.lock:
+                connection_name = f"{Constants.DATABASE_THREAD_CONNECTION_PREFIX}{next(self.connection_counter)}"
+            # Threads that exit without release_connection would otherwise leak the named connection
+            QThread.currentThread().finished.connect(partial(self.remove_connection, connection_name),
+                                                     Qt.ConnectionType.DirectConnection)
+
+        db = self.open_connection(self.db_filename, connection_name)
+        with self.lock:
+            self.connection_names.add(connection_name)
+            connection_initializers = list(self.connection_initializers)
+        if db.isOpen():
+            for initializer in connection_initializers:
+                initializer(db)
+        self.local.db = db
+        self.local.connection_name = connection_name
+        self.local.statement_cache = StatementCache(db)
+        return db
+
+    def release_connection(self):
+        db = getattr(self.local, "db", None)
+        if db is None:
+            return
+        connection_name = self.local.connection_name
+        self.local.statement_cache.clear()
+        db.close()
+        del self.local.db, self.local.statement_cache, self.local.connection_name, db
+        self.remove_connection(connection_name)
+
+    def remove_connection(self, connection_name):
+        with self.lock:
+            if connection_name not in self.connection_names:
+                return
+            self.connection_names.discard(connection_name)
+        QSqlDatabase.removeDatabase(connection_name or Constants.DATABASE_DEFAULT_CONNECTION)
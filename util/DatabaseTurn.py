@@ -0,0 +1,153 @@
+import base64
+import json
+import logging
+import os
+import uuid
+from functools import partial
+
+from PyQt6.QtCore import QByteArray
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.DatabaseWriterThread import DatabaseWriteError, StatementRowId
+
+
+class DatabaseTurn:
+    def __init__(self, database, journal_directory, turn_id=None):
+        self.database = database
+        self.turn_id = turn_id or uuid.uuid4().hex
+        self.journal_filename = os.path.join(journal_directory, self.turn_id + Constants.PENDING_TURN_EXTENSION)
+        self.statements = []
+        self.error_message = None
+        self.committed = False
+
+    def add(self, statements, error_message):
+        offset = len(self.statements)
+        statements = [(query_string, {
+            name: StatementRowId(value.statement_index + offset) if isinstance(value, StatementRowId) else value
+            for name, value in bindings.items()
+        }) for query_string, bindings in statements]
+        self.statements.extend(statements)
+        if self.error_message is None:
+            self.error_message = error_message
+        # Encoding and fsync run on the writer thread, which keeps attachments off the GUI thread
+        self.database.database_writer.submit_task(partial(self.append_journal, statements, error_message))
+
+    def commit(self):
+        self.committed = True
+        if not self.statements:
+            return None
+        # The ledger row commits in the same transaction, so recovery can tell the turn was already written
+        future = self.database.submit_write(self.statements + [(
+            f"INSERT OR IGNORE INTO {self.database.committed_turn_table_name} (id) VALUES (:id)",
+            {":id": self.turn_id},
+        )], self.error_message)
+        future.add_done_callback(self.finish_commit)
+        self.statements = []
+        return future
+
+    def finish_commit(self, future):
+        # A failed turn keeps its journal so the next start replays it, unless replaying would fail the same way
+        error = future.exception()
+        if isinstance(error, DatabaseWriteError) and error.is_constraint_violation():
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_TURN_REJECTED} {self.journal_filename}: {error}")
+        elif error is not None:
+            return
+        self.remove_journal()
+
+    def append_journal(self, statements, error_message):
+        # The answer is added right before the commit, so a turn committed by now needs no journal entry
+        if self.committed:
+            return
+        entry = {
+            "error_message": error_message,
+            "statements": [(query_string, {name: self.encode_value(value) for name, value in bindings.items()})
+                           for query_string, bindings in statements],
+        }
+        try:
+            os.makedirs(os.path.dirname(self.journal_filename), exist_ok=True)
+            with open(self.journal_filename, "a", encoding="utf-8") as journal_file:
+                journal_file.write(json.dumps(entry) + "\n")
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+        except (OSError, TypeError) as e:
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_TURN_JOURNAL_WRITE_ERROR} {self.journal_filename}: {e}")
+
+    def remove_journal(self):
+        try:
+            os.remove(self.journal_filename)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def recover(cls, database, journal_directory):
+        if not os.path.isdir(journal_directory):
+            return
+        committed_turn_ids = cls.get_committed_turn_ids(database)
+        for filename in sorted(os.listdir(journal_directory)):
+            journal_filename = os.path.join(journal_directory, filename)
+            turn_id, extension = os.path.splitext(filename)
+            if extension != Constants.PENDING_TURN_EXTENSION or turn_id in committed_turn_ids:
+                # Leftover temp files, or turns committed just before the journal could be removed
+                os.remove(journal_filename)
+                continue
+            try:
+                turn = cls(database, journal_directory, turn_id)
+                for entry in cls.read_journal(journal_filename):
+                    if turn.error_message is None:
+                        turn.error_message = entry["error_message"]
+                    turn.statements.extend(
+                        (query_string, {name: cls.decode_value(value) for name, value in bindings.items()})
+                        for query_string, bindings in entry["statements"])
+                if turn.commit() is None:
+                    turn.remove_journal()
+                    continue
+                logging.info(f"{DATABASE_MESSAGE.DATABASE_TURN_RECOVER_SUCCESS} {filename}")
+            except (OSError, ValueError, KeyError) as e:
+                logging.error(f"{DATABASE_MESSAGE.DATABASE_TURN_RECOVER_ERROR} {filename}: {e}")
+        cls.prune_committed_turns(database, committed_turn_ids)
+
+    @staticmethod
+    def read_journal(journal_filename):
+        entries = []
+        with open(journal_filename, encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # A crash mid-append leaves a torn last line
+        return entries
+
+    @staticmethod
+    def get_committed_turn_ids(database):
+        query = database.prepare_query(f"SELECT id FROM {database.committed_turn_table_name}")
+        committed_turn_ids = set()
+        if query.exec():
+            while query.next():
+                committed_turn_ids.add(query.value(0))
+        return committed_turn_ids
+
+    @staticmethod
+    def prune_committed_turns(database, committed_turn_ids):
+        # Their journals are gone now, so the ledger rows are no longer needed
+        if committed_turn_ids:
+            query_string = f"DELETE FROM {database.committed_turn_table_name} WHERE id = :id"
+            database.submit_write([(query_string, {":id": turn_id}) for turn_id in committed_turn_ids],
+                                  DATABASE_MESSAGE.DATABASE_TURN_PRUNE_ERROR)
+
+    @staticmethod
+    def encode_value(value):
+        if isinstance(value, QByteArray):
+            value = value.data()
+        if isinstance(value, (bytes, bytearray)):
+            return {"bytes": base64.b64encode(value).decode("ascii")}
+        if isinstance(value, StatementRowId):
+            return {"row_id": value.statement_index}
+        return value
+
+    @staticmethod
+    def decode_value(value):
+        if isinstance(value, dict) and "bytes" in value:
+            return QByteArray(base64.b64decode(value["bytes"]))
+        if isinstance(value, dict) and "row_id" in value:
+            return StatementRowId(value["row_id"])
+        return value
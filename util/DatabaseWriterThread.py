@@ -0,0 +1,167 @@
+import logging
+import queue
+from concurrent.futures import Future
+
+from PyQt6.QtCore import QThread
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.DatabaseConnectionManager import DatabaseConnectionManager
+from util.StatementCache import StatementCache
+
+
+class DatabaseWriteError(Exception):
+    def __init__(self, message, native_error_code=None):
+        super().__init__(message)
+        self.native_error_code = native_error_code
+
+    def is_constraint_violation(self):
+        return (self.native_error_code or "").isdigit() and \
+            int(self.native_error_code) & 0xFF == Constants.DATABASE_CONSTRAINT_ERROR_CODE
+
+
+class StatementRowId:
+    def __init__(self, statement_index):
+        self.statement_index = statement_index
+
+
+class DatabaseWriterThread(QThread):
+    def __init__(self, db_filename):
+        super().__init__()
+        self.db_filename = db_filename
+        self.connection_name = Constants.DATABASE_WRITER_CONNECTION
+        self.write_queue = queue.Queue()
+
+    def submit(self, statements, row_id_index=0):
+        future = Future()
+        self.write_queue.put((statements, row_id_index, future))
+        return future
+
+    def submit_task(self, task):
+        # Runs on this thread outside the transaction, before the writes taken from the queue with it
+        future = Future()
+        self.write_queue.put((task, None, future))
+        return future
+
+    def stop(self):
+        if self.isRunning():
+            self.write_queue.put(None)
+            self.wait()
+
+    def run(self):
+        self.write_all()
+        QSqlDatabase.removeDatabase(self.connection_name)
+
+    def write_all(self):
+        db = DatabaseConnectionManager.open_connection(self.db_filename, self.connection_name)
+        if not db.isOpen():
+            self.discard_pending()
+            return
+
+        statement_cache = StatementCache(db)
+        running = True
+        while running:
+            jobs = [self.write_queue.get()]
+            while len(jobs) < Constants.DATABASE_WRITER_BATCH_SIZE:
+                try:
+                    jobs.append(self.write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in jobs:
+                running = False
+                jobs = [job for job in jobs if job is not None]
+            self.write_batch(db, statement_cache, jobs)
+        statement_cache.clear()
+        db.close()
+
+    def write_batch(self, db, statement_cache, jobs):
+        for task, _, future in [job for job in jobs if callable(job[0])]:
+            try:
+                future.set_result(task())
+            except Exception as e:
+                future.set_exception(e)
+        jobs = [job for job in jobs if not callable(job[0])]
+        if not jobs:
+            return
+
+        results = {}
+        if not self.begin_transaction(db):
+            error = Exception(DATABASE_MESSAGE.DATABASE_WRITER_COMMIT_FAIL)
+            for _, _, future in jobs:
+                future.set_exception(error)
+            return
+        for statements, row_id_index, future in jobs:
+            try:
+                results[future] = self.write_job(db, statement_cache, statements, row_id_index, results)
+            except DatabaseWriteError as e:
+                results[future] = DatabaseWriteError(str(e), e.native_error_code)
+            except Exception as e:
+                results[future] = Exception(str(e))
+
+        if not db.commit():
+            error = Exception(db.lastError().text())
+            db.rollback()
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_WRITER_COMMIT_FAIL} {error}")
+            results = {future: error for _, _, future in jobs}
+
+        for future, result in results.items():
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    def begin_transaction(db):
+        query = QSqlQuery(db)
+        while not query.exec("BEGIN IMMEDIATE"):
+            if query.lastError().nativeErrorCode() != Constants.DATABASE_BUSY_ERROR_CODE:
+                logging.error(f"{DATABASE_MESSAGE.DATABASE_WRITER_COMMIT_FAIL} {query.lastError().text()}")
+                return False
+            logging.warning(DATABASE_MESSAGE.DATABASE_WRITER_BUSY)
+        return True
+
+    def write_job(self, db, statement_cache, statements, row_id_index, results):
+        savepoint_query = QSqlQuery(db)
+        if not savepoint_query.exec("SAVEPOINT write_job"):
+            raise Exception(savepoint_query.lastError().text())
+        try:
+            row_ids = []
+            for query_string, bindings in statements:
+                query = statement_cache.prepare(query_string)
+                for name, value in bindings.items():
+                    query.bindValue(name, self.resolve_value(value, results, row_ids))
+                if not query.exec():
+                    raise DatabaseWriteError(query.lastError().text(), query.lastError().nativeErrorCode())
+                row_ids.append(query.lastInsertId())
+        except Exception:
+            savepoint_query.exec("ROLLBACK TO write_job")
+            savepoint_query.exec("RELEASE write_job")
+            raise
+        savepoint_query.exec("RELEASE write_job")
+        return row_ids[row_id_index]
+
+    @staticmethod
+    def resolve_value(value, results, row_ids):
+        if isinstance(value, StatementRowId):
+            return row_ids[value.statement_index]
+        if not isinstance(value, Future):
+            return value
+        if value in results:
+            result = results[value]
+        elif value.done():
+            result = value.exception() or value.result()
+        else:
+            # Waiting here would stall the writer on a job queued behind this one
+            raise Exception(DATABASE_MESSAGE.DATABASE_WRITER_UNRESOLVED_ROW_ID)
+        if isinstance(result, Exception):
+            raise Exception(str(result))
+        return result
+
+    def discard_pending(self):
+        while True:
+            try:
+                job = self.write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job[2].set_exception(Exception(DATABASE_MESSAGE.DATABASE_FAILED_OPEN))
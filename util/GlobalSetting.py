@@ -1,9 +1,9 @@
 from functools import partial
 
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, \
-    QPushButton, QGroupBox, QGridLayout, QColorDialog, QFontDialog, QMessageBox, QHBoxLayout
+    QPushButton, QGroupBox, QGridLayout, QColorDialog, QFontDialog, QMessageBox, QHBoxLayout, QSpinBox
 
-from util.Constants import get_ai_provider_names, UI
+from util.Constants import get_ai_provider_names, UI, Constants
 from util.SettingsManager import SettingsManager
 from util.Utility import Utility
 
@@ -28,6 +28,8 @@ class GlobalSetting(QDialog):
         self.create_ai_code_view_style_group(row2Layout)
         self.create_info_label_style_group(row2Layout)
         self.create_qa_info_group(row2Layout)
+        self.create_database_retention_group(row2Layout)
+        self.create_database_backup_group(row2Layout)
 
     def create_info_label_style_group(self, layout):
         info_label_window_group = QGroupBox('Info Label Style')
@@ -231,6 +233,61 @@ class GlobalSetting(QDialog):
     def handle_qa_text_change(self, index, text):
         self._settings.setValue(f'AI_Provider/{self.qa_keys[index]}', text)
 
+    def create_database_retention_group(self, layout):
+        retention_group = QGroupBox(UI.DATABASE_RETENTION)
+        retention_layout = QGridLayout()
+
+        self.retention_labels = [UI.DATABASE_RETENTION_AUDIO, UI.DATABASE_RETENTION_IMAGE,
+                                 UI.DATABASE_RETENTION_ARCHIVE]
+        self.retention_keys = [Constants.DATABASE_RETENTION_AUDIO_DAYS, Constants.DATABASE_RETENTION_IMAGE_DAYS,
+                               Constants.DATABASE_RETENTION_ARCHIVE_DAYS]
+        retention_defaults = [0, 0, Constants.DATABASE_ARCHIVE_DEFAULT_DAYS]
+        retention_special_texts = [UI.DATABASE_RETENTION_FOREVER, UI.DATABASE_RETENTION_FOREVER,
+                                   UI.DATABASE_RETENTION_NEVER]
+        self.retention_editors = [QSpinBox() for _ in self.retention_labels]
+
+        for i, label in enumerate(self.retention_labels):
+            editor = self.retention_editors[i]
+            editor.setRange(0, Constants.DATABASE_RETENTION_MAX_DAYS)
+            editor.setSpecialValueText(retention_special_texts[i])
+            editor.setValue(int(self._settings.value(
+                f'{Constants.DATABASE_RETENTION_SECTION}/{self.retention_keys[i]}', retention_defaults[i])))
+            editor.valueChanged.connect(partial(self.handle_retention_value_change, i))
+            retention_layout.addWidget(QLabel(label), i, 0)
+            retention_layout.addWidget(editor, i, 1)
+
+        retention_group.setLayout(retention_layout)
+        layout.addWidget(retention_group)
+
+    def handle_retention_value_change(self, index, value):
+        self._settings.setValue(f'{Constants.DATABASE_RETENTION_SECTION}/{self.retention_keys[index]}', value)
+
+    def create_database_backup_group(self, layout):
+        backup_group = QGroupBox(UI.DATABASE_BACKUP)
+        backup_layout = QGridLayout()
+
+        self.backup_keys = [Constants.DATABASE_BACKUP_INTERVAL_HOURS, Constants.DATABASE_BACKUP_KEEP_COUNT]
+        backup_labels = [UI.DATABASE_BACKUP_INTERVAL, UI.DATABASE_BACKUP_KEEP]
+        backup_defaults = [Constants.DATABASE_BACKUP_DEFAULT_INTERVAL_HOURS, Constants.DATABASE_BACKUP_DEFAULT_KEEP_COUNT]
+        backup_ranges = [(0, Constants.DATABASE_BACKUP_MAX_INTERVAL_HOURS), (1, Constants.DATABASE_BACKUP_MAX_KEEP_COUNT)]
+        self.backup_editors = [QSpinBox() for _ in backup_labels]
+        self.backup_editors[0].setSpecialValueText(UI.DATABASE_BACKUP_OFF)
+
+        for i, label in enumerate(backup_labels):
+            editor = self.backup_editors[i]
+            editor.setRange(*backup_ranges[i])
+            editor.setValue(int(self._settings.value(
+                f'{Constants.DATABASE_BACKUP_SECTION}/{self.backup_keys[i]}', backup_defaults[i])))
+            editor.valueChanged.connect(partial(self.handle_backup_value_change, i))
+            backup_layout.addWidget(QLabel(label), i, 0)
+            backup_layout.addWidget(editor, i, 1)
+
+        backup_group.setLayout(backup_layout)
+        layout.addWidget(backup_group)
+
+    def handle_backup_value_change(self, index, value):
+        self._settings.setValue(f'{Constants.DATABASE_BACKUP_SECTION}/{self.backup_keys[index]}', value)
+
     def ai_color_dialog(self, i):
         print(i)
         color = QColorDialog.getColor()
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal, QByteArray
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.DatabaseConnectionManager import DatabaseConnectionManager
+from util.Utility import Utility
+
+
+class HistoryExportThread(QThread):
+    progress_signal = pyqtSignal(int)
+    export_finished_signal = pyqtSignal(int, float, str)
+
+    def __init__(self, db_filename, export_filename, history_tables, blob_store_table_name, database_archive=None):
+        super().__init__()
+        self.db_filename = db_filename
+        self.export_filename = export_filename
+        self.files_dirname = os.path.splitext(export_filename)[0] + Constants.HISTORY_FILES_SUFFIX
+        self.history_tables = history_tables
+        self.blob_store_table_name = blob_store_table_name
+        self.database_archive = database_archive
+        self.connection_name = Constants.HISTORY_TRANSFER_CONNECTION
+        self.exported_blob_hashes = set()
+
+    def run(self):
+        start_time = time.perf_counter()
+        row_count, error = self.export_all()
+        self.export_finished_signal.emit(row_count, time.perf_counter() - start_time, error)
+        QSqlDatabase.removeDatabase(self.connection_name)
+
+    def export_all(self):
+        db = DatabaseConnectionManager.open_connection(self.db_filename, self.connection_name)
+        if not db.isOpen():
+            return 0, DATABASE_MESSAGE.DATABASE_FAILED_OPEN
+
+        row_count = 0
+        error = ""
+        try:
+            os.makedirs(self.files_dirname, exist_ok=True)
+            if self.database_archive is not None and not self.database_archive.attach(db):
+                self.database_archive = None
+            with open(self.export_filename, "w", encoding="utf-8",
+                      buffering=Constants.HISTORY_WRITE_BUFFER_SIZE) as export_file:
+                export_file.write(json.dumps({"format": Constants.HISTORY_FORMAT,
+                                              "version": Constants.HISTORY_FORMAT_VERSION}) + "\n")
+                for table_name, row in self.generate_records(db):
+                    if self.isInterruptionRequested():
+                        raise Exception(DATABASE_MESSAGE.DATABASE_HISTORY_CANCELLED)
+                    export_file.write(json.dumps({"table": table_name, "row": row}, ensure_ascii=False) + "\n")
+                    row_count += 1
+                    if row_count % Constants.HISTORY_BATCH_SIZE == 0:
+                        self.progress_signal.emit(row_count)
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_HISTORY_EXPORT_SUCCESS} {self.export_filename}: {row_count}")
+        except Exception as e:
+            error = str(e)
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_HISTORY_EXPORT_FAIL} {self.export_filename}: {error}")
+        db.close()
+        return row_count, error
+
+    def generate_records(self, db):
+        for table_name, _, _, text_column, _ in self.history_tables:
+            for row in self.select_rows(db, f"SELECT * FROM {table_name} ORDER BY 1"):
+                yield from self.generate_row_records(db, table_name, row, text_column)
+            for row in self.generate_archived_rows(db, table_name):
+                yield from self.generate_row_records(db, table_name, row, text_column)
+
+    def generate_row_records(self, db, table_name, row, text_column):
+        if "archived" in row:
+            row["archived"] = 0
+        if text_column and row.get(text_column) is not None:
+            row[text_column] = Utility.decompress_text(row[text_column])
+        for column, value in row.items():
+            if isinstance(value, QByteArray):
+                row[column] = self.write_file(bytes(value))
+            elif isinstance(value, dict) and "blob" in value:
+                row[column] = self.write_file(self.database_archive.get_blob(db, value["blob"]))
+        blob_hash = row.get("blob_hash")
+        if blob_hash and blob_hash not in self.exported_blob_hashes:
+            self.exported_blob_hashes.add(blob_hash)
+            yield self.blob_store_table_name, self.get_blob_row(db, blob_hash)
+        yield table_name, row
+
+    def generate_archived_rows(self, db, table_name):
+        if self.database_archive is None:
+            return
+        for source, (_, message_table_name, _, file_table_name, _, _) in self.database_archive.sources.items():
+            if table_name == message_table_name:
+                key = "messages"
+            elif table_name == file_table_name:
+                key = "files"
+            else:
+                continue
+            for payload in self.database_archive.generate_payloads(db, source):
+                yield from payload[key]
+
+    def get_blob_row(self, db, blob_hash):
+        query = QSqlQuery(db)
+        query.prepare(f"SELECT hash, data, mime_type, created_at FROM main.{self.blob_store_table_name} "
+                      f" WHERE hash = :hash")
+        query.bindValue(":hash", blob_hash)
+        if query.exec() and query.next():
+            row = {"hash": query.value(0), "data": self.write_file(bytes(query.value(1))),
+                   "mime_type": query.value(2), "created_at": query.value(3)}
+            query.finish()
+            return row
+        if self.database_archive is None:
+            raise Exception(f"{DATABASE_MESSAGE.DATABASE_ARCHIVE_BLOB_MISSING} {blob_hash}")
+        return {"hash": blob_hash, "data": self.write_file(self.database_archive.get_blob(db, blob_hash)),
+                "mime_type": self.database_archive.get_blob_mime_type(db, blob_hash)}
+
+    @staticmethod
+    def select_rows(db, query_string):
+        query = QSqlQuery(db)
+        query.setForwardOnly(True)
+        if not query.exec(query_string):
+            raise Exception(query.lastError().text())
+        while query.next():
+            record = query.record()
+            yield {record.fieldName(index): query.value(index) for index in range(record.count())}
+
+    def write_file(self, data):
+        blob_hash = Utility.get_content_hash(data)
+        relative_path = f"{os.path.basename(self.files_dirname)}/{blob_hash}"
+        file_path = os.path.join(self.files_dirname, blob_hash)
+        if not os.path.exists(file_path):
+            with open(file_path, "wb") as file:
+                file.write(data)
+        return {"file": relative_path}
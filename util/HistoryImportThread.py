@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal, QByteArray
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from util.Constants import Constants, DATABASE_MESSAGE
+from util.DatabaseConnectionManager import DatabaseConnectionManager
+from util.DatabaseWriterThread import DatabaseWriterThread
+from util.StatementCache import StatementCache
+from util.Utility import Utility
+
+
+class HistoryImportThread(QThread):
+    progress_signal = pyqtSignal(int)
+    import_finished_signal = pyqtSignal(int, float, str)
+
+    def __init__(self, db_filename, import_filename, history_tables, blob_store_table_name):
+        super().__init__()
+        self.db_filename = db_filename
+        self.import_filename = import_filename
+        self.history_tables = {table[0]: table for table in history_tables}
+        self.blob_store_table_name = blob_store_table_name
+        self.connection_name = Constants.HISTORY_TRANSFER_CONNECTION
+        self.id_maps = {table_name: {} for table_name in self.history_tables}
+        self.table_columns = {}
+
+    def run(self):
+        start_time = time.perf_counter()
+        row_count, error = self.import_all()
+        self.import_finished_signal.emit(row_count, time.perf_counter() - start_time, error)
+        QSqlDatabase.removeDatabase(self.connection_name)
+
+    def import_all(self):
+        db = DatabaseConnectionManager.open_connection(self.db_filename, self.connection_name)
+        if not db.isOpen():
+            return 0, DATABASE_MESSAGE.DATABASE_FAILED_OPEN
+
+        statement_cache = StatementCache(db)
+        row_count = 0
+        error = ""
+        in_transaction = False
+        try:
+            for table_name, row in self.read_records():
+                if self.isInterruptionRequested():
+                    raise Exception(DATABASE_MESSAGE.DATABASE_HISTORY_CANCELLED)
+                if not in_transaction:
+                    if not DatabaseWriterThread.begin_transaction(db):
+                        raise Exception(DATABASE_MESSAGE.DATABASE_WRITER_COMMIT_FAIL)
+                    in_transaction = True
+                self.import_row(db, statement_cache, table_name, row)
+                row_count += 1
+                if row_count % Constants.HISTORY_BATCH_SIZE == 0:
+                    if not db.commit():
+                        raise Exception(db.lastError().text())
+                    in_transaction = False
+                    self.progress_signal.emit(row_count)
+            if in_transaction and not db.commit():
+                raise Exception(db.lastError().text())
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_HISTORY_IMPORT_SUCCESS} {self.import_filename}: {row_count}")
+        except Exception as e:
+            if in_transaction:
+                db.rollback()
+            error = str(e)
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_HISTORY_IMPORT_FAIL} {self.import_filename}: {error}")
+        statement_cache.clear()
+        db.close()
+        return row_count, error
+
+    def read_records(self):
+        with open(self.import_filename, "r", encoding="utf-8") as import_file:
+            header = json.loads(import_file.readline() or "{}")
+            if header.get("format") != Constants.HISTORY_FORMAT:
+                raise Exception(f"{DATABASE_MESSAGE.DATABASE_HISTORY_INVALID_FORMAT} {self.import_filename}")
+            for line in import_file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["table"], record["row"]
+
+    def import_row(self, db, statement_cache, table_name, row):
+        if table_name == self.blob_store_table_name:
+            row.pop("ref_count", None)
+            self.insert_row(db, statement_cache, f"INSERT OR IGNORE INTO {table_name}", row)
+            return
+        if table_name not in self.history_tables:
+            raise Exception(f"{DATABASE_MESSAGE.DATABASE_HISTORY_INVALID_FORMAT} {table_name}")
+
+        _, parent_column, parent_table_name, text_column, fts_table_name = self.history_tables[table_name]
+        old_id = row.pop("id", None)
+        for column in Constants.CONVERSATION_SUMMARY_COLUMNS:
+            row.pop(column, None)
+        if parent_column:
+            parent_id = self.id_maps[parent_table_name].get(row.get(parent_column))
+            if parent_id is None:
+                return
+            row[parent_column] = parent_id
+
+        text = None
+        if text_column and isinstance(row.get(text_column), str):
+            compressed_text = Utility.compress_text(row[text_column])
+            if compressed_text is not None:
+                text = row[text_column]
+                row[text_column] = QByteArray(compressed_text)
+        new_id = self.insert_row(db, statement_cache, f"INSERT INTO {table_name}", row)
+        if text is not None:
+            query = statement_cache.prepare(f"INSERT INTO {fts_table_name}(rowid, {text_column}) VALUES (:rowid, :text)")
+            query.bindValue(":rowid", new_id)
+            query.bindValue(":text", text)
+            if not query.exec():
+                raise Exception(query.lastError().text())
+        if old_id is not None:
+            self.id_maps[table_name][old_id] = new_id
+
+    def insert_row(self, db, statement_cache, insert_string, row):
+        table_name = insert_string.split()[-1]
+        columns = [column for column in row if column in self.get_table_columns(db, table_name)]
+        query = statement_cache.prepare(f"{insert_string} ({', '.join(columns)}) "
+                                        f" VALUES ({', '.join(':' + column for column in columns)})")
+        for column in columns:
+            query.bindValue(":" + column, self.read_value(row[column]))
+        if not query.exec():
+            raise Exception(f"{table_name}: {query.lastError().text()}")
+        return query.lastInsertId()
+
+    def read_value(self, value):
+        if isinstance(value, dict) and "file" in value:
+            with open(os.path.join(os.path.dirname(self.import_filename), value["file"]), "rb") as file:
+                return QByteArray(file.read())
+        return value
+
+    def get_table_columns(self, db, table_name):
+        if table_name not in self.table_columns:
+            query = QSqlQuery(db)
+            columns = set()
+            if query.exec(f"PRAGMA table_info({table_name})"):
+                while query.next():
+                    columns.add(query.value("name"))
+            query.finish()
+            self.table_columns[table_name] = columns
+        return self.table_columns[table_name]
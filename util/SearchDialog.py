@@ -0,0 +1,65 @@
+import html
+
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QListWidget, QListWidgetItem
+
+from custom.PromptTextEdit import PromptTextEdit
+from util.Constants import Constants, UI
+
+
+class SearchDialog(QDialog):
+    message_selected_signal = pyqtSignal(str, int, int)
+
+    def __init__(self, database):
+        super().__init__()
+        self.database = database
+        self.setWindowTitle(UI.SEARCH_ALL_TITLE)
+        self.resize(640, 480)
+
+        self.layout = QVBoxLayout()
+
+        self.search_text = PromptTextEdit()
+        self.search_text.submitted_signal.connect(self.search)
+        self.search_text.setPlaceholderText(UI.SEARCH_PROMPT_PLACEHOLDER)
+        self.search_text.setFixedHeight(self.search_text.fontMetrics().height() * 2)
+        self.search_text.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.layout.addWidget(self.search_text)
+
+        self.search_result = QLabel()
+        self.layout.addWidget(self.search_result)
+
+        self.result_list = QListWidget()
+        self.result_list.itemActivated.connect(self.select_result)
+        self.result_list.itemClicked.connect(self.select_result)
+        self.layout.addWidget(self.result_list)
+
+        self.setLayout(self.layout)
+
+    @pyqtSlot(str)
+    def search(self, text):
+        self.result_list.clear()
+        results = self.database.search_messages(text)
+        for result in results:
+            item = QListWidgetItem()
+            item.setData(Qt.ItemDataRole.UserRole, (result['source'], result['main_id'], result['message_id']))
+            label = QLabel(self.format_result(result))
+            label.setWordWrap(True)
+            item.setSizeHint(label.sizeHint())
+            self.result_list.addItem(item)
+            self.result_list.setItemWidget(item, label)
+        if results:
+            self.search_result.setText(f'{len(results)} {UI.FOUNDS}')
+        else:
+            self.search_result.setText(UI.NOT_FOUND)
+
+    @staticmethod
+    def format_result(result):
+        snippet = html.escape(result['snippet'] or "")
+        snippet = snippet.replace(Constants.SEARCH_HIGHLIGHT_START, "<b>").replace(Constants.SEARCH_HIGHLIGHT_END, "</b>")
+        return f"<i>{html.escape(result['source'].upper())}</i> - <b>{html.escape(result['title'])}</b><br>{snippet}"
+
+    @pyqtSlot(QListWidgetItem)
+    def select_result(self, item):
+        source, main_id, message_id = item.data(Qt.ItemDataRole.UserRole)
+        self.message_selected_signal.emit(source, main_id, message_id)
+        self.accept()
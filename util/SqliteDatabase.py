@@ -1,8 +1,23 @@
+import base64
 import logging
-
-from PyQt6.QtSql import QSqlDatabase, QSqlQuery, QSqlTableModel
-
+import os
+import re
+
+from PyQt6.QtCore import QByteArray
+from PyQt6.QtSql import QSqlQuery, QSqlTableModel
+
+from util.BlobMigrationThread import BlobMigrationThread
+from util.ChatType import ChatType
+from util.DatabaseArchive import DatabaseArchive
+from util.DatabaseBackupThread import DatabaseBackupThread
+from util.DatabaseCompactionThread import DatabaseCompactionThread
+from util.DatabaseConnectionManager import DatabaseConnectionManager
+from util.DatabaseTurn import DatabaseTurn
+from util.DatabaseWriterThread import DatabaseWriterThread, StatementRowId
+from util.HistoryExportThread import HistoryExportThread
+from util.HistoryImportThread import HistoryImportThread
 from util.Constants import Constants, DATABASE_MESSAGE
+from util.Utility import Utility
 
 
 class SqliteDatabase:
@@ -13,47 +28,379 @@ class SqliteDatabase:
 
     def initialize_vars(self, db_filename):
         self.db_filename = db_filename
-        self.db = None
+        self.connection_manager = DatabaseConnectionManager(db_filename)
         self.model = None
+        self.blob_migration_thread = None
+        self.compaction_thread = None
+        self.database_writer = None
+        self.database_archive = None
+        self.history_transfer_thread = None
+        self.backup_thread = None
 
         # Chat
         self.chat_main_table_name = Constants.CHAT_MAIN_TABLE
         self.chat_detail_table_name = Constants.CHAT_DETAIL_TABLE
+        self.chat_message_table_name = Constants.CHAT_MESSAGE_TABLE
+        self.chat_message_index_name = Constants.CHAT_MESSAGE_INDEX
+        self.chat_message_fts_table_name = Constants.CHAT_MESSAGE_FTS_TABLE
 
         # Image
         self.image_main_table_name = Constants.IMAGE_MAIN_TABLE
         self.image_detail_table_name = Constants.IMAGE_DETAIL_TABLE
+        self.image_message_table_name = Constants.IMAGE_MESSAGE_TABLE
+        self.image_message_index_name = Constants.IMAGE_MESSAGE_INDEX
 
         # Image File
         self.image_file_table_name = Constants.IMAGE_FILE_TABLE
+        self.image_file_index_name = Constants.IMAGE_FILE_INDEX
 
         # Vision
         self.vision_main_table_name = Constants.VISION_MAIN_TABLE
         self.vision_detail_table_name = Constants.VISION_DETAIL_TABLE
+        self.vision_message_table_name = Constants.VISION_MESSAGE_TABLE
+        self.vision_message_index_name = Constants.VISION_MESSAGE_INDEX
+        self.vision_message_fts_table_name = Constants.VISION_MESSAGE_FTS_TABLE
 
         # Vision File
         self.vision_file_table_name = Constants.VISION_FILE_TABLE
+        self.vision_file_index_name = Constants.VISION_FILE_INDEX
 
         # TTS
         self.tts_main_table_name = Constants.TTS_MAIN_TABLE
         self.tts_detail_table_name = Constants.TTS_DETAIL_TABLE
+        self.tts_message_table_name = Constants.TTS_MESSAGE_TABLE
+        self.tts_message_index_name = Constants.TTS_MESSAGE_INDEX
+        self.tts_message_fts_table_name = Constants.TTS_MESSAGE_FTS_TABLE
 
         # STT
         self.stt_main_table_name = Constants.STT_MAIN_TABLE
         self.stt_detail_table_name = Constants.STT_DETAIL_TABLE
+        self.stt_message_table_name = Constants.STT_MESSAGE_TABLE
+        self.stt_message_index_name = Constants.STT_MESSAGE_INDEX
+        self.stt_message_fts_table_name = Constants.STT_MESSAGE_FTS_TABLE
 
         # Prompt
         self.prompt_table_name = Constants.CHAT_PROMPT_TABLE
 
+        # Blob Store
+        self.blob_store_table_name = Constants.BLOB_STORE_TABLE
+
+        # Committed Turn
+        self.committed_turn_table_name = Constants.COMMITTED_TURN_TABLE
+
+        # Archive
+        self.archive_sources = {
+            Constants.SEARCH_SOURCE_CHAT: (self.chat_main_table_name, self.chat_message_table_name, "chat_main_id",
+                                           None, None, "chat"),
+            Constants.ARCHIVE_SOURCE_IMAGE: (self.image_main_table_name, self.image_message_table_name, "image_main_id",
+                                             self.image_file_table_name, "image_message_id", None),
+            Constants.SEARCH_SOURCE_VISION: (self.vision_main_table_name, self.vision_message_table_name,
+                                             "vision_main_id", self.vision_file_table_name, "vision_message_id",
+                                             "vision_text"),
+            Constants.SEARCH_SOURCE_TTS: (self.tts_main_table_name, self.tts_message_table_name, "tts_main_id",
+                                          None, None, "tts_text"),
+            Constants.SEARCH_SOURCE_STT: (self.stt_main_table_name, self.stt_message_table_name, "stt_main_id",
+                                          None, None, "stt_text"),
+        }
+
+        # Conversation summaries
+        self.summary_sources = [
+            (Constants.SEARCH_SOURCE_CHAT, "chat_model", Constants.CHAT_MAIN_ACTIVITY_INDEX),
+            (Constants.ARCHIVE_SOURCE_IMAGE, "image_model", Constants.IMAGE_MAIN_ACTIVITY_INDEX),
+            (Constants.SEARCH_SOURCE_VISION, "vision_model", Constants.VISION_MAIN_ACTIVITY_INDEX),
+            (Constants.SEARCH_SOURCE_TTS, "tts_model", Constants.TTS_MAIN_ACTIVITY_INDEX),
+            (Constants.SEARCH_SOURCE_STT, "stt_model", Constants.STT_MAIN_ACTIVITY_INDEX),
+        ]
+
+        # History export / import, parents before children
+        self.history_tables = [
+            (self.prompt_table_name, None, None, None, None),
+            (self.chat_main_table_name, None, None, None, None),
+            (self.chat_message_table_name, "chat_main_id", self.chat_main_table_name,
+             "chat", self.chat_message_fts_table_name),
+            (self.image_main_table_name, None, None, None, None),
+            (self.image_message_table_name, "image_main_id", self.image_main_table_name, None, None),
+            (self.image_file_table_name, "image_message_id", self.image_message_table_name, None, None),
+            (self.vision_main_table_name, None, None, None, None),
+            (self.vision_message_table_name, "vision_main_id", self.vision_main_table_name,
+             "vision_text", self.vision_message_fts_table_name),
+            (self.vision_file_table_name, "vision_message_id", self.vision_message_table_name, None, None),
+            (self.tts_main_table_name, None, None, None, None),
+            (self.tts_message_table_name, "tts_main_id", self.tts_main_table_name, None, None),
+            (self.stt_main_table_name, None, None, None, None),
+            (self.stt_message_table_name, "stt_main_id", self.stt_main_table_name,
+             "stt_text", self.stt_message_fts_table_name),
+        ]
+
+        # Search
+        self.search_sources = [
+            (Constants.SEARCH_SOURCE_CHAT, self.chat_message_fts_table_name, self.chat_message_table_name,
+             self.chat_main_table_name, "chat_main_id", "chat"),
+            (Constants.SEARCH_SOURCE_VISION, self.vision_message_fts_table_name, self.vision_message_table_name,
+             self.vision_main_table_name, "vision_main_id", "vision_text"),
+            (Constants.SEARCH_SOURCE_TTS, self.tts_message_fts_table_name, self.tts_message_table_name,
+             self.tts_main_table_name, "tts_main_id", "tts_text"),
+            (Constants.SEARCH_SOURCE_STT, self.stt_message_fts_table_name, self.stt_message_table_name,
+             self.stt_main_table_name, "stt_main_id", "stt_text"),
+        ]
+
+    @property
+    def db(self):
+        return self.connection_manager.get_connection()
+
+    @property
+    def statement_cache(self):
+        return self.connection_manager.get_statement_cache()
+
     def initialize_db(self):
-        self.db = QSqlDatabase.addDatabase(Constants.SQLITE_DATABASE)
-        self.db.setDatabaseName(self.db_filename)
-        if not self.db.open():
-            print(f"{DATABASE_MESSAGE.DATABASE_FAILED_OPEN}")
+        if not self.db.isOpen():
             return
 
         self.enable_foreign_key()
+        self.enable_incremental_vacuum()
+        self.enable_write_ahead_log()
         self.create_all_tables()
+        self.migrate_all_tables()
+        self.create_archive()
+        self.create_conversation_summaries()
+        self.statement_cache.clear()
+        self.start_database_writer()
+        self.recover_pending_turns()
+        self.start_blob_migration()
+
+    def start_database_writer(self):
+        self.database_writer = DatabaseWriterThread(self.db_filename)
+        self.database_writer.start()
+
+    def submit_write(self, statements, error_message, row_id_index=0, turn=None):
+        if turn is not None:
+            turn.add(statements, error_message)
+            return None
+
+        future = self.database_writer.submit(statements, row_id_index)
+
+        def report_error(done_future):
+            if done_future.exception() is not None:
+                print(f"{error_message} {done_future.exception()}")
+
+        future.add_done_callback(report_error)
+        return future
+
+    def begin_turn(self):
+        return DatabaseTurn(self, self.db_filename + Constants.PENDING_TURN_SUFFIX)
+
+    def recover_pending_turns(self):
+        DatabaseTurn.recover(self, self.db_filename + Constants.PENDING_TURN_SUFFIX)
+
+    def prepare_query(self, query_string):
+        return self.statement_cache.prepare(query_string)
+
+    def submit_delete(self, statements, success_message, error_message):
+        # Queued behind pending inserts, so the GUI never waits for the writer's commit
+        future = self.submit_write(statements, error_message)
+        future.add_done_callback(
+            lambda done_future: done_future.exception() is None and logging.info(success_message))
+        return True
+
+    def start_blob_migration(self):
+        self.blob_migration_thread = BlobMigrationThread(self.db_filename, [
+            (self.image_file_table_name, "image_detail_file_data", "image_detail_file_mime_type"),
+            (self.vision_file_table_name, "vision_detail_file_data", "vision_detail_file_mime_type"),
+            (self.stt_message_table_name, "stt_data", "stt_data_mime_type"),
+        ], self.blob_store_table_name, [
+            (self.image_file_table_name, "image_detail_file_data", "image_detail_file_mime_type"),
+            (self.vision_file_table_name, "vision_detail_file_data", "vision_detail_file_mime_type"),
+        ])
+        self.blob_migration_thread.start()
+
+    def create_archive(self):
+        for main_table_name, _, _, _, _, _ in self.archive_sources.values():
+            self.add_column(main_table_name, "archived", "INTEGER DEFAULT 0 NOT NULL")
+        database_archive = DatabaseArchive(os.path.splitext(self.db_filename)[0] + Constants.ARCHIVE_DATABASE_SUFFIX,
+                                           self.archive_sources, self.blob_store_table_name)
+        if database_archive.attach(self.db):
+            self.database_archive = database_archive
+            self.connection_manager.add_connection_initializer(database_archive.attach)
+
+    def create_conversation_summaries(self):
+        for source, model_column, index_name in self.summary_sources:
+            main_table_name, message_table_name, main_id_column, _, _, _ = self.archive_sources[source]
+            self.create_conversation_summary(source, main_table_name, message_table_name, main_id_column,
+                                             model_column, index_name)
+
+    def create_conversation_summary(self, source, main_table_name, message_table_name, main_id_column,
+                                    model_column, index_name):
+        # Triggers skip archived conversations so archiving and restoring keep the counts
+        backfill = "message_count" not in self.get_table_columns(main_table_name)
+        statements = [
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {main_table_name} (last_activity_at)",
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {main_table_name}_summary_insert AFTER INSERT ON {main_table_name}
+              WHEN NEW.last_activity_at IS NULL
+            BEGIN
+              UPDATE {main_table_name} SET last_activity_at = NEW.created_at WHERE id = NEW.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {message_table_name}_summary_insert AFTER INSERT ON {message_table_name}
+            BEGIN
+              UPDATE {main_table_name}
+                 SET message_count = message_count + 1,
+                     last_activity_at = MAX(COALESCE(last_activity_at, created_at),
+                                            COALESCE(NEW.created_at, CURRENT_TIMESTAMP)),
+                     last_model = COALESCE(NEW.{model_column}, last_model)
+               WHERE id = NEW.{main_id_column} AND archived = 0;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {message_table_name}_summary_delete AFTER DELETE ON {message_table_name}
+            BEGIN
+              UPDATE {main_table_name} SET message_count = MAX(message_count - 1, 0)
+               WHERE id = OLD.{main_id_column} AND archived = 0;
+            END
+            """,
+        ]
+        self.db.transaction()
+        try:
+            for column_name, column_definition in [("last_activity_at", "TIMESTAMP"),
+                                                   ("message_count", "INTEGER DEFAULT 0 NOT NULL"),
+                                                   ("last_model", "TEXT")]:
+                if not self.add_column(main_table_name, column_name, column_definition):
+                    raise Exception(f"{main_table_name}.{column_name}")
+            query = QSqlQuery(self.db)
+            if backfill:
+                if not query.exec(f"UPDATE {main_table_name} SET "
+                                  f" message_count = (SELECT COUNT(*) FROM {message_table_name} m "
+                                  f"   WHERE m.{main_id_column} = {main_table_name}.id), "
+                                  f" last_activity_at = COALESCE((SELECT MAX(m.created_at) FROM {message_table_name} m "
+                                  f"   WHERE m.{main_id_column} = {main_table_name}.id), created_at), "
+                                  f" last_model = (SELECT m.{model_column} FROM {message_table_name} m "
+                                  f"   WHERE m.{main_id_column} = {main_table_name}.id AND m.{model_column} IS NOT NULL "
+                                  f"   ORDER BY m.id DESC LIMIT 1)"):
+                    raise Exception(query.lastError().text())
+                self.backfill_archived_summaries(source, main_table_name, main_id_column, model_column)
+            for statement in statements:
+                if not query.exec(statement):
+                    raise Exception(query.lastError().text())
+            if not self.db.commit():
+                raise Exception(self.db.lastError().text())
+            if backfill:
+                logging.info(f"{DATABASE_MESSAGE.DATABASE_SUMMARY_BACKFILL_SUCCESS} {main_table_name}")
+        except Exception as e:
+            self.db.rollback()
+            print(f"{DATABASE_MESSAGE.DATABASE_SUMMARY_CREATE_ERROR} {main_table_name}: {e}")
+
+    def backfill_archived_summaries(self, source, main_table_name, main_id_column, model_column):
+        if self.database_archive is None:
+            return
+        query = QSqlQuery(self.db)
+        query.prepare(f"UPDATE {main_table_name} SET message_count = :message_count, "
+                      f" last_activity_at = COALESCE(:last_activity_at, created_at), last_model = :last_model "
+                      f" WHERE id = :main_id")
+        for payload in self.database_archive.generate_payloads(self.db, source):
+            messages = payload["messages"]
+            if not messages:
+                continue
+            models = [message[model_column] for message in messages if message.get(model_column)]
+            query.bindValue(":message_count", len(messages))
+            query.bindValue(":last_activity_at", max((message["created_at"] for message in messages
+                                                      if message.get("created_at")), default=None))
+            query.bindValue(":last_model", models[-1] if models else None)
+            query.bindValue(":main_id", messages[0][main_id_column])
+            if not query.exec():
+                raise Exception(query.lastError().text())
+
+    def restore_archived_conversation(self, source, main_id):
+        if self.database_archive is None or not main_id \
+                or not self.database_archive.is_archived(self.db, source, main_id):
+            return
+        try:
+            self.database_archive.restore_conversation(self.db, source, main_id)
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_ARCHIVE_RESTORE_SUCCESS} {source} {main_id}")
+        except Exception as e:
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_ARCHIVE_RESTORE_FAIL} {source} {main_id}: {e}")
+
+    def delete_archived_conversation(self, source, main_id):
+        if self.database_archive is not None:
+            self.database_archive.delete_conversation(self.db, source, main_id)
+
+    def start_compaction(self, audio_days, file_days, archive_days=0):
+        if self.compaction_thread is not None and self.compaction_thread.isRunning():
+            return None
+        self.compaction_thread = DatabaseCompactionThread(self.db_filename, [
+            (self.tts_message_table_name, "tts_data"),
+            (self.stt_message_table_name, "stt_data"),
+        ], audio_days, [
+            self.image_file_table_name,
+            self.vision_file_table_name,
+        ], file_days, self.blob_store_table_name, self.database_archive, archive_days)
+        self.compaction_thread.start()
+        return self.compaction_thread
+
+    def get_database_size(self):
+        return sum(os.path.getsize(filename) for filename in [self.db_filename, self.db_filename + "-wal"]
+                   if os.path.exists(filename))
+
+    def get_backup_dirname(self):
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_filename)), Constants.DATABASE_BACKUP_DIRNAME)
+
+    def get_latest_backup_time(self):
+        snapshot_filenames = DatabaseBackupThread.get_snapshot_filenames(self.get_backup_dirname(), self.db_filename)
+        return os.path.getmtime(snapshot_filenames[-1]) if snapshot_filenames else None
+
+    def start_backup(self, keep_count):
+        if self.backup_thread is not None and self.backup_thread.isRunning():
+            return None
+        archive_filename = self.database_archive.archive_filename if self.database_archive is not None else None
+        self.backup_thread = DatabaseBackupThread(self.db_filename, self.get_backup_dirname(), keep_count,
+                                                  archive_filename)
+        self.backup_thread.start()
+        return self.backup_thread
+
+    def start_history_export(self, export_filename):
+        if self.history_transfer_thread is not None and self.history_transfer_thread.isRunning():
+            return None
+        self.history_transfer_thread = HistoryExportThread(self.db_filename, export_filename, self.history_tables,
+                                                           self.blob_store_table_name, self.database_archive)
+        self.history_transfer_thread.start()
+        return self.history_transfer_thread
+
+    def start_history_import(self, import_filename):
+        if self.history_transfer_thread is not None and self.history_transfer_thread.isRunning():
+            return None
+        self.history_transfer_thread = HistoryImportThread(self.db_filename, import_filename, self.history_tables,
+                                                           self.blob_store_table_name)
+        self.history_transfer_thread.start()
+        return self.history_transfer_thread
+
+    def close(self):
+        if self.compaction_thread is not None and self.compaction_thread.isRunning():
+            self.compaction_thread.requestInterruption()
+            self.compaction_thread.wait()
+        if self.history_transfer_thread is not None and self.history_transfer_thread.isRunning():
+            self.history_transfer_thread.requestInterruption()
+            self.history_transfer_thread.wait()
+        if self.backup_thread is not None and self.backup_thread.isRunning():
+            self.backup_thread.requestInterruption()
+            self.backup_thread.wait()
+        if self.database_writer is not None:
+            self.database_writer.stop()
+        if self.blob_migration_thread is not None and self.blob_migration_thread.isRunning():
+            self.blob_migration_thread.requestInterruption()
+            self.blob_migration_thread.wait()
+        self.connection_manager.release_connection()
+
+    @staticmethod
+    def encode_file_data(file_data):
+        if isinstance(file_data, (bytes, bytearray)):
+            return QByteArray(file_data)
+        return file_data
+
+    @staticmethod
+    def decode_file_data(file_data):
+        if isinstance(file_data, str):
+            return base64.b64decode(file_data)
+        return bytes(file_data) if file_data is not None else None
 
     def enable_foreign_key(self):
         query = QSqlQuery(db=self.db)
@@ -61,6 +408,23 @@ class SqliteDatabase:
         if not query.exec(query_string):
             print(f"{DATABASE_MESSAGE.DATABASE_ENABLE_FOREIGN_KEY} {query.lastError().text()}")
 
+    def enable_incremental_vacuum(self):
+        # Takes effect on a new database; an existing one is converted by the first idle compaction
+        query = QSqlQuery(db=self.db)
+        if not query.exec(DATABASE_MESSAGE.DATABASE_PRAGMA_AUTO_VACUUM_INCREMENTAL):
+            print(f"{DATABASE_MESSAGE.DATABASE_PRAGMA_ERROR} {DATABASE_MESSAGE.DATABASE_PRAGMA_AUTO_VACUUM_INCREMENTAL}: "
+                  f"{query.lastError().text()}")
+        query.finish()
+
+    def enable_write_ahead_log(self):
+        query = QSqlQuery(db=self.db)
+        for pragma in [DATABASE_MESSAGE.DATABASE_PRAGMA_JOURNAL_MODE_WAL,
+                       DATABASE_MESSAGE.DATABASE_PRAGMA_SYNCHRONOUS_NORMAL,
+                       DATABASE_MESSAGE.DATABASE_PRAGMA_BUSY_TIMEOUT]:
+            if not query.exec(pragma):
+                print(f"{DATABASE_MESSAGE.DATABASE_PRAGMA_ERROR} {pragma}: {query.lastError().text()}")
+        query.finish()
+
     def setup_model(self, table_name, filter=""):
         self.model = QSqlTableModel(db=self.db)
         self.model.setTable(table_name)
@@ -71,16 +435,31 @@ class SqliteDatabase:
 
     def create_all_tables(self):
         self.create_chat_main()
+        self.create_chat_message()
+        self.create_blob_store()
         self.create_image_main()
+        self.create_image_message()
         self.create_image_file()
         self.create_tts_main()
+        self.create_tts_message()
         self.create_stt_main()
+        self.create_stt_message()
         self.create_vision_main()
+        self.create_vision_message()
         self.create_vision_file()
         self.create_prompt()
+        self.create_committed_turn()
+        self.create_search_indexes()
+
+    def migrate_all_tables(self):
+        self.migrate_chat_detail_tables()
+        self.migrate_image_detail_tables()
+        self.migrate_vision_detail_tables()
+        self.migrate_tts_detail_tables()
+        self.migrate_stt_detail_tables()
 
     def create_chat_main(self):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         CREATE TABLE IF NOT EXISTS {self.chat_main_table_name} 
                          (
@@ -95,21 +474,17 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_CHAT_CREATE_TABLE_ERROR} {e}")
 
     def add_chat_main(self, title):
-        query = QSqlQuery()
-        query.prepare(f"INSERT INTO {self.chat_main_table_name} (title) VALUES (:title)")
+        query = self.prepare_query(f"INSERT INTO {self.chat_main_table_name} (title) VALUES (:title)")
         query.bindValue(":title", title)
         try:
             if query.exec():
-                chat_main_id = query.lastInsertId()
-                self.create_chat_detail(chat_main_id)
-                return chat_main_id
+                return query.lastInsertId()
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_CHAT_ADD_ERROR} {e}")
         return None
 
     def update_chat_main(self, id, title):
-        query = QSqlQuery()
-        query.prepare(f"UPDATE {self.chat_main_table_name} SET title = :title WHERE id = :id")
+        query = self.prepare_query(f"UPDATE {self.chat_main_table_name} SET title = :title WHERE id = :id")
         query.bindValue(":title", title)
         query.bindValue(":id", id)
         try:
@@ -120,17 +495,9 @@ class SqliteDatabase:
         return False
 
     def delete_chat_main_entry(self, id):
-        try:
-            query = QSqlQuery()
-            query.prepare(f"DELETE FROM {self.chat_main_table_name} WHERE id = :id")
-            query.bindValue(":id", id)
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_CHAT_MAIN_ENTRY_SUCCESS} {id}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_MAIN_ENTRY_FAIL} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.chat_main_table_name} WHERE id = :id", {":id": id})],
+                                  f"{DATABASE_MESSAGE.DATABASE_CHAT_MAIN_ENTRY_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_CHAT_MAIN_ENTRY_FAIL} {id}:")
 
     def delete_chat_main(self, id):
         try:
@@ -138,84 +505,140 @@ class SqliteDatabase:
                 raise Exception(f"Failed to delete chat details for id {id}")
             if not self.delete_chat_main_entry(id):
                 raise Exception(f"Failed to delete chat main entry for id {id}")
+            self.delete_archived_conversation(Constants.SEARCH_SOURCE_CHAT, id)
         except Exception as e:
             logging.error(f"Error deleting chat main for id {id}: {e}")
             return False
         return True
 
     def get_all_chat_main_list(self):
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {self.chat_main_table_name} ORDER BY created_at DESC")
+        query = self.prepare_query(f"SELECT id, title, created_at, last_activity_at, message_count, last_model "
+                                   f" FROM {self.chat_main_table_name} ORDER BY last_activity_at DESC, id DESC")
         try:
             if query.exec():
                 results = []
                 while query.next():
-                    id = query.value(0)
-                    title = query.value(1)
-                    created_at = query.value(2)
-                    results.append({'id': id, 'title': title, 'created_at': created_at})
+                    results.append({
+                        'id': query.value(0),
+                        'title': query.value(1),
+                        'created_at': query.value(2),
+                        'last_activity_at': query.value(3),
+                        'message_count': query.value(4),
+                        'last_model': query.value(5),
+                    })
                 return results
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_RETRIEVE_DATA_FAIL} {self.chat_main_table_name}: {e}")
         return []
 
-    def create_chat_detail(self, chat_main_id):
-        query = QSqlQuery()
-        chat_detail_table = f"{self.chat_detail_table_name}_{chat_main_id}"
+    def create_chat_message(self):
+        query = QSqlQuery(self.db)
         query_string = f"""
-          CREATE TABLE IF NOT EXISTS {chat_detail_table}
+          CREATE TABLE IF NOT EXISTS {self.chat_message_table_name}
             (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                chat_main_id INTEGER,
+                chat_main_id INTEGER NOT NULL,
                 chat_type TEXT,
-                chat_model TEXT,   
-                chat TEXT,     
-                elapsed_time TEXT, 
-                finish_reason TEXT,            
+                chat_model TEXT,
+                chat TEXT,
+                elapsed_time TEXT,
+                finish_reason TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY(chat_main_id) REFERENCES {self.chat_main_table_name}(id) ON DELETE CASCADE 
+                compare_id TEXT,
+                FOREIGN KEY(chat_main_id) REFERENCES {self.chat_main_table_name}(id) ON DELETE CASCADE
             )
          """
+        index_string = f"""
+          CREATE INDEX IF NOT EXISTS {self.chat_message_index_name}
+            ON {self.chat_message_table_name} (chat_main_id, id)
+         """
         try:
-            query.exec(query_string)
-        except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_CREATE_TABLE_ERROR} {chat_main_id}: {e}")
-
-    def insert_chat_detail(self, chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason):
-        chat_detail_table = f"{self.chat_detail_table_name}_{chat_main_id}"
-        query = QSqlQuery()
-        query.prepare(
-            f"INSERT INTO {chat_detail_table} (chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason) "
-            f" VALUES (:chat_main_id, :chat_type, :chat_model, :chat, :elapsed_time, :finish_reason)")
-        query.bindValue(":chat_main_id", chat_main_id)
-        query.bindValue(":chat_type", chat_type)
-        query.bindValue(":chat_model", chat_model)
-        query.bindValue(":chat", chat)
-        query.bindValue(":elapsed_time", elapsed_time)
-        query.bindValue(":finish_reason", finish_reason)
-        try:
-            return query.exec()
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+            if "compare_id" not in self.get_table_columns(self.chat_message_table_name) \
+                    and self.add_column(self.chat_message_table_name, "compare_id", "TEXT"):
+                self.set_legacy_compare_ids(query)
+            if not query.exec(index_string):
+                raise Exception(query.lastError().text())
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_INSERT_ERROR} {e}")
-            return False
+            print(f"{DATABASE_MESSAGE.DATABASE_CHAT_MESSAGE_CREATE_TABLE_ERROR} {e}")
+
+    def set_legacy_compare_ids(self, query):
+        # Rows written before compare_id existed: several answers to one question were a compare run
+        query.prepare(f"UPDATE {self.chat_message_table_name} SET compare_id = "
+                      f" (SELECT MAX(q.id) FROM {self.chat_message_table_name} q "
+                      f"  WHERE q.chat_main_id = {self.chat_message_table_name}.chat_main_id "
+                      f"  AND q.chat_type = :question_type AND q.id < {self.chat_message_table_name}.id) "
+                      f" WHERE chat_type != :answer_type")
+        query.bindValue(":question_type", ChatType.HUMAN.value)
+        query.bindValue(":answer_type", ChatType.HUMAN.value)
+        if not query.exec() or not query.exec(
+                f"UPDATE {self.chat_message_table_name} SET compare_id = NULL WHERE compare_id IN "
+                f" (SELECT compare_id FROM {self.chat_message_table_name} WHERE compare_id IS NOT NULL "
+                f"  GROUP BY compare_id HAVING COUNT(*) = 1)"):
+            raise Exception(query.lastError().text())
+
+    def insert_chat_detail(self, chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason,
+                           compare_id=None, turn=None):
+        query_string = (f"INSERT INTO {self.chat_message_table_name} "
+                        f" (chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason, compare_id) "
+                        f" VALUES (:chat_main_id, :chat_type, :chat_model, :chat, :elapsed_time, :finish_reason,"
+                        f" :compare_id)")
+        return self.submit_write(self.get_compressed_text_statements((query_string, {
+            ":chat_main_id": chat_main_id,
+            ":chat_type": chat_type,
+            ":chat_model": chat_model,
+            ":chat": chat,
+            ":elapsed_time": elapsed_time,
+            ":finish_reason": finish_reason,
+            ":compare_id": compare_id,
+        }), self.chat_message_fts_table_name, "chat"), DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_INSERT_ERROR, turn=turn)
 
     def delete_chat_detail(self, id):
+        return self.submit_delete([(f"DELETE FROM {self.chat_message_table_name} WHERE chat_main_id = :chat_main_id",
+                                    {":chat_main_id": id})],
+                                  f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_DELETE_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_DELETE_ERROR} {id}:")
+
+    def get_chat_details_page(self, chat_main_id, before_id=None, limit=Constants.CHAT_DETAIL_PAGE_SIZE):
+        self.restore_archived_conversation(Constants.SEARCH_SOURCE_CHAT, chat_main_id)
+        before_condition = " AND id < :before_id" if before_id is not None else ""
+        query = self.prepare_query(
+            f"SELECT id, chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason, created_at, "
+            f" compare_id "
+            f" FROM {self.chat_message_table_name} WHERE chat_main_id = :chat_main_id{before_condition} "
+            f" ORDER BY id DESC LIMIT :limit")
+        query.bindValue(":chat_main_id", chat_main_id)
+        if before_id is not None:
+            query.bindValue(":before_id", before_id)
+        query.bindValue(":limit", limit)
+
         try:
-            query = QSqlQuery()
-            table_name = f"{self.chat_detail_table_name}_{id}"
-            query.prepare(f"DROP TABLE IF EXISTS {table_name}")
             if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_DELETE_TABLE_SUCCESS} {table_name}")
+                print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_FETCH_ERROR} {chat_main_id}: {query.lastError().text()}")
+                return []
         except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_DELETE_ERROR} {id}: {e}")
-            return False
-        return True
+            print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
+            return []
 
-    def get_all_chat_details_list(self, chat_main_id):
-        chat_detail_table = f"{self.chat_detail_table_name}_{chat_main_id}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {chat_detail_table}")
+        chat_details_list = self.read_chat_details(query)
+        chat_details_list.reverse()
+        return chat_details_list
+
+    def get_chat_details_from_question(self, chat_main_id, before_id, question_type):
+        # Rows from the last question before before_id, so a page can be completed back to its question
+        query = self.prepare_query(
+            f"SELECT id, chat_main_id, chat_type, chat_model, chat, elapsed_time, finish_reason, created_at, "
+            f" compare_id "
+            f" FROM {self.chat_message_table_name} WHERE chat_main_id = :chat_main_id AND id < :before_id "
+            f" AND id >= COALESCE((SELECT MAX(id) FROM {self.chat_message_table_name} "
+            f"  WHERE chat_main_id = :question_main_id AND chat_type = :chat_type AND id < :question_before_id), 0) "
+            f" ORDER BY id")
+        query.bindValue(":chat_main_id", chat_main_id)
+        query.bindValue(":before_id", before_id)
+        query.bindValue(":question_main_id", chat_main_id)
+        query.bindValue(":chat_type", question_type)
+        query.bindValue(":question_before_id", before_id)
 
         try:
             if not query.exec():
@@ -225,24 +648,444 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
             return []
 
+        return self.read_chat_details(query)
+
+    @staticmethod
+    def read_chat_details(query):
         chat_details_list = []
         while query.next():
             chat_detail = {
-                "id": query.value("id"),
-                "chat_main_id": query.value("chat_main_id"),
-                "chat_type": query.value("chat_type"),
-                "chat_model": query.value("chat_model"),
-                "chat": query.value("chat"),
-                "elapsed_time": query.value("elapsed_time"),
-                "finish_reason": query.value("finish_reason"),
-                "created_at": query.value("created_at")
+                "id": query.value(0),
+                "chat_main_id": query.value(1),
+                "chat_type": query.value(2),
+                "chat_model": query.value(3),
+                "chat": Utility.decompress_text(query.value(4)),
+                "elapsed_time": query.value(5),
+                "finish_reason": query.value(6),
+                "created_at": query.value(7),
+                "compare_id": query.value(8) or None,
             }
             chat_details_list.append(chat_detail)
-
         return chat_details_list
 
+    def get_chat_texts_before(self, chat_main_id, before_id):
+        self.restore_archived_conversation(Constants.SEARCH_SOURCE_CHAT, chat_main_id)
+        query = self.prepare_query(f"SELECT chat_type, chat FROM {self.chat_message_table_name} "
+                                   f" WHERE chat_main_id = :chat_main_id AND id < :before_id ORDER BY id")
+        query.bindValue(":chat_main_id", chat_main_id)
+        query.bindValue(":before_id", before_id)
+
+        try:
+            if not query.exec():
+                print(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_FETCH_ERROR} {chat_main_id}: {query.lastError().text()}")
+                return []
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
+            return []
+
+        chat_texts = []
+        while query.next():
+            chat_texts.append((query.value(0), Utility.decompress_text(query.value(1))))
+        return chat_texts
+
+    def get_legacy_detail_tables(self, legacy_table_prefix):
+        query = self.prepare_query("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :pattern ESCAPE '\\'")
+        escaped_prefix = legacy_table_prefix.replace("_", "\\_")
+        query.bindValue(":pattern", f"{escaped_prefix}\\_%")
+        legacy_tables = []
+        try:
+            if not query.exec():
+                raise Exception(query.lastError().text())
+            while query.next():
+                table_name = query.value(0)
+                main_id = table_name[len(legacy_table_prefix) + 1:]
+                if main_id.isdigit():
+                    legacy_tables.append((table_name, int(main_id)))
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_RETRIEVE_DATA_FAIL} sqlite_master: {e}")
+        query.finish()
+        return legacy_tables
+
+    def get_table_columns(self, table_name):
+        query = QSqlQuery(self.db)
+        columns = []
+        if query.exec(f"PRAGMA table_info({table_name})"):
+            while query.next():
+                columns.append(query.value("name"))
+        query.finish()
+        return columns
+
+    def add_column(self, table_name, column_name, column_definition):
+        if column_name in self.get_table_columns(table_name):
+            return True
+        query = QSqlQuery(self.db)
+        if not query.exec(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}"):
+            print(f"{DATABASE_MESSAGE.DATABASE_ADD_COLUMN_ERROR} {table_name}.{column_name}: "
+                  f"{query.lastError().text()}")
+            return False
+        self.statement_cache.clear()
+        return True
+
+    def add_file_message_id_column(self, file_table_name, file_detail_id_column, file_message_id_column,
+                                   message_table_name):
+        columns = self.get_table_columns(file_table_name)
+        if file_message_id_column in columns or file_detail_id_column not in columns:
+            return True
+
+        escaped_prefix = message_table_name.replace("_", "\\_")
+        parsed_id = (f"CAST(substr({file_detail_id_column}, "
+                     f"length(rtrim({file_detail_id_column}, '0123456789')) + 1) AS INTEGER)")
+        self.db.transaction()
+        try:
+            query = QSqlQuery(self.db)
+            if not query.exec(f"ALTER TABLE {file_table_name} ADD COLUMN {file_message_id_column} INTEGER "
+                              f" REFERENCES {message_table_name}(id) ON DELETE CASCADE"):
+                raise Exception(query.lastError().text())
+            if not query.exec(f"UPDATE {file_table_name} SET {file_message_id_column} = "
+                              f" (SELECT id FROM {message_table_name} WHERE id = {parsed_id}) "
+                              f" WHERE {file_detail_id_column} LIKE '{escaped_prefix}\\_%' ESCAPE '\\'"):
+                raise Exception(query.lastError().text())
+            if not self.db.commit():
+                raise Exception(self.db.lastError().text())
+            logging.info(f"{DATABASE_MESSAGE.DATABASE_MIGRATE_SUCCESS} {file_table_name}.{file_message_id_column}")
+        except Exception as e:
+            self.db.rollback()
+            logging.error(f"{DATABASE_MESSAGE.DATABASE_MIGRATE_FAIL} {file_table_name}.{file_message_id_column}: {e}")
+            return False
+        return True
+
+    def migrate_detail_tables(self, legacy_table_prefix, message_table_name, main_table_name, main_id_column,
+                              columns, file_table_name=None, file_detail_id_column=None, file_message_id_column=None):
+        legacy_tables = self.get_legacy_detail_tables(legacy_table_prefix)
+        if not legacy_tables:
+            return True
+
+        batch_size = Constants.DATABASE_MIGRATION_BATCH_SIZE
+        for start in range(0, len(legacy_tables), batch_size):
+            self.db.transaction()
+            try:
+                for table_name, main_id in legacy_tables[start:start + batch_size]:
+                    if file_table_name:
+                        self.move_detail_rows_with_files(table_name, main_id, message_table_name, main_table_name,
+                                                         main_id_column, columns, file_table_name,
+                                                         file_detail_id_column, file_message_id_column)
+                    else:
+                        self.move_detail_rows(table_name, main_id, message_table_name, main_table_name,
+                                              main_id_column, columns)
+                    query = QSqlQuery(self.db)
+                    if not query.exec(f"DROP TABLE {table_name}"):
+                        raise Exception(query.lastError().text())
+                if not self.db.commit():
+                    raise Exception(self.db.lastError().text())
+            except Exception as e:
+                self.db.rollback()
+                logging.error(f"{DATABASE_MESSAGE.DATABASE_MIGRATE_FAIL} {message_table_name}: {e}")
+                return False
+
+        logging.info(f"{DATABASE_MESSAGE.DATABASE_MIGRATE_SUCCESS} {message_table_name}: {len(legacy_tables)}")
+        return True
+
+    def move_detail_rows(self, table_name, main_id, message_table_name, main_table_name, main_id_column, columns):
+        column_list = ", ".join(columns)
+        query = QSqlQuery(self.db)
+        if not query.exec(f"INSERT INTO {message_table_name} ({main_id_column}, {column_list}) "
+                          f" SELECT {main_id}, {column_list} FROM {table_name} "
+                          f" WHERE EXISTS (SELECT 1 FROM {main_table_name} WHERE id = {main_id})"
+                          f" ORDER BY id"):
+            raise Exception(query.lastError().text())
+
+    def move_detail_rows_with_files(self, table_name, main_id, message_table_name, main_table_name, main_id_column,
+                                    columns, file_table_name, file_detail_id_column, file_message_id_column):
+        column_list = ", ".join(columns)
+        select_query = QSqlQuery(self.db)
+        if not select_query.exec(f"SELECT id, {column_list} FROM {table_name} "
+                                 f" WHERE EXISTS (SELECT 1 FROM {main_table_name} WHERE id = {main_id})"
+                                 f" ORDER BY id"):
+            raise Exception(select_query.lastError().text())
+
+        insert_query = QSqlQuery(self.db)
+        insert_query.prepare(f"INSERT INTO {message_table_name} ({main_id_column}, {column_list}) "
+                             f" VALUES (?, {', '.join('?' * len(columns))})")
+        map_query = QSqlQuery(self.db)
+        if not map_query.exec("CREATE TEMP TABLE IF NOT EXISTS detail_migration_map "
+                              "(old_detail_id TEXT PRIMARY KEY, new_detail_id INTEGER)"):
+            raise Exception(map_query.lastError().text())
+        map_query.prepare("INSERT INTO detail_migration_map (old_detail_id, new_detail_id) VALUES (?, ?)")
+
+        while select_query.next():
+            insert_query.addBindValue(main_id)
+            for i in range(1, len(columns) + 1):
+                insert_query.addBindValue(None if select_query.isNull(i) else select_query.value(i))
+            if not insert_query.exec():
+                raise Exception(insert_query.lastError().text())
+            map_query.addBindValue(f"{table_name}_{select_query.value(0)}")
+            map_query.addBindValue(insert_query.lastInsertId())
+            if not map_query.exec():
+                raise Exception(map_query.lastError().text())
+        select_query.finish()
+
+        update_query = QSqlQuery(self.db)
+        if not update_query.exec(f"UPDATE {file_table_name} SET {file_message_id_column} = "
+                                 f" (SELECT new_detail_id FROM detail_migration_map "
+                                 f"   WHERE old_detail_id = {file_table_name}.{file_detail_id_column}) "
+                                 f" WHERE {file_detail_id_column} IN (SELECT old_detail_id FROM detail_migration_map)"):
+            raise Exception(update_query.lastError().text())
+        if not update_query.exec("DELETE FROM detail_migration_map"):
+            raise Exception(update_query.lastError().text())
+
+    def migrate_chat_detail_tables(self):
+        return self.migrate_detail_tables(self.chat_detail_table_name, self.chat_message_table_name,
+                                          self.chat_main_table_name, "chat_main_id",
+                                          ["chat_type", "chat_model", "chat", "elapsed_time", "finish_reason",
+                                           "created_at"])
+
+    def migrate_image_detail_tables(self):
+        return self.migrate_detail_tables(self.image_detail_table_name, self.image_message_table_name,
+                                          self.image_main_table_name, "image_main_id",
+                                          ["image_type", "image_model", "image_text", "image_creation_type",
+                                           "image_revised_prompt", "elapsed_time", "finish_reason", "created_at"],
+                                          self.image_file_table_name, "image_detail_id", "image_message_id")
+
+    def migrate_vision_detail_tables(self):
+        return self.migrate_detail_tables(self.vision_detail_table_name, self.vision_message_table_name,
+                                          self.vision_main_table_name, "vision_main_id",
+                                          ["vision_type", "vision_model", "vision_text", "elapsed_time",
+                                           "finish_reason", "created_at"],
+                                          self.vision_file_table_name, "vision_detail_id", "vision_message_id")
+
+    def migrate_tts_detail_tables(self):
+        return self.migrate_detail_tables(self.tts_detail_table_name, self.tts_message_table_name,
+                                          self.tts_main_table_name, "tts_main_id",
+                                          ["tts_type", "tts_model", "tts_text", "tts_response_format", "tts_data",
+                                           "elapsed_time", "finish_reason", "created_at"])
+
+    def migrate_stt_detail_tables(self):
+        return self.migrate_detail_tables(self.stt_detail_table_name, self.stt_message_table_name,
+                                          self.stt_main_table_name, "stt_main_id",
+                                          ["stt_type", "stt_model", "stt_text", "stt_response_format", "stt_data",
+                                           "elapsed_time", "finish_reason", "created_at"])
+
+    def create_blob_store(self):
+        query = QSqlQuery(self.db)
+        query_string = f"""
+                        CREATE TABLE IF NOT EXISTS {self.blob_store_table_name} 
+                         (
+                            hash TEXT PRIMARY KEY,
+                            data BLOB NOT NULL,
+                            mime_type TEXT,
+                            ref_count INTEGER NOT NULL DEFAULT 0,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+                        )
+                        """
+        try:
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_BLOB_STORE_CREATE_TABLE_ERROR} {e}")
+
+    def create_committed_turn(self):
+        query = QSqlQuery(self.db)
+        query_string = f"""
+                        CREATE TABLE IF NOT EXISTS {self.committed_turn_table_name}
+                         (
+                            id TEXT PRIMARY KEY,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+                        )
+                        """
+        try:
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_COMMITTED_TURN_CREATE_TABLE_ERROR} {e}")
+
+    def create_blob_reference_triggers(self, file_table_name):
+        query = QSqlQuery(self.db)
+        trigger_strings = [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {file_table_name}_blob_insert AFTER INSERT ON {file_table_name}
+              WHEN NEW.blob_hash IS NOT NULL
+            BEGIN
+              UPDATE {self.blob_store_table_name} SET ref_count = ref_count + 1 WHERE hash = NEW.blob_hash;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {file_table_name}_blob_delete AFTER DELETE ON {file_table_name}
+              WHEN OLD.blob_hash IS NOT NULL
+            BEGIN
+              UPDATE {self.blob_store_table_name} SET ref_count = ref_count - 1 WHERE hash = OLD.blob_hash;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {file_table_name}_blob_update AFTER UPDATE OF blob_hash ON {file_table_name}
+              WHEN OLD.blob_hash IS NOT NEW.blob_hash
+            BEGIN
+              UPDATE {self.blob_store_table_name} SET ref_count = ref_count - 1 WHERE hash = OLD.blob_hash;
+              UPDATE {self.blob_store_table_name} SET ref_count = ref_count + 1 WHERE hash = NEW.blob_hash;
+            END
+            """,
+        ]
+        for trigger_string in trigger_strings:
+            if not query.exec(trigger_string):
+                raise Exception(query.lastError().text())
+
+    def get_blob_statement(self, data, mime_type=None):
+        blob_hash = Utility.get_content_hash(data)
+        query_string = (f"INSERT OR IGNORE INTO {self.blob_store_table_name} (hash, data, mime_type) "
+                        f" VALUES (:hash, :data, :mime_type)")
+        return blob_hash, (query_string, {
+            ":hash": blob_hash,
+            ":data": self.encode_file_data(data),
+            ":mime_type": mime_type,
+        })
+
+    def get_unreferenced_blobs_statement(self):
+        return f"DELETE FROM {self.blob_store_table_name} WHERE ref_count <= 0", {}
+
+    def create_search_indexes(self):
+        for _, fts_table_name, message_table_name, _, _, text_column in self.search_sources:
+            self.create_search_index(fts_table_name, message_table_name, text_column)
+
+    def create_search_index(self, fts_table_name, message_table_name, text_column):
+        # Contentless index: compressed rows are indexed with their plain text by the insert statement itself
+        query = QSqlQuery(self.db)
+        query_strings = [
+            f"DROP TRIGGER IF EXISTS {fts_table_name}_insert",
+            f"DROP TRIGGER IF EXISTS {fts_table_name}_delete",
+            f"DROP TRIGGER IF EXISTS {fts_table_name}_update",
+            f"DROP TABLE IF EXISTS {fts_table_name}",
+            f"""
+            CREATE VIRTUAL TABLE {fts_table_name} USING fts5(
+              {text_column}, content='', contentless_delete=1
+            )
+            """,
+            f"""
+            INSERT INTO {fts_table_name}(rowid, {text_column})
+              SELECT id, {text_column} FROM {message_table_name} WHERE typeof({text_column}) = 'text'
+            """,
+        ]
+        trigger_strings = [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table_name}_insert AFTER INSERT ON {message_table_name}
+              WHEN typeof(NEW.{text_column}) = 'text'
+            BEGIN
+              INSERT INTO {fts_table_name}(rowid, {text_column}) VALUES (NEW.id, NEW.{text_column});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table_name}_delete AFTER DELETE ON {message_table_name}
+            BEGIN
+              DELETE FROM {fts_table_name} WHERE rowid = OLD.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table_name}_update AFTER UPDATE OF {text_column} ON {message_table_name}
+            BEGIN
+              DELETE FROM {fts_table_name} WHERE rowid = OLD.id;
+              INSERT INTO {fts_table_name}(rowid, {text_column})
+                SELECT NEW.id, NEW.{text_column} WHERE typeof(NEW.{text_column}) = 'text';
+            END
+            """,
+        ]
+        try:
+            if fts_table_name not in self.db.tables() or self.is_external_content_index(fts_table_name):
+                self.db.transaction()
+                for query_string in query_strings:
+                    if not query.exec(query_string):
+                        self.db.rollback()
+                        raise Exception(query.lastError().text())
+                if not self.db.commit():
+                    raise Exception(self.db.lastError().text())
+            for trigger_string in trigger_strings:
+                if not query.exec(trigger_string):
+                    raise Exception(query.lastError().text())
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_INDEX_CREATE_ERROR} {fts_table_name}: {e}")
+
+    def is_external_content_index(self, fts_table_name):
+        query = self.prepare_query("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name")
+        query.bindValue(":name", fts_table_name)
+        external_content = query.exec() and query.next() and "contentless_delete" not in query.value(0)
+        query.finish()
+        return external_content
+
+    def get_compressed_text_statements(self, statement, fts_table_name, text_column):
+        query_string, bindings = statement
+        text = bindings[f":{text_column}"]
+        compressed_text = Utility.compress_text(text)
+        if compressed_text is None:
+            return [statement]
+        bindings[f":{text_column}"] = QByteArray(compressed_text)
+        return [statement, (f"INSERT INTO {fts_table_name}(rowid, {text_column}) VALUES (:rowid, :text)", {
+            ":rowid": StatementRowId(0),
+            ":text": text,
+        })]
+
+    @staticmethod
+    def build_search_query(text):
+        terms = re.findall(r"\w+", text or "")
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search_messages(self, text, limit=Constants.SEARCH_RESULT_LIMIT):
+        match_query = self.build_search_query(text)
+        if not match_query:
+            return []
+
+        select_strings = []
+        for source, fts_table_name, message_table_name, main_table_name, main_id_column, text_column \
+                in self.search_sources:
+            select_strings.append(
+                f"SELECT '{source}' AS source, m.{main_id_column} AS main_id, m.id AS message_id, "
+                f" c.title AS title, m.{text_column} AS text, bm25({fts_table_name}) AS rank "
+                f" FROM {fts_table_name} "
+                f" JOIN {message_table_name} m ON m.id = {fts_table_name}.rowid "
+                f" JOIN {main_table_name} c ON c.id = m.{main_id_column} "
+                f" WHERE {fts_table_name} MATCH :match_query")
+        query = self.prepare_query(" UNION ALL ".join(select_strings) + " ORDER BY rank LIMIT :limit")
+        query.bindValue(":match_query", match_query)
+        query.bindValue(":limit", limit)
+
+        try:
+            if not query.exec():
+                print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_ERROR} {query.lastError().text()}")
+                return []
+        except Exception as e:
+            print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_ERROR} {e}")
+            return []
+
+        results = []
+        terms = [term.lower() for term in re.findall(r"\w+", text)]
+        while query.next():
+            results.append({
+                "source": query.value("source"),
+                "main_id": query.value("main_id"),
+                "message_id": query.value("message_id"),
+                "title": query.value("title"),
+                "snippet": Utility.build_search_snippet(Utility.decompress_text(query.value("text")), terms),
+                "rank": query.value("rank")
+            })
+
+        if self.database_archive is not None:
+            try:
+                results.extend(self.database_archive.search_messages(self.db, match_query, terms, limit))
+            except Exception as e:
+                print(f"{DATABASE_MESSAGE.DATABASE_SEARCH_ERROR} {e}")
+            results = sorted(results, key=lambda result: result["rank"])[:limit]
+        return results
+
+    def get_message_position(self, message_table_name, main_id_column, main_id, message_id):
+        query = self.prepare_query(f"SELECT COUNT(*) FROM {message_table_name} "
+                                   f" WHERE {main_id_column} = :main_id AND id < :message_id")
+        query.bindValue(":main_id", main_id)
+        query.bindValue(":message_id", message_id)
+        if query.exec() and query.next():
+            position = query.value(0)
+            query.finish()
+            return position
+        print(f"{DATABASE_MESSAGE.DATABASE_RETRIEVE_DATA_FAIL} {message_table_name}: {query.lastError().text()}")
+        return None
+
     def create_prompt(self):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         CREATE TABLE IF NOT EXISTS {self.prompt_table_name} 
                          (
@@ -258,7 +1101,7 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_PROMPT_CREATE_TABLE_ERROR} {e}")
 
     def add_prompt(self, title, prompt):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         INSERT INTO {self.prompt_table_name} (title, prompt)
                         VALUES (:title, :prompt)
@@ -275,7 +1118,7 @@ class SqliteDatabase:
         return None
 
     def update_prompt(self, id, title, prompt):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         UPDATE {self.prompt_table_name}
                         SET title = :title, prompt = :prompt
@@ -294,7 +1137,7 @@ class SqliteDatabase:
         return False
 
     def delete_prompt(self, id):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         DELETE FROM {self.prompt_table_name}
                         WHERE id = :id
@@ -311,7 +1154,7 @@ class SqliteDatabase:
         return False
 
     def create_image_main(self):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         CREATE TABLE IF NOT EXISTS {self.image_main_table_name} 
                          (
@@ -326,21 +1169,17 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_CREATE_TABLE_ERROR} {e}")
 
     def add_image_main(self, title):
-        query = QSqlQuery()
-        query.prepare(f"INSERT INTO {self.image_main_table_name} (title) VALUES (:title)")
+        query = self.prepare_query(f"INSERT INTO {self.image_main_table_name} (title) VALUES (:title)")
         query.bindValue(":title", title)
         try:
             if query.exec():
-                image_main_id = query.lastInsertId()
-                self.create_image_detail(image_main_id)
-                return image_main_id
+                return query.lastInsertId()
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_ADD_ERROR} {e}")
         return None
 
     def update_image_main(self, id, title):
-        query = QSqlQuery()
-        query.prepare(f"UPDATE {self.image_main_table_name} SET title = :title WHERE id = :id")
+        query = self.prepare_query(f"UPDATE {self.image_main_table_name} SET title = :title WHERE id = :id")
         query.bindValue(":title", title)
         query.bindValue(":id", id)
         try:
@@ -351,84 +1190,82 @@ class SqliteDatabase:
         return False
 
     def delete_image_main_entry(self, id):
-        try:
-            query = QSqlQuery()
-            query.prepare(f"DELETE FROM {self.image_main_table_name} WHERE id = :id")
-            query.bindValue(":id", id)
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DELETE_SUCCESS} {id}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DELETE_FAIL} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.image_main_table_name} WHERE id = :id", {":id": id}), self.get_unreferenced_blobs_statement()],
+                                  f"{DATABASE_MESSAGE.DATABASE_IMAGE_DELETE_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_IMAGE_DELETE_FAIL} {id}:")
 
     def delete_image_detail(self, id):
-        try:
-            query = QSqlQuery()
-            table_name = f"{self.image_detail_table_name}_{id}"
-            query.prepare(f"DROP TABLE IF EXISTS {table_name}")
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_DELETE_TABLE_SUCCESS} {table_name}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_DELETE_ERROR} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.image_message_table_name} WHERE image_main_id = :image_main_id",
+                                    {":image_main_id": id})],
+                                  f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_DELETE_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_DELETE_ERROR} {id}:")
 
     def delete_image_main(self, id):
         try:
             if not self.delete_image_main_entry(id):
                 raise Exception(f"Failed to delete image main entry for id {id}")
+            self.delete_archived_conversation(Constants.ARCHIVE_SOURCE_IMAGE, id)
         except Exception as e:
             logging.error(f"Error deleting image main for id {id}: {e}")
             return False
         return True
 
     def get_all_image_main_list(self):
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {self.image_main_table_name} ORDER BY created_at DESC")
+        query = self.prepare_query(f"SELECT id, title, created_at, last_activity_at, message_count, last_model "
+                                   f" FROM {self.image_main_table_name} ORDER BY last_activity_at DESC, id DESC")
         try:
             if query.exec():
                 results = []
                 while query.next():
-                    id = query.value(0)
-                    title = query.value(1)
-                    created_at = query.value(2)
-                    results.append({'id': id, 'title': title, 'created_at': created_at})
+                    results.append({
+                        'id': query.value(0),
+                        'title': query.value(1),
+                        'created_at': query.value(2),
+                        'last_activity_at': query.value(3),
+                        'message_count': query.value(4),
+                        'last_model': query.value(5),
+                    })
                 return results
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_RETRIEVE_DATA_FAIL} {self.image_main_table_name}: {e}")
         return []
 
-    def create_image_detail(self, image_main_id):
-        query = QSqlQuery()
-        image_detail_table = f"{self.image_detail_table_name}_{image_main_id}"
+    def create_image_message(self):
+        query = QSqlQuery(self.db)
         query_string = f"""
-                        CREATE TABLE IF NOT EXISTS {image_detail_table} 
+                        CREATE TABLE IF NOT EXISTS {self.image_message_table_name} 
                          (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            image_main_id TEXT,
+                            image_main_id INTEGER NOT NULL,
                             image_type TEXT,
                             image_model TEXT,
-                            image_text TEXT, 
-                            image_creation_type TEXT,                            
-                            image_revised_prompt TEXT,                            
-                            elapsed_time TEXT, 
+                            image_text TEXT,
+                            image_creation_type TEXT,
+                            image_revised_prompt TEXT,
+                            elapsed_time TEXT,
                             finish_reason TEXT,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, 
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                             FOREIGN KEY(image_main_id) REFERENCES {self.image_main_table_name}(id) ON DELETE CASCADE
                         )
                         """
+        index_string = f"""
+                        CREATE INDEX IF NOT EXISTS {self.image_message_index_name}
+                          ON {self.image_message_table_name} (image_main_id, id)
+                        """
         try:
-            query.exec(query_string)
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+            if not query.exec(index_string):
+                raise Exception(query.lastError().text())
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_CREATE_TABLE_ERROR} {e}")
+            print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_MESSAGE_CREATE_TABLE_ERROR} {e}")
 
     def get_all_image_details_list(self, image_main_id):
-        image_detail_table = f"{self.image_detail_table_name}_{image_main_id}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {image_detail_table}")
+        self.restore_archived_conversation(Constants.ARCHIVE_SOURCE_IMAGE, image_main_id)
+        query = self.prepare_query(f"SELECT id, image_main_id, image_type, image_model, image_text, "
+                                   f" image_creation_type, image_revised_prompt, elapsed_time, finish_reason, created_at "
+                                   f" FROM {self.image_message_table_name} WHERE image_main_id = :image_main_id ORDER BY id")
+        query.bindValue(":image_main_id", image_main_id)
 
         try:
             if not query.exec():
@@ -456,125 +1293,116 @@ class SqliteDatabase:
 
         return image_details_list
 
-    def insert_image_detail(self, image_main_id, image_type, image_model, image_text,
-                            image_creation_type, image_revised_prompt, elapsed_time, finish_reason):
-        image_detail_table = f"{self.image_detail_table_name}_{image_main_id}"
-        query = QSqlQuery()
-        query.prepare(
-            f"INSERT INTO {image_detail_table} (image_main_id, image_type, image_model, image_text, "
-            f" image_creation_type, image_revised_prompt, elapsed_time, finish_reason) "
-            f" VALUES (:image_main_id, :image_type, :image_model, :image_text, "
-            f" :image_creation_type, :image_revised_prompt, :elapsed_time, :finish_reason)")
-        query.bindValue(":image_main_id", image_main_id)
-        query.bindValue(":image_type", image_type)
-        query.bindValue(":image_model", image_model)
-        query.bindValue(":image_text", image_text)
-        query.bindValue(":image_creation_type", image_creation_type)
-        query.bindValue(":image_revised_prompt", image_revised_prompt)
-        query.bindValue(":elapsed_time", elapsed_time)
-        query.bindValue(":finish_reason", finish_reason)
-        try:
-            if query.exec():
-                image_detail_id = query.lastInsertId()
-                return f"{image_detail_table}_{image_detail_id}"
-            else:
-                error = query.lastError()
-                print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_INSERT_ERROR} {error.text()}")
-                return False
-        except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_INSERT_ERROR} {e}")
-            return False
+    def insert_image_detail_with_files(self, image_main_id, image_type, image_model, image_text,
+                                       image_creation_type, image_revised_prompt, elapsed_time, finish_reason,
+                                       image_files, turn=None):
+        statements = [self.get_image_detail_statement(image_main_id, image_type, image_model, image_text,
+                                                      image_creation_type, image_revised_prompt, elapsed_time,
+                                                      finish_reason)]
+        for image_detail_file_data, image_detail_file_mime_type in image_files:
+            statements.extend(self.get_image_file_statements(StatementRowId(0), image_detail_file_data,
+                                                             image_detail_file_mime_type))
+        return self.submit_write(statements, DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_INSERT_ERROR, turn=turn)
+
+    def get_image_detail_statement(self, image_main_id, image_type, image_model, image_text,
+                                   image_creation_type, image_revised_prompt, elapsed_time, finish_reason):
+        query_string = (f"INSERT INTO {self.image_message_table_name} (image_main_id, image_type, image_model, "
+                        f" image_text, image_creation_type, image_revised_prompt, elapsed_time, finish_reason) "
+                        f" VALUES (:image_main_id, :image_type, :image_model, :image_text, "
+                        f" :image_creation_type, :image_revised_prompt, :elapsed_time, :finish_reason)")
+        return query_string, {
+            ":image_main_id": image_main_id,
+            ":image_type": image_type,
+            ":image_model": image_model,
+            ":image_text": image_text,
+            ":image_creation_type": image_creation_type,
+            ":image_revised_prompt": image_revised_prompt,
+            ":elapsed_time": elapsed_time,
+            ":finish_reason": finish_reason,
+        }
 
     def create_image_file(self):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         image_detail_file_table = f"{self.image_file_table_name}"
         query_string = f"""
                         CREATE TABLE IF NOT EXISTS {image_detail_file_table} 
                          (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            image_detail_id TEXT, 
+                            image_message_id INTEGER,
                             image_detail_file_data BLOB,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+                            image_detail_file_mime_type TEXT,
+                            blob_hash TEXT REFERENCES {self.blob_store_table_name}(hash),
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                            FOREIGN KEY(image_message_id) REFERENCES {self.image_message_table_name}(id) ON DELETE CASCADE
                         )
                         """
+        index_string = f"""
+                        CREATE INDEX IF NOT EXISTS {self.image_file_index_name}
+                          ON {image_detail_file_table} (image_message_id)
+                        """
         try:
-            query.exec(query_string)
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+            self.add_file_message_id_column(image_detail_file_table, "image_detail_id", "image_message_id",
+                                            self.image_message_table_name)
+            self.add_column(image_detail_file_table, "image_detail_file_mime_type", "TEXT")
+            self.add_column(image_detail_file_table, "blob_hash", f"TEXT REFERENCES {self.blob_store_table_name}(hash)")
+            self.create_blob_reference_triggers(image_detail_file_table)
+            if not query.exec(index_string):
+                raise Exception(query.lastError().text())
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_FILE_CREATE_TABLE_ERROR} {e}")
 
-    def get_all_image_details_file_list(self, image_detail_id):
-        image_detail_file_table = f"{self.image_file_table_name}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {image_detail_file_table} WHERE image_detail_id = :image_detail_id")
-        query.bindValue(":image_detail_id", image_detail_id)
+    def get_all_image_details_with_files(self, image_main_id):
+        image_details_list = self.get_all_image_details_list(image_main_id)
+        if not image_details_list:
+            return []
+
+        query = self.prepare_query(f"SELECT f.id, f.image_message_id, COALESCE(b.data, f.image_detail_file_data), "
+                                   f" COALESCE(f.image_detail_file_mime_type, b.mime_type), f.created_at "
+                                   f" FROM {self.image_file_table_name} f "
+                                   f" LEFT JOIN {self.blob_store_table_name} b ON b.hash = f.blob_hash "
+                                   f" JOIN {self.image_message_table_name} m ON m.id = f.image_message_id "
+                                   f" WHERE m.image_main_id = :image_main_id ORDER BY f.id")
+        query.bindValue(":image_main_id", image_main_id)
 
         try:
             if not query.exec():
-                print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_FILE_FETCH_ERROR} {image_detail_id}: "
+                print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_FILE_FETCH_ERROR} {image_main_id}: "
                       f" {query.lastError().text()}")
                 return []
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
             return []
 
-        image_detail_file_list = []
+        image_files = {}
         while query.next():
-            image_detail = {
-                "id": query.value("id"),
-                "image_detail_id": query.value("image_detail_id"),
-                "image_detail_file_data": query.value("image_detail_file_data"),
-                "created_at": query.value("created_at")
+            image_detail_file = {
+                "id": query.value(0),
+                "image_detail_id": query.value(1),
+                "image_detail_file_data": self.decode_file_data(query.value(2)),
+                "image_detail_file_mime_type": query.value(3),
+                "created_at": query.value(4)
             }
-            image_detail_file_list.append(image_detail)
+            image_files.setdefault(image_detail_file["image_detail_id"], []).append(image_detail_file)
 
-        return image_detail_file_list
-
-    def get_image_detail_file(self, image_detail_id):
-        image_detail_file_table = f"{self.image_file_table_name}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {image_detail_file_table} WHERE image_detail_id = :image_detail_id")
-        query.bindValue(":image_detail_id", image_detail_id)
-
-        try:
-            if not query.exec():
-                print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_FILE_FETCH_ERROR} {image_detail_id}: "
-                      f" {query.lastError().text()}")
-                return None
-        except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
-            return None
+        for image_detail in image_details_list:
+            image_detail["files"] = image_files.get(image_detail["id"], [])
 
-        if query.next():
-            image_detail = {
-                "id": query.value("id"),
-                "image_detail_id": query.value("image_detail_id"),
-                "image_detail_file_data": query.value("image_detail_file_data"),
-                "created_at": query.value("created_at")
-            }
-            return image_detail
-        else:
-            print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_FILE_NO_RECORD_ERROR} {image_detail_id}")
-            return None
+        return image_details_list
 
-    def insert_image_file(self, image_detail_id, image_detail_file_data):
-        image_detail_file_table = f"{self.image_file_table_name}"
-        query = QSqlQuery()
-        query.prepare(
-            f"INSERT INTO {image_detail_file_table} (image_detail_id, image_detail_file_data) "
-            f" VALUES (:image_detail_id, :image_detail_file_data)")
-        query.bindValue(":image_detail_id", image_detail_id)
-        query.bindValue(":image_detail_file_data", image_detail_file_data)
-        try:
-            success = query.exec()
-            if not success:
-                print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {query.lastError().text()}")
-            return success
-        except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_IMAGE_DETAIL_FILE_INSERT_ERROR} {e}")
-            return False
+    def get_image_file_statements(self, image_detail_id, image_detail_file_data, image_detail_file_mime_type):
+        blob_hash, blob_statement = self.get_blob_statement(image_detail_file_data, image_detail_file_mime_type)
+        query_string = (f"INSERT INTO {self.image_file_table_name} (image_message_id, blob_hash, image_detail_file_mime_type) "
+                        f" VALUES (:image_detail_id, :blob_hash, :image_detail_file_mime_type)")
+        return [blob_statement, (query_string, {
+            ":image_detail_id": image_detail_id,
+            ":blob_hash": blob_hash,
+            ":image_detail_file_mime_type": image_detail_file_mime_type,
+        })]
 
     def create_vision_main(self):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         CREATE TABLE IF NOT EXISTS {self.vision_main_table_name} 
                          (
@@ -589,21 +1417,17 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_VISION_CREATE_TABLE_ERROR} {e}")
 
     def add_vision_main(self, title):
-        query = QSqlQuery()
-        query.prepare(f"INSERT INTO {self.vision_main_table_name} (title) VALUES (:title)")
+        query = self.prepare_query(f"INSERT INTO {self.vision_main_table_name} (title) VALUES (:title)")
         query.bindValue(":title", title)
         try:
             if query.exec():
-                vision_main_id = query.lastInsertId()
-                self.create_vision_detail(vision_main_id)
-                return vision_main_id
+                return query.lastInsertId()
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_VISION_ADD_ERROR} {e}")
         return None
 
     def update_vision_main(self, id, title):
-        query = QSqlQuery()
-        query.prepare(f"UPDATE {self.vision_main_table_name} SET title = :title WHERE id = :id")
+        query = self.prepare_query(f"UPDATE {self.vision_main_table_name} SET title = :title WHERE id = :id")
         query.bindValue(":title", title)
         query.bindValue(":id", id)
         try:
@@ -614,82 +1438,80 @@ class SqliteDatabase:
         return False
 
     def delete_vision_main_entry(self, id):
-        try:
-            query = QSqlQuery()
-            query.prepare(f"DELETE FROM {self.vision_main_table_name} WHERE id = :id")
-            query.bindValue(":id", id)
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_VISION_MAIN_ENTRY_SUCCESS} {id}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_VISION_MAIN_ENTRY_FAIL} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.vision_main_table_name} WHERE id = :id", {":id": id}), self.get_unreferenced_blobs_statement()],
+                                  f"{DATABASE_MESSAGE.DATABASE_VISION_MAIN_ENTRY_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_VISION_MAIN_ENTRY_FAIL} {id}:")
 
     def delete_vision_detail(self, id):
-        try:
-            query = QSqlQuery()
-            table_name = f"{self.vision_detail_table_name}_{id}"
-            query.prepare(f"DROP TABLE IF EXISTS {table_name}")
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_DELETE_TABLE_SUCCESS} {table_name}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_DELETE_ERROR} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.vision_message_table_name} WHERE vision_main_id = :vision_main_id",
+                                    {":vision_main_id": id})],
+                                  f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_DELETE_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_DELETE_ERROR} {id}:")
 
     def delete_vision_main(self, id):
         try:
             if not self.delete_vision_main_entry(id):
                 raise Exception(f"Failed to delete vision main entry for id {id}")
+            self.delete_archived_conversation(Constants.SEARCH_SOURCE_VISION, id)
         except Exception as e:
             logging.error(f"Error deleting vision main for id {id}: {e}")
             return False
         return True
 
     def get_all_vision_main_list(self):
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {self.vision_main_table_name} ORDER BY created_at DESC")
+        query = self.prepare_query(f"SELECT id, title, created_at, last_activity_at, message_count, last_model "
+                                   f" FROM {self.vision_main_table_name} ORDER BY last_activity_at DESC, id DESC")
         try:
             if query.exec():
                 results = []
                 while query.next():
-                    id = query.value(0)
-                    title = query.value(1)
-                    created_at = query.value(2)
-                    results.append({'id': id, 'title': title, 'created_at': created_at})
+                    results.append({
+                        'id': query.value(0),
+                        'title': query.value(1),
+                        'created_at': query.value(2),
+                        'last_activity_at': query.value(3),
+                        'message_count': query.value(4),
+                        'last_model': query.value(5),
+                    })
                 return results
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_RETRIEVE_DATA_FAIL} {self.vision_main_table_name}: {e}")
         return []
 
-    def create_vision_detail(self, vision_main_id):
-        query = QSqlQuery()
-        vision_detail_table = f"{self.vision_detail_table_name}_{vision_main_id}"
+    def create_vision_message(self):
+        query = QSqlQuery(self.db)
         query_string = f"""
-                        CREATE TABLE IF NOT EXISTS {vision_detail_table} 
+                        CREATE TABLE IF NOT EXISTS {self.vision_message_table_name} 
                          (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            vision_main_id TEXT, 
+                            vision_main_id INTEGER NOT NULL,
                             vision_type TEXT,
                             vision_model TEXT,
                             vision_text TEXT,
-                            elapsed_time TEXT, 
+                            elapsed_time TEXT,
                             finish_reason TEXT,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, 
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                             FOREIGN KEY(vision_main_id) REFERENCES {self.vision_main_table_name}(id) ON DELETE CASCADE
                         )
                         """
+        index_string = f"""
+                        CREATE INDEX IF NOT EXISTS {self.vision_message_index_name}
+                          ON {self.vision_message_table_name} (vision_main_id, id)
+                        """
         try:
-            query.exec(query_string)
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+            if not query.exec(index_string):
+                raise Exception(query.lastError().text())
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_CREATE_TABLE_ERROR} {e}")
+            print(f"{DATABASE_MESSAGE.DATABASE_VISION_MESSAGE_CREATE_TABLE_ERROR} {e}")
 
     def get_all_vision_details_list(self, vision_main_id):
-        vision_detail_table = f"{self.vision_detail_table_name}_{vision_main_id}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {vision_detail_table}")
+        self.restore_archived_conversation(Constants.SEARCH_SOURCE_VISION, vision_main_id)
+        query = self.prepare_query(f"SELECT id, vision_main_id, vision_type, vision_model, "
+                                   f" vision_text, elapsed_time, finish_reason, created_at "
+                                   f" FROM {self.vision_message_table_name} WHERE vision_main_id = :vision_main_id ORDER BY id")
+        query.bindValue(":vision_main_id", vision_main_id)
 
         try:
             if not query.exec():
@@ -706,7 +1528,7 @@ class SqliteDatabase:
                 "vision_main_id": query.value("vision_main_id"),
                 "vision_type": query.value("vision_type"),
                 "vision_model": query.value("vision_model"),
-                "vision_text": query.value("vision_text"),
+                "vision_text": Utility.decompress_text(query.value("vision_text")),
                 "elapsed_time": query.value("elapsed_time"),
                 "finish_reason": query.value("finish_reason"),
                 "created_at": query.value("created_at")
@@ -716,95 +1538,117 @@ class SqliteDatabase:
         return vision_details_list
 
     def insert_vision_detail(self, vision_main_id, vision_type, vision_model, vision_text,
-                             elapsed_time, finish_reason):
-        vision_detail_table = f"{self.vision_detail_table_name}_{vision_main_id}"
-        query = QSqlQuery()
-        query.prepare(
-            f"INSERT INTO {vision_detail_table} (vision_main_id, vision_type, vision_model, vision_text, "
-            f" elapsed_time, finish_reason) "
-            f" VALUES (:vision_main_id, :vision_type, :vision_model, :vision_text, "
-            f" :elapsed_time, :finish_reason)")
-        query.bindValue(":vision_main_id", vision_main_id)
-        query.bindValue(":vision_type", vision_type)
-        query.bindValue(":vision_model", vision_model)
-        query.bindValue(":vision_text", vision_text)
-        query.bindValue(":elapsed_time", elapsed_time)
-        query.bindValue(":finish_reason", finish_reason)
-        try:
-            if query.exec():
-                vision_detail_id = query.lastInsertId()
-                return f"{vision_detail_table}_{vision_detail_id}"
-            else:
-                error = query.lastError()
-                print(f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_INSERT_ERROR} {error.text()}")
-                return False
-        except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_INSERT_ERROR} {e}")
-            return False
+                             elapsed_time, finish_reason, turn=None):
+        return self.submit_write(self.get_vision_detail_statements(
+            vision_main_id, vision_type, vision_model, vision_text, elapsed_time, finish_reason
+        ), DATABASE_MESSAGE.DATABASE_VISION_DETAIL_INSERT_ERROR, turn=turn)
+
+    def insert_vision_detail_with_files(self, vision_main_id, vision_type, vision_model, vision_text,
+                                        elapsed_time, finish_reason, vision_files, turn=None):
+        statements = self.get_vision_detail_statements(vision_main_id, vision_type, vision_model, vision_text,
+                                                       elapsed_time, finish_reason)
+        for vision_detail_file_data, vision_detail_file_mime_type in vision_files:
+            statements.extend(self.get_vision_file_statements(StatementRowId(0), vision_detail_file_data,
+                                                              vision_detail_file_mime_type))
+        return self.submit_write(statements, DATABASE_MESSAGE.DATABASE_VISION_DETAIL_INSERT_ERROR, turn=turn)
+
+    def get_vision_detail_statements(self, vision_main_id, vision_type, vision_model, vision_text,
+                                     elapsed_time, finish_reason):
+        query_string = (f"INSERT INTO {self.vision_message_table_name} (vision_main_id, vision_type, vision_model, "
+                        f" vision_text, elapsed_time, finish_reason) "
+                        f" VALUES (:vision_main_id, :vision_type, :vision_model, :vision_text, "
+                        f" :elapsed_time, :finish_reason)")
+        return self.get_compressed_text_statements((query_string, {
+            ":vision_main_id": vision_main_id,
+            ":vision_type": vision_type,
+            ":vision_model": vision_model,
+            ":vision_text": vision_text,
+            ":elapsed_time": elapsed_time,
+            ":finish_reason": finish_reason,
+        }), self.vision_message_fts_table_name, "vision_text")
 
     def create_vision_file(self):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         vision_detail_file_table = f"{self.vision_file_table_name}"
         query_string = f"""
                         CREATE TABLE IF NOT EXISTS {vision_detail_file_table} 
                          (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            vision_detail_id TEXT, 
+                            vision_message_id INTEGER,
                             vision_detail_file_data BLOB,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+                            vision_detail_file_mime_type TEXT,
+                            blob_hash TEXT REFERENCES {self.blob_store_table_name}(hash),
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                            FOREIGN KEY(vision_message_id) REFERENCES {self.vision_message_table_name}(id) ON DELETE CASCADE
                         )
                         """
+        index_string = f"""
+                        CREATE INDEX IF NOT EXISTS {self.vision_file_index_name}
+                          ON {vision_detail_file_table} (vision_message_id)
+                        """
         try:
-            query.exec(query_string)
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+            self.add_file_message_id_column(vision_detail_file_table, "vision_detail_id", "vision_message_id",
+                                            self.vision_message_table_name)
+            self.add_column(vision_detail_file_table, "vision_detail_file_mime_type", "TEXT")
+            self.add_column(vision_detail_file_table, "blob_hash", f"TEXT REFERENCES {self.blob_store_table_name}(hash)")
+            self.create_blob_reference_triggers(vision_detail_file_table)
+            if not query.exec(index_string):
+                raise Exception(query.lastError().text())
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_FILE_CREATE_TABLE_ERROR} {e}")
 
-    def get_all_vision_details_file_list(self, vision_detail_id):
-        vision_detail_file_table = f"{self.vision_file_table_name}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {vision_detail_file_table} WHERE vision_detail_id = :vision_detail_id")
-        query.bindValue(":vision_detail_id", vision_detail_id)
+    def get_all_vision_details_with_files(self, vision_main_id):
+        vision_details_list = self.get_all_vision_details_list(vision_main_id)
+        if not vision_details_list:
+            return []
+
+        query = self.prepare_query(f"SELECT f.id, f.vision_message_id, COALESCE(b.data, f.vision_detail_file_data), "
+                                   f" COALESCE(f.vision_detail_file_mime_type, b.mime_type), f.created_at "
+                                   f" FROM {self.vision_file_table_name} f "
+                                   f" LEFT JOIN {self.blob_store_table_name} b ON b.hash = f.blob_hash "
+                                   f" JOIN {self.vision_message_table_name} m ON m.id = f.vision_message_id "
+                                   f" WHERE m.vision_main_id = :vision_main_id ORDER BY f.id")
+        query.bindValue(":vision_main_id", vision_main_id)
 
         try:
             if not query.exec():
-                print(f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_FILE_FETCH_ERROR} {vision_detail_id}: "
+                print(f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_FILE_FETCH_ERROR} {vision_main_id}: "
                       f" {query.lastError().text()}")
                 return []
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
             return []
 
-        vision_detail_file_list = []
+        vision_files = {}
         while query.next():
-            vision_detail = {
-                "id": query.value("id"),
-                "vision_detail_id": query.value("vision_detail_id"),
-                "vision_detail_file_data": query.value("vision_detail_file_data"),
-                "created_at": query.value("created_at")
+            vision_detail_file = {
+                "id": query.value(0),
+                "vision_detail_id": query.value(1),
+                "vision_detail_file_data": self.decode_file_data(query.value(2)),
+                "vision_detail_file_mime_type": query.value(3),
+                "created_at": query.value(4)
             }
-            vision_detail_file_list.append(vision_detail)
+            vision_files.setdefault(vision_detail_file["vision_detail_id"], []).append(vision_detail_file)
 
-        return vision_detail_file_list
+        for vision_detail in vision_details_list:
+            vision_detail["files"] = vision_files.get(vision_detail["id"], [])
 
-    def insert_vision_file(self, vision_detail_id, vision_detail_file_data):
-        vision_detail_file_table = f"{self.vision_file_table_name}"
-        query = QSqlQuery()
-        query.prepare(
-            f"INSERT INTO {vision_detail_file_table} (vision_detail_id, vision_detail_file_data) "
-            f" VALUES (:vision_detail_id, :vision_detail_file_data)")
-        query.bindValue(":vision_detail_id", vision_detail_id)
-        query.bindValue(":vision_detail_file_data", vision_detail_file_data)
-        try:
-            success = query.exec()
-            if not success:
-                print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {query.lastError().text()}")
-            return success
-        except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_VISION_DETAIL_FILE_INSERT_ERROR} {e}")
-            return False
+        return vision_details_list
+
+    def get_vision_file_statements(self, vision_detail_id, vision_detail_file_data, vision_detail_file_mime_type):
+        blob_hash, blob_statement = self.get_blob_statement(vision_detail_file_data, vision_detail_file_mime_type)
+        query_string = (f"INSERT INTO {self.vision_file_table_name} (vision_message_id, blob_hash, vision_detail_file_mime_type) "
+                        f" VALUES (:vision_detail_id, :blob_hash, :vision_detail_file_mime_type)")
+        return [blob_statement, (query_string, {
+            ":vision_detail_id": vision_detail_id,
+            ":blob_hash": blob_hash,
+            ":vision_detail_file_mime_type": vision_detail_file_mime_type,
+        })]
 
     def create_tts_main(self):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         CREATE TABLE IF NOT EXISTS {self.tts_main_table_name} 
                          (
@@ -819,21 +1663,17 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_TTS_CREATE_TABLE_ERROR} {e}")
 
     def add_tts_main(self, title):
-        query = QSqlQuery()
-        query.prepare(f"INSERT INTO {self.tts_main_table_name} (title) VALUES (:title)")
+        query = self.prepare_query(f"INSERT INTO {self.tts_main_table_name} (title) VALUES (:title)")
         query.bindValue(":title", title)
         try:
             if query.exec():
-                tts_main_id = query.lastInsertId()
-                self.create_tts_detail(tts_main_id)
-                return tts_main_id
+                return query.lastInsertId()
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_TTS_ADD_ERROR} {e}")
         return None
 
     def update_tts_main(self, id, title):
-        query = QSqlQuery()
-        query.prepare(f"UPDATE {self.tts_main_table_name} SET title = :title WHERE id = :id")
+        query = self.prepare_query(f"UPDATE {self.tts_main_table_name} SET title = :title WHERE id = :id")
         query.bindValue(":title", title)
         query.bindValue(":id", id)
         try:
@@ -844,84 +1684,82 @@ class SqliteDatabase:
         return False
 
     def delete_tts_main_entry(self, id):
-        try:
-            query = QSqlQuery()
-            query.prepare(f"DELETE FROM {self.tts_main_table_name} WHERE id = :id")
-            query.bindValue(":id", id)
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_TTS_MAIN_ENTRY_SUCCESS} {id}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_TTS_MAIN_ENTRY_FAIL} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.tts_main_table_name} WHERE id = :id", {":id": id})],
+                                  f"{DATABASE_MESSAGE.DATABASE_TTS_MAIN_ENTRY_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_TTS_MAIN_ENTRY_FAIL} {id}:")
 
     def delete_tts_detail(self, id):
-        try:
-            query = QSqlQuery()
-            table_name = f"{self.tts_detail_table_name}_{id}"
-            query.prepare(f"DROP TABLE IF EXISTS {table_name}")
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_DELETE_TABLE_SUCCESS} {table_name}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_DELETE_ERROR} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.tts_message_table_name} WHERE tts_main_id = :tts_main_id",
+                                    {":tts_main_id": id})],
+                                  f"{DATABASE_MESSAGE.DATABASE_TTS_DETAIL_DELETE_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_TTS_DETAIL_DELETE_ERROR} {id}:")
 
     def delete_tts_main(self, id):
         try:
             if not self.delete_tts_main_entry(id):
                 raise Exception(f"Failed to delete tts main entry for id {id}")
+            self.delete_archived_conversation(Constants.SEARCH_SOURCE_TTS, id)
         except Exception as e:
             logging.error(f"Error deleting tts main for id {id}: {e}")
             return False
         return True
 
     def get_all_tts_main_list(self):
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {self.tts_main_table_name} ORDER BY created_at DESC")
+        query = self.prepare_query(f"SELECT id, title, created_at, last_activity_at, message_count, last_model "
+                                   f" FROM {self.tts_main_table_name} ORDER BY last_activity_at DESC, id DESC")
         try:
             if query.exec():
                 results = []
                 while query.next():
-                    id = query.value(0)
-                    title = query.value(1)
-                    created_at = query.value(2)
-                    results.append({'id': id, 'title': title, 'created_at': created_at})
+                    results.append({
+                        'id': query.value(0),
+                        'title': query.value(1),
+                        'created_at': query.value(2),
+                        'last_activity_at': query.value(3),
+                        'message_count': query.value(4),
+                        'last_model': query.value(5),
+                    })
                 return results
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_RETRIEVE_DATA_FAIL} {self.tts_main_table_name}: {e}")
         return []
 
-    def create_tts_detail(self, tts_main_id):
-        query = QSqlQuery()
-        tts_detail_table = f"{self.tts_detail_table_name}_{tts_main_id}"
+    def create_tts_message(self):
+        query = QSqlQuery(self.db)
         query_string = f"""
-                        CREATE TABLE IF NOT EXISTS {tts_detail_table} 
+                        CREATE TABLE IF NOT EXISTS {self.tts_message_table_name} 
                          (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            tts_main_id TEXT, 
+                            tts_main_id INTEGER NOT NULL,
                             tts_type TEXT,
                             tts_model TEXT,
                             tts_text TEXT,
-                            tts_response_format TEXT,  
-                            tts_data BLOB,                            
-                            elapsed_time TEXT, 
-                            finish_reason TEXT,   
+                            tts_response_format TEXT,
+                            tts_data BLOB,
+                            elapsed_time TEXT,
+                            finish_reason TEXT,
                             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                            FOREIGN KEY(tts_main_id) REFERENCES {self.tts_main_table_name}(id) ON DELETE CASCADE  
+                            FOREIGN KEY(tts_main_id) REFERENCES {self.tts_main_table_name}(id) ON DELETE CASCADE
                         )
                         """
+        index_string = f"""
+                        CREATE INDEX IF NOT EXISTS {self.tts_message_index_name}
+                          ON {self.tts_message_table_name} (tts_main_id, id)
+                        """
         try:
-            query.exec(query_string)
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+            if not query.exec(index_string):
+                raise Exception(query.lastError().text())
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_TTS_DETAIL_CREATE_TABLE_ERROR} {e}")
+            print(f"{DATABASE_MESSAGE.DATABASE_TTS_MESSAGE_CREATE_TABLE_ERROR} {e}")
 
-    def get_all_tts_details_list(self, tts_main_id):
-        tts_detail_table = f"{self.tts_detail_table_name}_{tts_main_id}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {tts_detail_table}")
+    def get_all_tts_details_metadata_list(self, tts_main_id):
+        self.restore_archived_conversation(Constants.SEARCH_SOURCE_TTS, tts_main_id)
+        query = self.prepare_query(f"SELECT id, tts_main_id, tts_type, tts_model, tts_text, tts_response_format, "
+                                   f" tts_data IS NOT NULL AS has_tts_data, elapsed_time, finish_reason, created_at "
+                                   f" FROM {self.tts_message_table_name} WHERE tts_main_id = :tts_main_id ORDER BY id")
+        query.bindValue(":tts_main_id", tts_main_id)
 
         try:
             if not query.exec():
@@ -940,7 +1778,7 @@ class SqliteDatabase:
                 "tts_model": query.value("tts_model"),
                 "tts_text": query.value("tts_text"),
                 "tts_response_format": query.value("tts_response_format"),
-                "tts_data": query.value("tts_data"),
+                "has_tts_data": bool(query.value("has_tts_data")),
                 "elapsed_time": query.value("elapsed_time"),
                 "finish_reason": query.value("finish_reason"),
                 "created_at": query.value("created_at")
@@ -949,36 +1787,38 @@ class SqliteDatabase:
 
         return tts_details_list
 
-    def insert_tts_detail(self, tts_main_id, tts_type, tts_model, tts_text, tts_response_format,
-                          tts_data, elapsed_time, finish_reason):
-        tts_detail_table = f"{self.tts_detail_table_name}_{tts_main_id}"
-        query = QSqlQuery()
-        query.prepare(
-            f"INSERT INTO {tts_detail_table} (tts_main_id, tts_type, tts_model, tts_text, tts_response_format, "
-            f" tts_data, elapsed_time, finish_reason) "
-            f" VALUES (:tts_main_id, :tts_type, :tts_model, :tts_text, :tts_response_format,"
-            f" :tts_data, :elapsed_time, :finish_reason)")
-        query.bindValue(":tts_main_id", tts_main_id)
-        query.bindValue(":tts_type", tts_type)
-        query.bindValue(":tts_model", tts_model)
-        query.bindValue(":tts_text", tts_text)
-        query.bindValue(":tts_response_format", tts_response_format)
-        query.bindValue(":tts_data", tts_data)
-        query.bindValue(":elapsed_time", elapsed_time)
-        query.bindValue(":finish_reason", finish_reason)
+    def get_tts_data(self, tts_detail_id):
+        query = self.prepare_query(f"SELECT tts_data FROM {self.tts_message_table_name} WHERE id = :id")
+        query.bindValue(":id", tts_detail_id)
         try:
-            if query.exec():
-                return True
-            else:
-                error = query.lastError()
-                print(f"{DATABASE_MESSAGE.DATABASE_TTS_DETAIL_INSERT_ERROR} {error.text()}")
-                return False
+            if query.exec() and query.next():
+                file_data = self.decode_file_data(query.value(0))
+                query.finish()
+                return file_data
+            print(f"{DATABASE_MESSAGE.DATABASE_TTS_DATA_FETCH_ERROR} {tts_detail_id}: {query.lastError().text()}")
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_TTS_DETAIL_INSERT_ERROR} {e}")
-            return False
+            print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
+        return None
+
+    def insert_tts_detail(self, tts_main_id, tts_type, tts_model, tts_text, tts_response_format,
+                          tts_data, elapsed_time, finish_reason, turn=None):
+        query_string = (f"INSERT INTO {self.tts_message_table_name} (tts_main_id, tts_type, tts_model, tts_text, "
+                        f" tts_response_format, tts_data, elapsed_time, finish_reason) "
+                        f" VALUES (:tts_main_id, :tts_type, :tts_model, :tts_text, :tts_response_format,"
+                        f" :tts_data, :elapsed_time, :finish_reason)")
+        return self.submit_write([(query_string, {
+            ":tts_main_id": tts_main_id,
+            ":tts_type": tts_type,
+            ":tts_model": tts_model,
+            ":tts_text": tts_text,
+            ":tts_response_format": tts_response_format,
+            ":tts_data": self.encode_file_data(tts_data),
+            ":elapsed_time": elapsed_time,
+            ":finish_reason": finish_reason,
+        })], DATABASE_MESSAGE.DATABASE_TTS_DETAIL_INSERT_ERROR, turn=turn)
 
     def create_stt_main(self):
-        query = QSqlQuery()
+        query = QSqlQuery(self.db)
         query_string = f"""
                         CREATE TABLE IF NOT EXISTS {self.stt_main_table_name} 
                          (
@@ -993,21 +1833,17 @@ class SqliteDatabase:
             print(f"{DATABASE_MESSAGE.DATABASE_STT_CREATE_TABLE_ERROR} {e}")
 
     def add_stt_main(self, title):
-        query = QSqlQuery()
-        query.prepare(f"INSERT INTO {self.stt_main_table_name} (title) VALUES (:title)")
+        query = self.prepare_query(f"INSERT INTO {self.stt_main_table_name} (title) VALUES (:title)")
         query.bindValue(":title", title)
         try:
             if query.exec():
-                stt_main_id = query.lastInsertId()
-                self.create_stt_detail(stt_main_id)
-                return stt_main_id
+                return query.lastInsertId()
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_STT_ADD_ERROR} {e}")
         return None
 
     def update_stt_main(self, id, title):
-        query = QSqlQuery()
-        query.prepare(f"UPDATE {self.stt_main_table_name} SET title = :title WHERE id = :id")
+        query = self.prepare_query(f"UPDATE {self.stt_main_table_name} SET title = :title WHERE id = :id")
         query.bindValue(":title", title)
         query.bindValue(":id", id)
         try:
@@ -1018,84 +1854,85 @@ class SqliteDatabase:
         return False
 
     def delete_stt_main_entry(self, id):
-        try:
-            query = QSqlQuery()
-            query.prepare(f"DELETE FROM {self.stt_main_table_name} WHERE id = :id")
-            query.bindValue(":id", id)
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_STT_MAIN_ENTRY_SUCCESS} {id}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_STT_MAIN_ENTRY_FAIL} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.stt_main_table_name} WHERE id = :id", {":id": id})],
+                                  f"{DATABASE_MESSAGE.DATABASE_STT_MAIN_ENTRY_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_STT_MAIN_ENTRY_FAIL} {id}:")
 
     def delete_stt_detail(self, id):
-        try:
-            query = QSqlQuery()
-            table_name = f"{self.stt_detail_table_name}_{id}"
-            query.prepare(f"DROP TABLE IF EXISTS {table_name}")
-            if not query.exec():
-                raise Exception(query.lastError().text())
-            logging.info(f"{DATABASE_MESSAGE.DATABASE_DELETE_TABLE_SUCCESS} {table_name}")
-        except Exception as e:
-            logging.error(f"{DATABASE_MESSAGE.DATABASE_CHAT_DETAIL_DELETE_ERROR} {id}: {e}")
-            return False
-        return True
+        return self.submit_delete([(f"DELETE FROM {self.stt_message_table_name} WHERE stt_main_id = :stt_main_id",
+                                    {":stt_main_id": id})],
+                                  f"{DATABASE_MESSAGE.DATABASE_STT_DETAIL_DELETE_SUCCESS} {id}",
+                                  f"{DATABASE_MESSAGE.DATABASE_STT_DETAIL_DELETE_ERROR} {id}:")
 
     def delete_stt_main(self, id):
         try:
             if not self.delete_stt_main_entry(id):
                 raise Exception(f"Failed to delete stt main entry for id {id}")
+            self.delete_archived_conversation(Constants.SEARCH_SOURCE_STT, id)
         except Exception as e:
             logging.error(f"Error deleting stt main for id {id}: {e}")
             return False
         return True
 
     def get_all_stt_main_list(self):
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {self.stt_main_table_name} ORDER BY created_at DESC")
+        query = self.prepare_query(f"SELECT id, title, created_at, last_activity_at, message_count, last_model "
+                                   f" FROM {self.stt_main_table_name} ORDER BY last_activity_at DESC, id DESC")
         try:
             if query.exec():
                 results = []
                 while query.next():
-                    id = query.value(0)
-                    title = query.value(1)
-                    created_at = query.value(2)
-                    results.append({'id': id, 'title': title, 'created_at': created_at})
+                    results.append({
+                        'id': query.value(0),
+                        'title': query.value(1),
+                        'created_at': query.value(2),
+                        'last_activity_at': query.value(3),
+                        'message_count': query.value(4),
+                        'last_model': query.value(5),
+                    })
                 return results
         except Exception as e:
             print(f"{DATABASE_MESSAGE.DATABASE_RETRIEVE_DATA_FAIL} {self.stt_main_table_name}: {e}")
         return []
 
-    def create_stt_detail(self, stt_main_id):
-        query = QSqlQuery()
-        stt_detail_table = f"{self.stt_detail_table_name}_{stt_main_id}"
+    def create_stt_message(self):
+        query = QSqlQuery(self.db)
         query_string = f"""
-                        CREATE TABLE IF NOT EXISTS {stt_detail_table} 
+                        CREATE TABLE IF NOT EXISTS {self.stt_message_table_name} 
                          (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            stt_main_id TEXT, 
+                            stt_main_id INTEGER NOT NULL,
                             stt_type TEXT,
                             stt_model TEXT,
                             stt_text TEXT,
-                            stt_response_format TEXT,  
-                            stt_data BLOB,                            
-                            elapsed_time TEXT, 
-                            finish_reason TEXT, 
+                            stt_response_format TEXT,
+                            stt_data BLOB,
+                            stt_data_mime_type TEXT,
+                            elapsed_time TEXT,
+                            finish_reason TEXT,
                             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                            FOREIGN KEY(stt_main_id) REFERENCES {self.stt_main_table_name}(id) ON DELETE CASCADE 
+                            FOREIGN KEY(stt_main_id) REFERENCES {self.stt_main_table_name}(id) ON DELETE CASCADE
                         )
                         """
+        index_string = f"""
+                        CREATE INDEX IF NOT EXISTS {self.stt_message_index_name}
+                          ON {self.stt_message_table_name} (stt_main_id, id)
+                        """
         try:
-            query.exec(query_string)
+            if not query.exec(query_string):
+                raise Exception(query.lastError().text())
+            self.add_column(self.stt_message_table_name, "stt_data_mime_type", "TEXT")
+            if not query.exec(index_string):
+                raise Exception(query.lastError().text())
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_STT_DETAIL_CREATE_TABLE_ERROR} {e}")
-
-    def get_all_stt_details_list(self, stt_main_id):
-        stt_detail_table = f"{self.stt_detail_table_name}_{stt_main_id}"
-        query = QSqlQuery()
-        query.prepare(f"SELECT * FROM {stt_detail_table}")
+            print(f"{DATABASE_MESSAGE.DATABASE_STT_MESSAGE_CREATE_TABLE_ERROR} {e}")
+
+    def get_all_stt_details_metadata_list(self, stt_main_id):
+        self.restore_archived_conversation(Constants.SEARCH_SOURCE_STT, stt_main_id)
+        query = self.prepare_query(f"SELECT id, stt_main_id, stt_type, stt_model, stt_text, stt_response_format, "
+                                   f" stt_data IS NOT NULL AS has_stt_data, stt_data_mime_type, elapsed_time, finish_reason, "
+                                   f" created_at "
+                                   f" FROM {self.stt_message_table_name} WHERE stt_main_id = :stt_main_id ORDER BY id")
+        query.bindValue(":stt_main_id", stt_main_id)
 
         try:
             if not query.exec():
@@ -1112,9 +1949,10 @@ class SqliteDatabase:
                 "stt_main_id": query.value("stt_main_id"),
                 "stt_type": query.value("stt_type"),
                 "stt_model": query.value("stt_model"),
-                "stt_text": query.value("stt_text"),
+                "stt_text": Utility.decompress_text(query.value("stt_text")),
                 "stt_response_format": query.value("stt_response_format"),
-                "stt_data": query.value("stt_data"),
+                "has_stt_data": bool(query.value("has_stt_data")),
+                "stt_data_mime_type": query.value("stt_data_mime_type"),
                 "elapsed_time": query.value("elapsed_time"),
                 "finish_reason": query.value("finish_reason"),
                 "created_at": query.value("created_at")
@@ -1123,29 +1961,33 @@ class SqliteDatabase:
 
         return stt_details_list
 
-    def insert_stt_detail(self, stt_main_id, stt_type, stt_model, stt_text, stt_response_format,
-                          stt_data, elapsed_time, finish_reason):
-        stt_detail_table = f"{self.stt_detail_table_name}_{stt_main_id}"
-        query = QSqlQuery()
-        query.prepare(
-            f"INSERT INTO {stt_detail_table} (stt_main_id, stt_type, stt_model, stt_text, stt_response_format, "
-            f" stt_data, elapsed_time, finish_reason) "
-            f" VALUES (:stt_main_id, :stt_type, :stt_model, :stt_text, :stt_response_format,"
-            f" :stt_data, :elapsed_time, :finish_reason)")
-        query.bindValue(":stt_main_id", stt_main_id)
-        query.bindValue(":stt_type", stt_type)
-        query.bindValue(":stt_model", stt_model)
-        query.bindValue(":stt_text", stt_text)
-        query.bindValue(":stt_response_format", stt_response_format)
-        query.bindValue(":stt_data", stt_data)
-        query.bindValue(":elapsed_time", elapsed_time)
-        query.bindValue(":finish_reason", finish_reason)
+    def get_stt_data(self, stt_detail_id):
+        query = self.prepare_query(f"SELECT stt_data FROM {self.stt_message_table_name} WHERE id = :id")
+        query.bindValue(":id", stt_detail_id)
         try:
-            success = query.exec()
-            if not success:
-                print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {query.lastError().text()}")
-            return success
+            if query.exec() and query.next():
+                file_data = self.decode_file_data(query.value(0))
+                query.finish()
+                return file_data
+            print(f"{DATABASE_MESSAGE.DATABASE_STT_DATA_FETCH_ERROR} {stt_detail_id}: {query.lastError().text()}")
         except Exception as e:
-            print(f"{DATABASE_MESSAGE.DATABASE_STT_DETAIL_INSERT_ERROR} {e}")
-            return False
+            print(f"{DATABASE_MESSAGE.DATABASE_EXECUTE_QUERY_ERROR} {e}")
+        return None
 
+    def insert_stt_detail(self, stt_main_id, stt_type, stt_model, stt_text, stt_response_format,
+                          stt_data, elapsed_time, finish_reason, stt_data_mime_type=None, turn=None):
+        query_string = (f"INSERT INTO {self.stt_message_table_name} (stt_main_id, stt_type, stt_model, stt_text, "
+                        f" stt_response_format, stt_data, stt_data_mime_type, elapsed_time, finish_reason) "
+                        f" VALUES (:stt_main_id, :stt_type, :stt_model, :stt_text, :stt_response_format,"
+                        f" :stt_data, :stt_data_mime_type, :elapsed_time, :finish_reason)")
+        return self.submit_write(self.get_compressed_text_statements((query_string, {
+            ":stt_main_id": stt_main_id,
+            ":stt_type": stt_type,
+            ":stt_model": stt_model,
+            ":stt_text": stt_text,
+            ":stt_response_format": stt_response_format,
+            ":stt_data": self.encode_file_data(stt_data),
+            ":stt_data_mime_type": stt_data_mime_type,
+            ":elapsed_time": elapsed_time,
+            ":finish_reason": finish_reason,
+        }), self.stt_message_fts_table_name, "stt_text"), DATABASE_MESSAGE.DATABASE_STT_DETAIL_INSERT_ERROR, turn=turn)
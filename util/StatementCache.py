@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+from PyQt6.QtSql import QSqlQuery
+
+from util.Constants import Constants
+
+
+class StatementCache:
+    def __init__(self, db, capacity=Constants.STATEMENT_CACHE_SIZE):
+        self.db = db
+        self.capacity = capacity
+        self.statements = OrderedDict()
+
+    def prepare(self, query_string):
+        query = self.statements.get(query_string)
+        if query is not None:
+            self.statements.move_to_end(query_string)
+            query.finish()
+            return query
+
+        query = QSqlQuery(self.db)
+        if query.prepare(query_string):
+            self.statements[query_string] = query
+            if len(self.statements) > self.capacity:
+                _, evicted_query = self.statements.popitem(last=False)
+                evicted_query.finish()
+        return query
+
+    def clear(self):
+        for query in self.statements.values():
+            query.finish()
+        self.statements.clear()
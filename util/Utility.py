@@ -1,14 +1,18 @@
 import base64
+import datetime
+import hashlib
+import mimetypes
 import os
 import re
 import sys
 import tempfile
+import zlib
 from pathlib import Path
 
 import anthropic
 import google.generativeai as genai
 import openai
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QByteArray
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QDialogButtonBox, QMessageBox
 
 from util.Constants import Constants, UI, MODEL_MESSAGE
@@ -292,6 +296,96 @@ class Utility:
         with open(path, UI.FILE_READ_IN_BINARY_MODE) as file:
             return base64.b64encode(file.read()).decode(UI.UTF_8)
 
+    @staticmethod
+    def read_file(path):
+        with open(path, UI.FILE_READ_IN_BINARY_MODE) as file:
+            return file.read()
+
+    @staticmethod
+    def get_mime_type(path):
+        mime_type, _ = mimetypes.guess_type(path)
+        return mime_type or Constants.DEFAULT_MIME_TYPE
+
+    @staticmethod
+    def guess_mime_type_from_data(data):
+        for offset, signature, mime_type in Constants.MIME_TYPE_SIGNATURES:
+            if data[offset:offset + len(signature)] == signature:
+                return mime_type
+        return Constants.DEFAULT_MIME_TYPE
+
+    @staticmethod
+    def get_content_hash(data):
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def compress_text(text):
+        if not isinstance(text, str):
+            return None
+        data = text.encode()
+        if len(data) < Constants.TEXT_COMPRESSION_THRESHOLD:
+            return None
+        compressed_data = Constants.TEXT_COMPRESSION_MARKER + zlib.compress(data, Constants.TEXT_COMPRESSION_LEVEL)
+        return compressed_data if len(compressed_data) < len(data) else None
+
+    @staticmethod
+    def decompress_text(value):
+        if isinstance(value, QByteArray):
+            value = bytes(value)
+        if not isinstance(value, (bytes, bytearray)):
+            return value
+        if value.startswith(Constants.TEXT_COMPRESSION_MARKER):
+            value = zlib.decompress(value[len(Constants.TEXT_COMPRESSION_MARKER):])
+        return value.decode(errors="replace")
+
+    @staticmethod
+    def build_search_snippet(text, terms):
+        words = (text or "").split()
+        match_index = next((index for index, word in enumerate(words)
+                            if any(word.lower().strip(".,!?;:'\"()").startswith(term) for term in terms)), 0)
+        start = max(0, match_index - Constants.SEARCH_SNIPPET_TOKENS // 2)
+        end = start + Constants.SEARCH_SNIPPET_TOKENS
+        snippet_words = []
+        for word in words[start:end]:
+            if any(word.lower().strip(".,!?;:'\"()").startswith(term) for term in terms):
+                word = Constants.SEARCH_HIGHLIGHT_START + word + Constants.SEARCH_HIGHLIGHT_END
+            snippet_words.append(word)
+        snippet = " ".join(snippet_words)
+        if start > 0:
+            snippet = Constants.SEARCH_SNIPPET_ELLIPSIS + snippet
+        if end < len(words):
+            snippet += Constants.SEARCH_SNIPPET_ELLIPSIS
+        return snippet
+
+    @staticmethod
+    def format_byte_size(size):
+        for unit in ["B", "KB", "MB", "GB"]:
+            if size < 1024 or unit == "GB":
+                return f"{size:.1f} {unit}" if unit != "B" else f"{size} {unit}"
+            size /= 1024
+
+    @staticmethod
+    def get_current_timestamp():
+        return datetime.datetime.now(datetime.timezone.utc).strftime(Constants.DATABASE_TIMESTAMP_FORMAT)
+
+    @staticmethod
+    def format_conversation_summary(item):
+        lines = [f"{UI.CONVERSATION_MESSAGES}{item.get('message_count') or 0}"]
+        if item.get('last_model'):
+            lines.append(f"{UI.CONVERSATION_MODEL}{item['last_model']}")
+        if item.get('last_activity_at'):
+            try:
+                last_activity = datetime.datetime.strptime(item['last_activity_at'], Constants.DATABASE_TIMESTAMP_FORMAT)
+                last_activity = last_activity.replace(tzinfo=datetime.timezone.utc).astimezone()
+                lines.append(f"{UI.CONVERSATION_LAST_ACTIVITY}{last_activity.strftime(Constants.CONVERSATION_ACTIVITY_FORMAT)}")
+            except ValueError:
+                lines.append(f"{UI.CONVERSATION_LAST_ACTIVITY}{item['last_activity_at']}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def get_extension_from_mime_type(mime_type, default):
+        extension = mimetypes.guess_extension(mime_type) if mime_type else None
+        return extension.lstrip('.') if extension else default
+
     @staticmethod
     def create_temp_file(content, extension_name, apply_decode):
         with tempfile.NamedTemporaryFile(delete=False, suffix='.' + extension_name) as temp_file:
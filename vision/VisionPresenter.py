@@ -1,4 +1,4 @@
-from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtCore import pyqtSlot, QTimer
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QDialog, QMessageBox
 
 from util.ChatType import ChatType
@@ -18,6 +18,7 @@ class VisionPresenter(QWidget):
         super().__init__()
         self._vision_main_id = None
         self._vision_main_index = None
+        self.turn = None
         self.initialize_manager()
         self.initialize_ui()
 
@@ -50,6 +51,7 @@ class VisionPresenter(QWidget):
         # Model signal
         self.visionModel.thread_started_signal.connect(self.visionView.start_chat)
         self.visionModel.thread_finished_signal.connect(self.visionView.finish_chat)
+        self.visionModel.thread_finished_signal.connect(self.commit_turn)
         self.visionModel.response_signal.connect(self.handle_response_signal)
         self.visionModel.response_finished_signal.connect(self.handle_response_finished_signal)
 
@@ -79,7 +81,15 @@ class VisionPresenter(QWidget):
         self.visionView.update_ui_finish(model, finish_reason, elapsed_time, stream)
         self._database.insert_vision_detail(self.vision_main_id, ChatType.AI.value, model,
                                             self.view.get_last_ai_widget().get_original_text(), elapsed_time,
-                                            finish_reason)
+                                            finish_reason, turn=self.turn)
+        self.visionViewModel.record_vision_activity(self.vision_main_id, model)
+        self.commit_turn()
+
+    @pyqtSlot()
+    def commit_turn(self):
+        if self.turn is not None:
+            self.turn.commit()
+            self.turn = None
 
     @property
     def model(self):
@@ -131,15 +141,15 @@ class VisionPresenter(QWidget):
             self.vision_main_id = id
             self.view.clear_all()
             self.view.reset_search_bar()
-            vision_detail_list = self._database.get_all_vision_details_list(id)
+            vision_detail_list = self._database.get_all_vision_details_with_files(id)
             for vision_detail in vision_detail_list:
                 if vision_detail['vision_type'] == ChatType.HUMAN.value:
-                    vision_detail_id = f"{Constants.VISION_DETAIL_TABLE_ID_NAME}{id}_{vision_detail['id']}"
-                    vision_detail_file_list = self._database.get_all_vision_details_file_list(vision_detail_id)
                     file_list = []
-                    for vision_detail_file in vision_detail_file_list:
+                    for vision_detail_file in vision_detail['files']:
+                        extension = Utility.get_extension_from_mime_type(
+                            vision_detail_file['vision_detail_file_mime_type'], Constants.VISION_IMAGE_EXTENSION)
                         file_list.append(Utility.create_temp_file(vision_detail_file['vision_detail_file_data'],
-                                                                  Constants.VISION_IMAGE_EXTENSION, True))
+                                                                  extension, False))
 
                     self.view.add_user_question(ChatType.HUMAN, vision_detail['vision_text'], file_list)
                 else:
@@ -149,6 +159,14 @@ class VisionPresenter(QWidget):
                         Constants.MODEL_PREFIX + vision_detail['vision_model']
                         + Constants.RESPONSE_TIME + format(float(vision_detail['elapsed_time']), ".2f"))
 
+    def show_vision_message(self, vision_main_id, vision_message_id):
+        self.vision_main_id = None
+        self.show_vision_detail(vision_main_id)
+        position = self._database.get_message_position(self._database.vision_message_table_name, "vision_main_id",
+                                                       vision_main_id, vision_message_id)
+        if position is not None:
+            QTimer.singleShot(0, lambda: self.view.scroll_to_message_widget(position))
+
     def delete_vision(self, index):
         self.visionViewModel.remove_vision(index)
 
@@ -156,19 +174,15 @@ class VisionPresenter(QWidget):
         self.visionViewModel.add_new_vision(title)
 
     def add_human_vision(self, text, file_list):
-        if self.vision_main_id:
-            vision_detail_id = self._database.insert_vision_detail(self.vision_main_id, ChatType.HUMAN.value,
-                                                                   self.visionView.vision_model, text, None, None)
-            if vision_detail_id:
-                for file in file_list:
-                    self._database.insert_vision_file(vision_detail_id, Utility.base64_encode_file(file))
-        else:
+        if not self.vision_main_id:
             self.create_new_vision()
-            vision_detail_id = self._database.insert_vision_detail(self.vision_main_id, ChatType.HUMAN.value,
-                                                                   self.visionView.vision_model, text, None, None)
-            if vision_detail_id:
-                for file in file_list:
-                    self._database.insert_vision_file(vision_detail_id, Utility.base64_encode_file(file))
+        self.commit_turn()
+        self.turn = self._database.begin_turn()
+        vision_files = [(Utility.read_file(file), Utility.get_mime_type(file)) for file in file_list]
+        self._database.insert_vision_detail_with_files(self.vision_main_id, ChatType.HUMAN.value,
+                                                       self.visionView.vision_model, text, None, None, vision_files,
+                                                       turn=self.turn)
+        self.visionViewModel.record_vision_activity(self.vision_main_id, self.visionView.vision_model)
 
     @pyqtSlot(str, list)
     def submit(self, text, file_list):
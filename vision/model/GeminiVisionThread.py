@@ -1,19 +1,19 @@
 import time
 
 import google.generativeai as genai
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 
+from util.AIWorkerPool import AIWorker
 from util.Constants import Constants
 
 
-class GeminiVisionThread(QThread):
+class GeminiVisionThread(AIWorker):
     response_signal = pyqtSignal(str, bool)
     response_finished_signal = pyqtSignal(str, str, float, bool)
 
     def __init__(self, args):
         super().__init__()
         self.initialize_gemini(args)
-        self.force_stop = False
         self.start_time = None
 
     def initialize_gemini(self, args):
@@ -38,15 +38,13 @@ class GeminiVisionThread(QThread):
             else:
                 self.handle_response(response)
         except Exception as e:
+            self.flush_stream_text()
             self.response_signal.emit(str(e), self.stream)
 
     def get_response(self, contents, stream):
         response = self.gemini.generate_content(contents=contents, stream=stream)
         return response
 
-    def set_force_stop(self, force_stop):
-        self.force_stop = force_stop
-
     def handle_response(self, response):
         if self.force_stop:
             self.finish_run(self.model, Constants.FORCE_STOP, self.stream)
@@ -64,11 +62,12 @@ class GeminiVisionThread(QThread):
             else:
                 result = chunk.text
                 if result:
-                    self.response_signal.emit(result, self.stream)
+                    self.emit_stream_text(result)
                     finish_reason = chunk.candidates[0].finish_reason.name
         self.finish_run(self.model, finish_reason, self.stream)
 
     def finish_run(self, model, finish_reason, stream):
+        self.flush_stream_text()
         end_time = time.time()
         elapsed_time = end_time - self.start_time
         self.response_finished_signal.emit(model, finish_reason, elapsed_time, stream)
@@ -1,22 +1,22 @@
 import time
 
 import openai
-from PyQt6.QtCore import QThread, pyqtSignal
-from openai import OpenAI
+from PyQt6.QtCore import pyqtSignal
 
+from util.AIWorkerPool import AIWorker, RequestCancelledError
+from util.ClientManager import ClientManager
 from util.Constants import Constants
 
 
-class OpenAIVisionThread(QThread):
+class OpenAIVisionThread(AIWorker):
     response_signal = pyqtSignal(str, bool)
     response_finished_signal = pyqtSignal(str, str, float, bool)
 
     def __init__(self, args):
         super().__init__()
         self.openai_arg = args['ai_arg']
-        self.openai = OpenAI(api_key=args['api_key'])
+        self.openai = ClientManager.get_openai_client(args['api_key'])
         self.stream = self.openai_arg['stream']
-        self.force_stop = False
         self.start_time = None
 
     def run(self):
@@ -27,16 +27,17 @@ class OpenAIVisionThread(QThread):
                 self.handle_stream_response(response)
             else:
                 self.handle_response(response)
-        except Exception as e:
-            self.response_signal.emit(str(e), self.stream)
+        except (RequestCancelledError, Exception) as e:
+            if self.force_stop:
+                self.finish_run(self.openai_arg['model'], Constants.FORCE_STOP, self.stream)
+            else:
+                self.flush_stream_text()
+                self.response_signal.emit(str(e), self.stream)
 
     def get_response(self, openai_arg):
         response = self.openai.chat.completions.create(**openai_arg)
         return response
 
-    def set_force_stop(self, force_stop):
-        self.force_stop = force_stop
-
     def handle_response(self, response):
         if self.force_stop:
             self.finish_run(response.model, Constants.FORCE_STOP, self.stream)
@@ -54,13 +55,14 @@ class OpenAIVisionThread(QThread):
             else:
                 result = chunk.choices[0].delta.content
                 if result:
-                    self.response_signal.emit(result, self.stream)
+                    self.emit_stream_text(result)
                 else:
                     finish_reason = chunk.choices[0].finish_reason
                     if finish_reason is not None:
                         self.finish_run(chunk.model, finish_reason, self.stream)
 
     def finish_run(self, model, finish_reason, stream):
+        self.flush_stream_text()
         end_time = time.time()
         elapsed_time = end_time - self.start_time
         self.response_finished_signal.emit(model, finish_reason, elapsed_time, stream)
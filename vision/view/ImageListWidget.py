@@ -24,7 +24,7 @@ class ImageListWidget(QWidget):
         layout = QVBoxLayout(self)
         self._thumbnail_list = ThumbnailListWidget()
         for file_path in self.file_list:
-            self._thumbnail_list.add_thumbnail(Utility.base64_encode_file(file_path))
+            self._thumbnail_list.add_thumbnail(Utility.read_file(file_path))
 
         top_widget = self.create_top_widget()
         layout.addWidget(top_widget)
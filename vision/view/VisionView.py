@@ -186,6 +186,12 @@ class VisionView(QWidget):
     def scroll_to_match_widget(self, position):
         self.ai_answer_scroll_area.ensureWidgetVisible(self.result_layout.itemAt(position).widget())
 
+    def scroll_to_message_widget(self, position):
+        if 0 <= position < self.result_layout.count():
+            self.result_layout.activate()
+            self.result_widget.adjustSize()
+            self.scroll_to_match_widget(position)
+
     def scroll_to_previous_match_widget(self):
         if len(self.found_text_positions) > 0 and self.current_position_index > 0:
             self.current_position_index -= 1